@@ -0,0 +1,67 @@
+"""Benchmark: native CondoData codec vs. tower-unite-suitebro subprocess
+
+Usage: python -m benchmarks.bench_codec [-n ITEMS] [-r REPEAT]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+
+from pytower import codec
+from pytower.suitebro import run_suitebro_parser
+
+from .synthetic import make_save_data
+from .timing import best_of
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the native codec with the suitebro parser subprocess')
+    parser.add_argument('-n', '--items', type=int, default=5000, help='Number of items in the synthetic save')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Number of repetitions (best is reported)')
+    args = parser.parse_args()
+
+    data = make_save_data(args.items)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        save_path = os.path.join(tmp, 'CondoData')
+        json_path = save_path + '.json'
+        output_path = os.path.join(tmp, 'CondoData_output')
+        codec.dump(data, save_path)
+        size = os.path.getsize(save_path)
+
+        def load_external():
+            with contextlib.redirect_stdout(io.StringIO()):
+                run_suitebro_parser(save_path, False, json_path, overwrite=True)
+            with open(json_path, 'r') as fd:
+                return json.load(fd)
+
+        def save_external():
+            with open(json_path, 'w') as fd:
+                json.dump(data, fd, indent=2)
+            with contextlib.redirect_stdout(io.StringIO()):
+                run_suitebro_parser(json_path, True, output_path, overwrite=True)
+
+        # Sanity check that both paths agree before timing anything
+        if codec.load(save_path) != load_external():
+            raise RuntimeError('Native decoder output differs from suitebro parser output')
+        save_external()
+        with open(output_path, 'rb') as fd:
+            if codec.encode(data) != fd.read():
+                raise RuntimeError('Native encoder output differs from suitebro parser output')
+
+        results = [
+            ('load (suitebro + json)', best_of(args.repeat, load_external)),
+            ('load (native)', best_of(args.repeat, lambda: codec.load(save_path))),
+            ('save (json + suitebro)', best_of(args.repeat, save_external)),
+            ('save (native)', best_of(args.repeat, lambda: codec.dump(data, output_path))),
+        ]
+
+    print(f'{args.items:,} items, {size:,} bytes')
+    for name, seconds in results:
+        print(f'  {name:<24} {seconds * 1000:>10.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark: copy_selection on wired items vs. remapping GUIDs through JSON string replacement, and
+copy_selection_batch vs. repeated copy_selection
+
+Usage: python -m benchmarks.bench_copy [-n ITEMS] [-c CONNECTIONS] [-t TILES] [-r REPEAT]
+"""
+import argparse
+import copy
+import json
+import random
+
+import numpy as np
+
+from pytower import suitebro
+from pytower.copy import copy_selection, copy_selection_batch
+from pytower.object import ITEMCONNECTIONS_DEFAULT
+from pytower.connections.connections import CONNECTION_DEFAULT
+from pytower.selection import Selection
+from pytower.suitebro import Suitebro
+
+from .synthetic import make_save_data
+from .timing import best_of
+
+
+def _wire(items: list, connections: int, seed: int = 0):
+    # Connects every item to random other items
+    rng = random.Random(seed)
+    for obj in items:
+        cons = copy.deepcopy(ITEMCONNECTIONS_DEFAULT)
+        for _ in range(connections):
+            con = copy.deepcopy(CONNECTION_DEFAULT)
+            con['Struct']['Item']['Struct']['value']['Guid'] = rng.choice(items).guid()
+            cons['Array']['value']['Struct']['value'].append(con)
+        obj.item['properties']['ItemConnections'] = cons
+
+
+def _legacy_replace_guids(datadict, replacement_table):
+    # GUID remapping as previously implemented by replace_guids
+    encoding = json.dumps(datadict)
+    for target, replacement in replacement_table.items():
+        encoding = encoding.replace(target, replacement)
+    return json.loads(encoding)
+
+
+def _legacy_copy(selection: Selection) -> list:
+    # copy_selection as previously implemented, without the group remapping
+    replacement_table = {}
+    copies = []
+    for obj in selection:
+        copied = obj.copy()
+        replacement_table[obj.guid()] = copied.guid()
+        copies.append(copied)
+    for obj in copies:
+        obj.item = _legacy_replace_guids(obj.item, replacement_table)
+        obj.properties = _legacy_replace_guids(obj.properties, replacement_table)
+    return copies
+
+
+def _repeated_copy(selection: Selection, offsets: np.ndarray) -> list:
+    # Tiling as previously implemented by the Tile tool, one copy_selection per copy
+    batches = []
+    for offset in offsets:
+        copies = copy_selection(selection)
+        for obj in copies:
+            obj.position += offset
+        batches.append(copies)
+    return batches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare structural GUID remapping with JSON string replacement')
+    parser.add_argument('-n', '--items', type=int, default=2000, help='Number of wired items to copy')
+    parser.add_argument('-c', '--connections', type=int, default=3, help='Number of connections per item')
+    parser.add_argument('-t', '--tiles', type=int, default=20, help='Number of copies made by the batch')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Number of repetitions (best is reported)')
+    args = parser.parse_args()
+
+    save = Suitebro('CondoData', '.', make_save_data(args.items))
+    suitebro._active_save = save
+    items = [obj for obj in save.objects if obj.has_item()][:args.items]
+    _wire(items, args.connections)
+    selection = Selection(items)
+    offsets = np.arange(1, args.tiles + 1, dtype=np.float64)[:, np.newaxis] * np.array([100.0, 0.0, 0.0])
+
+    timings = {
+        'copy (legacy JSON replace)': lambda: _legacy_copy(selection),
+        'copy (structural)': lambda: copy_selection(selection),
+        f'{args.tiles} copies (repeated)': lambda: _repeated_copy(selection, offsets),
+        f'{args.tiles} copies (batch)': lambda: copy_selection_batch(selection, offsets),
+    }
+
+    print(f'{len(selection):,} items with {args.connections} connections each')
+    for name, func in timings.items():
+        print(f'{name:<28}{best_of(args.repeat, func) * 1000:>9.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark: undo/redo journal vs. snapshotting the save data with a deep copy
+
+Usage: python -m benchmarks.bench_journal [-n ITEMS] [-m MODIFIED] [-r REPEAT]
+"""
+import argparse
+import copy
+
+from pytower.selection import Selection
+from pytower.suitebro import Suitebro
+from pytower.tool_lib import ParameterDict
+from pytower.tools import rotate
+from pytower.util import xyz
+
+from .synthetic import make_save_data
+from .timing import best_of
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare journal checkpoints and undo with deep copies of the save')
+    parser.add_argument('-n', '--items', type=int, default=100000, help='Number of items in the synthetic save')
+    parser.add_argument('-m', '--modified', type=int, default=1000, help='Number of items renamed by the edit')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Number of repetitions (best is reported)')
+    args = parser.parse_args()
+
+    save = Suitebro('CondoData', '.', make_save_data(args.items))
+    items = [obj for obj in save.objects if obj.has_item()]
+    selection = Selection(items)
+    renamed = items[:args.modified]
+    rotation = xyz(0, 0, 90)
+
+    def edit():
+        # Rotates every item and renames some of them
+        rotate.main(save, selection, ParameterDict(rotation=rotation, local=False))
+        for obj in renamed:
+            obj.set_custom_name('Renamed')
+
+    data = save.to_dict()
+    save.transforms
+    save.checkpoint()
+    timings = {
+        'deep copy of save data': lambda: copy.deepcopy(data),
+        'edit (no checkpoint)': edit,
+        'edit + checkpoint': lambda: (edit(), save.checkpoint()),
+        'undo': save.undo,
+        'redo': save.redo,
+    }
+
+    print(f'{len(items):,} items, {len(renamed):,} renamed by each edit')
+    for name, func in timings.items():
+        print(f'{name:<26}{best_of(args.repeat, func) * 1000:>9.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark: name and regex selectors on the inverted name index vs. testing every object
+
+Usage: python -m benchmarks.bench_names [-n ITEMS] [-r REPEAT]
+"""
+import argparse
+import re
+
+from pytower import suitebro
+from pytower.selection import ObjectNameSelector, RegexSelector, Selection
+from pytower.suitebro import Suitebro
+
+from .synthetic import make_save_data
+from .timing import best_of
+
+
+def _legacy_name(everything: Selection, name: str) -> Selection:
+    # Name matching as previously implemented by ObjectNameSelector
+    name = name.casefold()
+    return Selection({obj for obj in everything if obj.get_name().casefold() == name})
+
+
+def _legacy_regex(everything: Selection, pattern: str) -> Selection:
+    # Pattern matching as previously implemented by RegexSelector
+    compiled = re.compile(pattern.casefold())
+    return Selection({obj for obj in everything if compiled.match(obj.get_name().casefold())
+                      or compiled.match(obj.get_custom_name().casefold())})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare indexed name selectors with testing every object')
+    parser.add_argument('-n', '--items', type=int, default=500000, help='Number of items in the synthetic save')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Number of repetitions (best is reported)')
+    args = parser.parse_args()
+
+    save = Suitebro('CondoData', '.', make_save_data(args.items))
+    suitebro._active_save = save
+    everything = Selection(save.objects)
+    name = save.objects[0].get_name()
+    pattern = name[:4] + '.*'
+
+    if ObjectNameSelector(name).select(everything) != _legacy_name(everything, name) or \
+            RegexSelector(pattern).select(everything) != _legacy_regex(everything, pattern):
+        raise RuntimeError('Indexed selectors disagree with the legacy selectors')
+
+    timings = {
+        f'objname:{name} (legacy)': lambda: _legacy_name(everything, name),
+        f'objname:{name} (index)': lambda: ObjectNameSelector(name).select(everything),
+        f'regex:{pattern} (legacy)': lambda: _legacy_regex(everything, pattern),
+        f'regex:{pattern} (index)': lambda: RegexSelector(pattern).select(everything),
+    }
+
+    print(f'{len(everything):,} objects')
+    for label, func in timings.items():
+        print(f'{label:<36}{best_of(args.repeat, func) * 1000:>9.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark: TowerObject memory use and cached derived fields
+
+Usage: python -m benchmarks.bench_object [-n ITEMS] [-r REPEAT]
+
+Reports the memory taken by the TowerObject wrappers themselves (not the sections they wrap), and the time taken by
+common selector operations with cold caches (derived fields computed from the sections) and warm caches.
+"""
+import argparse
+import tracemalloc
+
+from pytower.object import TowerObject
+from pytower.selection import Selection, GroupSelector, ObjectNameSelector, CustomNameSelector
+from pytower.suitebro import Suitebro
+
+from .synthetic import make_save_data
+from .timing import best_of
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure TowerObject memory use and selector time')
+    parser.add_argument('-n', '--items', type=int, default=100000, help='Number of items in the synthetic save')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Number of repetitions (best is reported)')
+    args = parser.parse_args()
+
+    data = make_save_data(args.items)
+    save = Suitebro('CondoData', '.', data)
+    objects = save.objects
+    sections = [(obj.item, obj.properties) for obj in objects]
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    wrappers = [TowerObject(item=item, properties=properties, nocopy=True) for item, properties in sections]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Exclude the list holding the wrappers
+    per_object = (after - before - wrappers.__sizeof__()) / len(wrappers)
+    del wrappers
+
+    everything = Selection(objects)
+
+    def invalidate():
+        for obj in objects:
+            obj.invalidate()
+
+    operations = {
+        'GroupSelector': lambda: GroupSelector(0).select(everything),
+        'ObjectNameSelector': lambda: ObjectNameSelector('CanvasCube').select(everything),
+        'CustomNameSelector': lambda: CustomNameSelector('').select(everything),
+        'Selection.groups': everything.groups,
+        'Suitebro.item_count': save.item_count,
+        'is_canvas': lambda: [obj.is_canvas() for obj in objects],
+    }
+
+    print(f'{len(objects):,} objects')
+    print(f'TowerObject size: {per_object:.0f} bytes per object')
+    print(f'{"operation":<22}{"cold":>12}{"cached":>12}')
+    for name, func in operations.items():
+        cold = best_of(args.repeat, func, setup=invalidate)
+        func()
+        warm = best_of(args.repeat, func)
+        print(f'{name:<22}{cold * 1000:>10.1f}ms{warm * 1000:>10.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark: bulk URL replacement with a canvas index vs. one ReplaceURL pass per URL
+
+Usage: python -m benchmarks.bench_replace [-n ITEMS] [-u URLS] [-r REPEAT]
+"""
+import argparse
+
+from pytower.canvas import CanvasIndex
+from pytower.suitebro import Suitebro
+
+from .synthetic import make_save_data
+from .timing import best_of
+
+
+def _legacy_replace_url(objects, old_url: str, new_url: str):
+    # ReplaceURL as previously implemented, which backup.restore_backup called once per URL
+    selection = {obj for obj in objects
+                 if obj.is_canvas() and obj.properties['properties']['URL']['Str']['value'] == old_url}
+    for obj in selection:
+        if obj.item is None or obj.properties is None:
+            continue
+        item_props = obj.item['properties']
+        if 'SurfaceMaterial' in item_props:
+            del item_props['SurfaceMaterial']
+        item_props['URL'] = {'Str': {'value': new_url}}
+        obj.properties['properties']['SurfaceMaterial'] = {'Object': {'value': ''}}
+        obj.properties['properties']['URL'] = {'Str': {'value': new_url}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare bulk URL replacement with one replacement pass per URL')
+    parser.add_argument('-n', '--items', type=int, default=20000, help='Number of items in the synthetic save')
+    parser.add_argument('-u', '--urls', type=int, default=200, help='Number of URLs to replace')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Number of repetitions (best is reported)')
+    args = parser.parse_args()
+
+    data = make_save_data(args.items)
+    saves = []
+
+    def load():
+        saves[:] = [Suitebro('CondoData', '.', data)]
+
+    load()
+    canvases = [obj for obj in saves[0].objects if obj.has_item() and obj.is_canvas()]
+    mapping = {obj.get_url(): f'https://files.catbox.moe/{i:06d}.png' for i, obj in enumerate(canvases[:args.urls])}
+
+    def legacy():
+        objects = saves[0].objects
+        for old_url, new_url in mapping.items():
+            _legacy_replace_url(objects, old_url, new_url)
+
+    timings = {
+        'one pass per URL': legacy,
+        'canvas index': lambda: CanvasIndex(saves[0].objects).replace_urls(mapping),
+    }
+
+    print(f'{args.items:,} items, {len(canvases):,} canvases, {len(mapping):,} URLs replaced')
+    for name, func in timings.items():
+        print(f'{name:<20}{best_of(args.repeat, func, setup=load) * 1000:>9.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark: sampling selectors (take, percent, random) vs. shuffling the whole selection
+
+Usage: python -m benchmarks.bench_sample [-n ITEMS] [-r REPEAT]
+"""
+import argparse
+import random
+
+from pytower.selection import ObjectColumns, PercentSelector, RandomSelector, Selection, TakeSelector
+from pytower.suitebro import Suitebro
+
+from .synthetic import make_save_data
+from .timing import best_of
+
+
+def _legacy_take(everything: Selection, number: int) -> Selection:
+    # Sampling as previously implemented by TakeSelector and PercentSelector
+    sequence = list(everything)
+    random.shuffle(sequence)
+    return Selection(sequence[0:number])
+
+
+def _legacy_random(everything: Selection, probability: float) -> Selection:
+    # Sampling as previously implemented by RandomSelector
+    return Selection({obj for obj in everything if random.uniform(0, 1) <= probability})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare vectorized sampling selectors with shuffling')
+    parser.add_argument('-n', '--items', type=int, default=500000, help='Number of items in the synthetic save')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Number of repetitions (best is reported)')
+    args = parser.parse_args()
+
+    save = Suitebro('CondoData', '.', make_save_data(args.items))
+    everything = Selection(save.objects)
+    columns = ObjectColumns(save.objects)
+    within = columns.everything()
+    number = len(everything) // 100
+
+    take = TakeSelector(number, seed=0)
+    if take.mask(columns, within).tolist() != take.mask(columns, within).tolist():
+        raise RuntimeError('Seeded sampling is not reproducible')
+
+    timings = {
+        'take 1% (legacy shuffle)': lambda: _legacy_take(everything, number),
+        'take 1% (mask)': lambda: take.mask(columns, within),
+        'percent 1% (mask)': lambda: PercentSelector(1, seed=0).mask(columns, within),
+        'random 1% (legacy uniform)': lambda: _legacy_random(everything, 0.01),
+        'random 1% (mask)': lambda: RandomSelector(0.01, seed=0).mask(columns, within),
+        'take 1% (Selection)': lambda: take.select(everything),
+        'random 1% (Selection)': lambda: RandomSelector(0.01, seed=0).select(everything),
+    }
+
+    print(f'{len(everything):,} objects, sampling {number:,}')
+    for name, func in timings.items():
+        print(f'{name:<28}{best_of(args.repeat, func) * 1000:>9.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark: object ordering with precomputed sort keys vs. comparison-based sorting
+
+Usage: python -m benchmarks.bench_sort [-n ITEMS] [-r REPEAT]
+"""
+import argparse
+import random
+import time
+
+from pytower.object import TowerObject
+from pytower.suitebro import Suitebro
+
+from .synthetic import make_save_data
+from .timing import best_of
+
+
+class _LegacyKey:
+    # Ordering as previously implemented by TowerObject.__lt__, which looked up and compared names on every comparison
+    __slots__ = ('obj',)
+
+    def __init__(self, obj: TowerObject):
+        self.obj = obj
+
+    def __lt__(self, other: '_LegacyKey') -> bool:
+        self_item, self_props = self.obj.sections()
+        other_item, other_props = other.obj.sections()
+        if self_item is None and other_item is None:
+            if self_props['name'].startswith('CondoWeather'):
+                return True
+            elif self_props['name'].startswith('CondoSettingsManager'):
+                return not other_props['name'].startswith('CondoWeather')
+            elif self_props['name'].startswith('Ultra_Dynamic_Sky'):
+                return (not other_props['name'].startswith('CondoWeather')) and \
+                    (not other_props['name'].startswith('CondoSettingsManager'))
+            return self_props['name'] < other_props['name']
+        if self_item is None:
+            return True
+        if other_item is None:
+            return False
+        return self_item['name'] < other_item['name']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare sort key ordering with comparison-based ordering')
+    parser.add_argument('-n', '--items', type=int, default=100000, help='Number of items in the synthetic save')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Number of repetitions (best is reported)')
+    args = parser.parse_args()
+
+    save = Suitebro('CondoData', '.', make_save_data(args.items))
+    objects = list(save.objects)
+    random.Random(0).shuffle(objects)
+
+    legacy_order = sorted(objects, key=_LegacyKey)
+    if sorted(objects, key=TowerObject.sort_key) != legacy_order:
+        raise RuntimeError('Sort key order differs from the comparison-based order')
+
+    def invalidate():
+        for obj in objects:
+            obj.invalidate()
+
+    legacy = best_of(args.repeat, lambda: sorted(objects, key=_LegacyKey))
+    cold = best_of(args.repeat, lambda: sorted(objects, key=TowerObject.sort_key), setup=invalidate)
+    warm = best_of(args.repeat, lambda: sorted(objects, key=TowerObject.sort_key))
+    resort = best_of(args.repeat, lambda: sorted(legacy_order, key=TowerObject.sort_key))
+
+    # Adding a small batch of copies to an already sorted save
+    batch = [obj.copy() for obj in objects[:max(1, len(objects) // 1000)]]
+
+    def add_batch():
+        sorted_save = Suitebro('CondoData', '.', save.to_dict())
+        sorted_save.to_dict()
+        start = time.perf_counter()
+        sorted_save.add_objects([obj.copy() for obj in batch])
+        sorted_save.objects.sort(key=TowerObject.sort_key)
+        return time.perf_counter() - start
+
+    add = min(add_batch() for _ in range(args.repeat))
+
+    print(f'{len(objects):,} objects')
+    print(f'comparison sort (legacy):     {legacy * 1000:>9.1f}ms')
+    print(f'sort key, keys computed:      {cold * 1000:>9.1f}ms')
+    print(f'sort key, keys cached:        {warm * 1000:>9.1f}ms')
+    print(f'sort key, already sorted:     {resort * 1000:>9.1f}ms')
+    print(f'add {len(batch):,} objects + re-sort:   {add * 1000:>9.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
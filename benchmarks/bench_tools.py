@@ -0,0 +1,98 @@
+"""Benchmark: Translate, Scale, Center and Rotate tools on TransformBatch vs. per-object property access
+
+Usage: python -m benchmarks.bench_tools [-n ITEMS] [-r REPEAT]
+"""
+import argparse
+
+from scipy.spatial.transform import Rotation as R
+
+from pytower.selection import Selection
+from pytower.suitebro import Suitebro
+from pytower.tool_lib import ParameterDict
+from pytower.tools import center, rotate, scale, translate
+from pytower.util import xyz
+
+from .synthetic import make_save_data
+from .timing import best_of
+
+
+def _legacy_translate(selection: Selection, offset, local: bool):
+    # Translate as previously implemented
+    if not local:
+        for obj in selection:
+            obj.position += offset
+        return
+
+    std_basis = [xyz(1, 0, 0), xyz(0, 1, 0), xyz(0, 0, 1)]
+    for obj in selection:
+        r = R.from_quat(obj.rotation)
+        xlocal, ylocal, zlocal = [r.apply(basis_vec) for basis_vec in std_basis]
+        obj.position += offset[0] * xlocal + offset[1] * ylocal + offset[2] * zlocal
+
+
+def _legacy_scale(selection: Selection, scale: float):
+    # Scale (around the centroid) as previously implemented
+    centroid = sum([obj.position for obj in selection]) / len(selection)
+    for obj in selection:
+        obj.position -= centroid
+    for obj in selection:
+        obj.position *= scale
+        obj.scale *= scale
+    for obj in selection:
+        obj.position += centroid
+
+
+def _legacy_center(selection: Selection, offset):
+    # Center as previously implemented
+    centroid = sum([obj.position for obj in selection]) / len(selection)
+    for obj in selection:
+        obj.position -= centroid
+        obj.position += offset
+
+
+def _legacy_rotate(selection: Selection, rotation):
+    # Rotate (around the centroid) as previously implemented
+    r = R.from_euler('xyz', rotation, degrees=True)
+    centroid = sum([obj.position for obj in selection]) / len(selection)
+    for obj in selection:
+        obj.rotation = (r * R.from_quat(obj.rotation)).as_quat()
+        obj.position -= centroid
+        obj.position = r.apply(obj.position)
+        obj.position += centroid
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare vectorized transform tools with per-object loops')
+    parser.add_argument('-n', '--items', type=int, default=100000, help='Number of items in the synthetic save')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Number of repetitions (best is reported)')
+    args = parser.parse_args()
+
+    save = Suitebro('CondoData', '.', make_save_data(args.items))
+    selection = Selection([obj for obj in save.objects if obj.has_item()])
+    offset = xyz(10, 20, 30)
+    rotation = xyz(0, 0, 90)
+
+    # Both variants run on the transform table of the save, which is created on the first access
+    table_time = best_of(1, lambda: save.transforms)
+    timings = {
+        'translate (legacy)': lambda: _legacy_translate(selection, offset, False),
+        'translate (batch)': lambda: translate.main(save, selection, ParameterDict(offset=offset, local=False)),
+        'translate local (legacy)': lambda: _legacy_translate(selection, offset, True),
+        'translate local (batch)': lambda: translate.main(save, selection, ParameterDict(offset=offset, local=True)),
+        'scale (legacy)': lambda: _legacy_scale(selection, 1.0),
+        'scale (batch)': lambda: scale.main(save, selection, ParameterDict(scale=1.0)),
+        'center (legacy)': lambda: _legacy_center(selection, offset),
+        'center (batch)': lambda: center.main(save, selection, ParameterDict(offset=offset)),
+        'rotate (legacy)': lambda: _legacy_rotate(selection, rotation),
+        'rotate (batch)': lambda: rotate.main(save, selection, ParameterDict(rotation=rotation, local=False)),
+        'rotate per group (batch)': lambda: rotate.main(save, selection, ParameterDict(rotation=rotation, local=False,
+                                                                                       pivot='group')),
+    }
+
+    print(f'{len(selection):,} items, transform table created in {table_time * 1000:.1f}ms')
+    for name, func in timings.items():
+        print(f'{name:<28}{best_of(args.repeat, func) * 1000:>9.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Synthetic save generator used by the benchmarks
+
+Builds a save dictionary shaped like the output of tower-unite-suitebro: canvases and furniture items with tinyrick
+properties, a matching property list per item, and the property-only objects found in every condo.
+"""
+import random
+import uuid
+
+ZERO_GUID = '00000000-0000-0000-0000-000000000000'
+
+ITEM_NAMES = ['CanvasWedge', 'CanvasCube', 'CanvasCylinder', 'CanvasSphere', 'CanvasFlat', 'Chair', 'Table',
+              'Lamp', 'Couch', 'Plant']
+PROPERTY_ONLY_NAMES = ['CondoWeather_2729', 'CondoSettingsManager_2', 'Ultra_Dynamic_Sky_C_1']
+
+
+def _vector(x: float, y: float, z: float) -> dict:
+    return {'Struct': {'value': {'Vector': {'x': x, 'y': y, 'z': z}}, 'struct_type': 'Vector',
+                       'struct_id': ZERO_GUID}}
+
+
+def _respawn_location(rotation: dict, position: dict, scale: dict) -> dict:
+    transform = {
+        'Rotation': {'Struct': {'value': {'Quat': dict(rotation)}, 'struct_type': 'Quat', 'struct_id': ZERO_GUID}},
+        'Translation': _vector(position['x'], position['y'], position['z']),
+        'Scale3D': _vector(scale['x'], scale['y'], scale['z'])
+    }
+    return {'Struct': {'value': {'Struct': transform}, 'struct_type': {'Struct': 'Transform'},
+                       'struct_id': ZERO_GUID}}
+
+
+def _shared_properties(rng: random.Random, name: str, index: int, group_id: int, rotation: dict, position: dict,
+                       scale: dict) -> dict:
+    props = {}
+    if name.startswith('Canvas'):
+        props['URL'] = {'Str': {'value': f'https://i.imgur.com/{index:07d}.png'}}
+        color = {channel: rng.randint(0, 256) / 256 for channel in 'rgb'}
+        color['a'] = 1.0
+        props['Color'] = {'Struct': {'value': {'LinearColor': color}, 'struct_type': 'LinearColor',
+                                     'struct_id': ZERO_GUID}}
+    if rng.random() < 0.1:
+        props['ItemCustomName'] = {'Name': {'value': f'{name} {index}'}}
+    if group_id >= 0:
+        props['GroupID'] = {'Int': {'value': group_id}}
+    props['WorldScale'] = _vector(scale['x'], scale['y'], scale['z'])
+    props['RespawnLocation'] = _respawn_location(rotation, position, scale)
+    return props
+
+
+def make_save_data(num_items: int, group_size: int = 8, grouped_fraction: float = 0.5, seed: int = 0) -> dict:
+    """Generates a save dictionary in the tower-unite-suitebro format
+
+    Args:
+        num_items: Number of items to place in the save
+        group_size: Number of items in each group
+        grouped_fraction: Fraction of items which are grouped
+        seed: Seed for the random number generator
+
+    Returns:
+        Save dictionary, as loaded from tower-unite-suitebro's to-json output
+    """
+    rng = random.Random(seed)
+    items = []
+    properties = []
+
+    num_grouped = int(num_items * grouped_fraction)
+    for index in range(num_items):
+        name = rng.choice(ITEM_NAMES)
+        group_id = index // group_size if index < num_grouped else -1
+
+        # Round to values representable as f32 so data survives a round trip through CondoData unchanged
+        rotation = {'x': 0.0, 'y': 0.0, 'z': rng.choice([0.0, 0.5, -0.5]), 'w': 1.0}
+        position = {axis: float(rng.randint(-50000, 50000)) / 4 for axis in 'xyz'}
+        scale = {axis: float(rng.randint(1, 16)) / 4 for axis in 'xyz'}
+
+        shared = _shared_properties(rng, name, index, group_id, rotation, position, scale)
+        item_props = {'OwningSteamID': {'Struct': {'value': {'Struct': {}}, 'struct_type': {'Struct': 'SteamID'},
+                                                   'struct_id': ZERO_GUID}}}
+        item_props.update(shared)
+
+        items.append({'name': name, 'guid': str(uuid.UUID(int=rng.getrandbits(128))),
+                      'steam_item_id': 76561197960265728 + rng.getrandbits(24), 'format_version': 1,
+                      'unreal_version': 517, 'properties': item_props, 'actors': [], 'rotation': rotation,
+                      'position': position, 'scale': scale})
+        properties.append({'name': f'{name}_C_{index}', 'properties': dict(shared)})
+
+    for name in PROPERTY_ONLY_NAMES:
+        properties.append({'name': name, 'properties': {'Enabled': {'Bool': {'value': True}}}})
+
+    return {'header': {'format_version': 1, 'unreal_version': 517}, 'items': items, 'properties': properties,
+            'groups': []}
@@ -0,0 +1,23 @@
+"""Timing helper shared by the benchmarks"""
+import time
+
+
+def best_of(repeat: int, func, setup=None) -> float:
+    """Times a function several times and keeps the fastest run
+
+    Args:
+        repeat: Number of runs
+        func: The function to time
+        setup: Function called before every run, outside of the timing
+
+    Returns:
+        Duration of the fastest run in seconds
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
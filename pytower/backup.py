@@ -11,13 +11,12 @@ from threading import Lock
 from colorama import Fore, Back, Style
 
 from .__config__ import root_directory, __version__
+from .canvas import CanvasIndex
 from .config import KEY_INSTALL_PATH
 from .image_backends.catbox import CatboxBackend
 from .image_backends.imgur import ImgurBackend
 from .suitebro import Suitebro, load_suitebro, save_suitebro
-from .tool_lib import ParameterDict
 from .util import dict_walk
-from .tools import replace_url
 
 
 PRINT_LOCK = Lock()
@@ -178,8 +177,8 @@ def make_backup(save: Suitebro) -> str:
                 urls.add(v['Str']['value'])
 
     for obj in save.objects:
-        dict_walk(obj.item, url_processor)
-        dict_walk(obj.properties, url_processor)
+        for section in obj.sections():
+            dict_walk(section, url_processor)
 
     # Process URLs further
     urls = {url.strip() for url in urls if url.strip() != ''}
@@ -283,10 +282,8 @@ def restore_backup(path, force_reupload=False, backend=CatboxBackend()):
     # Now get the backed-up save
     save = load_suitebro(index.filename)
 
-    # Big URL replacement
-    for old_url, new_url in url_replacements.items():
-        params = ParameterDict({'replace': old_url, 'url': new_url})
-        replace_url.main(save, save.objects, params)
+    # Big URL replacement, in a single pass over the canvases showing the replaced URLs
+    CanvasIndex(save.objects).replace_urls(url_replacements)
 
     # Now save to original file location
     save_suitebro(save, index.original_path)
@@ -0,0 +1,179 @@
+"""Parsed save cache
+
+On-disk cache of parsed saves, keyed by the content hash of the CondoData/.map file. The size and modification time of
+each file seen is remembered as well, so that unchanged files can be looked up without hashing them again. Entries are
+stored as pickles, which load several times faster than parsing the save again, and the least recently used entries
+are evicted once the cache grows past its size limit.
+"""
+import gc
+import hashlib
+import json
+import logging
+import os
+import pickle
+import time
+
+from .__config__ import root_directory
+
+CACHE_DIR = os.path.join(root_directory, 'cache')
+CACHE_INDEX_NAME = 'index.json'
+
+# Bump whenever the format of the cached data changes, invalidating all existing entries
+CACHE_FORMAT = 1
+
+DEFAULT_CACHE_SIZE = 1 << 30  # 1 GiB
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def get_cache_size() -> int:
+    from .config import CONFIG, KEY_CACHE_SIZE
+    if CONFIG:
+        size = CONFIG.get(KEY_CACHE_SIZE, int)
+        if size is not None:
+            return size
+    return DEFAULT_CACHE_SIZE
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as fd:
+        while chunk := fd.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SaveCache:
+    """Cache of parsed saves
+
+    Attributes:
+        directory: Directory containing the cache index and entries
+        max_size: Maximum total size of the cache entries in bytes
+    """
+    def __init__(self, directory: str = CACHE_DIR, max_size: int | None = None):
+        """Opens the cache in the given directory, creating it if necessary
+
+        Args:
+            directory: Directory to store the cache in
+            max_size: Maximum total size of the cache entries in bytes (defaults to the configured cache size)
+        """
+        self.directory = directory
+        self.max_size = get_cache_size() if max_size is None else max_size
+        self.index_path = os.path.join(directory, CACHE_INDEX_NAME)
+        self._index = self._load_index()
+
+    def _load_index(self) -> dict:
+        try:
+            with open(self.index_path, 'r') as fd:
+                index = json.load(fd)
+        except (OSError, json.JSONDecodeError):
+            index = None
+
+        if index is None or index.get('format') != CACHE_FORMAT:
+            index = {'format': CACHE_FORMAT, 'files': {}, 'entries': {}}
+        return index
+
+    def _save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as fd:
+            json.dump(self._index, fd)
+        os.replace(tmp_path, self.index_path)
+
+    def _entry_path(self, content_hash: str) -> str:
+        return os.path.join(self.directory, f'{content_hash}.pickle')
+
+    def _content_hash(self, path: str) -> str:
+        # Only hash the file if it changed since it was last seen
+        stat = os.stat(path)
+        files = self._index['files']
+        record = files.get(path)
+        if record is not None and record['size'] == stat.st_size and record['mtime_ns'] == stat.st_mtime_ns:
+            return record['hash']
+
+        content_hash = hash_file(path)
+        files[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': content_hash}
+        return content_hash
+
+    def _remove_entry(self, content_hash: str):
+        self._index['entries'].pop(content_hash, None)
+        try:
+            os.remove(self._entry_path(content_hash))
+        except OSError:
+            pass
+
+    def _evict(self):
+        entries = self._index['entries']
+        total_size = sum(entry['size'] for entry in entries.values())
+        for content_hash in sorted(entries, key=lambda h: entries[h]['last_used']):
+            if total_size <= self.max_size:
+                break
+            total_size -= entries[content_hash]['size']
+            self._remove_entry(content_hash)
+
+        # Forget files whose contents are no longer cached
+        files = self._index['files']
+        for path in [path for path, record in files.items() if record['hash'] not in entries]:
+            del files[path]
+
+    def load(self, path: str) -> dict | None:
+        """Loads the cached parse of the given save file
+
+        Args:
+            path: Path to the CondoData/.map file
+
+        Returns:
+            The parsed save data, or None if the file is not cached
+        """
+        path = os.path.realpath(path)
+        content_hash = self._content_hash(path)
+        entry = self._index['entries'].get(content_hash)
+        if entry is None:
+            return None
+
+        # Unpickling only creates new objects, so pause the cyclic garbage collector while it runs
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(self._entry_path(content_hash), 'rb') as fd:
+                data = pickle.load(fd)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logging.warning(f'Discarding corrupt cache entry for {path}: {e}')
+            self._remove_entry(content_hash)
+            self._save_index()
+            return None
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        entry['last_used'] = time.time()
+        self._save_index()
+        return data
+
+    def store(self, path: str, data: dict):
+        """Stores the parsed save data for the given save file
+
+        Args:
+            path: Path to the CondoData/.map file that data was parsed from
+            data: The parsed save data, as loaded from tower-unite-suitebro
+        """
+        path = os.path.realpath(path)
+        content_hash = self._content_hash(path)
+
+        os.makedirs(self.directory, exist_ok=True)
+        entry_path = self._entry_path(content_hash)
+        tmp_path = entry_path + '.tmp'
+        with open(tmp_path, 'wb') as fd:
+            pickle.dump(data, fd, protocol=5)
+        os.replace(tmp_path, entry_path)
+
+        self._index['entries'][content_hash] = {'size': os.path.getsize(entry_path), 'last_used': time.time()}
+        self._evict()
+        self._save_index()
+
+    def clear(self):
+        """Removes every entry from the cache"""
+        for content_hash in list(self._index['entries']):
+            self._remove_entry(content_hash)
+        self._index['files'].clear()
+        self._save_index()
@@ -0,0 +1,172 @@
+"""Canvas index
+
+Maps the materials and image URLs of a collection of canvases to the canvases showing them, so that a whole table of
+replacements is applied in a single pass over the matching canvases, instead of one pass over every object per
+replacement.
+"""
+import csv
+import json
+import os
+from typing import Iterable
+
+from .object import TowerObject
+
+# Material, URL and additional URLs of an indexed canvas
+CanvasKeys = tuple[str | None, str | None, tuple[str, ...]]
+
+
+def load_mapping(path: str) -> dict[str, str]:
+    """Loads a table of replacements from a file
+
+    JSON files hold a single object mapping old values to new ones. Any other file is read as CSV with one old,new pair
+    per row, where a first row of old,new is skipped as a header and blank rows are ignored.
+
+    Args:
+        path: Path of the file
+
+    Returns:
+        Dictionary mapping old values to new ones
+    """
+    if os.path.splitext(path)[1].casefold() == '.json':
+        with open(path, 'r', encoding='utf-8') as fd:
+            mapping = json.load(fd)
+        if not isinstance(mapping, dict) or not all(isinstance(value, str) for value in mapping.values()):
+            raise ValueError(f'{path} must hold a JSON object mapping strings to strings')
+        return mapping
+
+    mapping = {}
+    with open(path, 'r', encoding='utf-8', newline='') as fd:
+        for line_num, row in enumerate(csv.reader(fd), start=1):
+            if not row or not ''.join(row).strip():
+                continue
+            if len(row) != 2:
+                raise ValueError(f'{path}, line {line_num}: expected 2 columns (old,new), got {len(row)}')
+            old, new = (value.strip() for value in row)
+            if line_num == 1 and (old.casefold(), new.casefold()) == ('old', 'new'):
+                continue
+            mapping[old] = new
+    return mapping
+
+
+class CanvasIndex:
+    """Index of canvases by material, URL and additional URL
+
+    Empty values are indexed as well: a canvas showing an image has an empty material and one showing a material has an
+    empty URL. Replacements are looked up once for every canvas, so chained mappings such as a->b and b->c move the
+    canvases showing a to b and the canvases showing b to c.
+
+    The index stays up to date through its replace methods, but not through changes made to the canvases otherwise.
+
+    Attributes:
+        materials: Canvases by material
+        urls: Canvases by URL
+        additional_urls: Canvases by each of their additional URLs
+    """
+    def __init__(self, objects: Iterable[TowerObject]):
+        """Indexes the canvases among the given objects
+
+        Args:
+            objects: The objects to index, where anything but canvases is skipped
+        """
+        self.materials: dict[str, dict[TowerObject, None]] = {}
+        self.urls: dict[str, dict[TowerObject, None]] = {}
+        self.additional_urls: dict[str, dict[TowerObject, None]] = {}
+        self._keys: dict[TowerObject, CanvasKeys] = {}
+        for obj in objects:
+            item, properties = obj.sections()
+            if item is not None and properties is not None and obj.is_canvas():
+                self._index_canvas(obj)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _index_canvas(self, obj: TowerObject):
+        material = obj.get_material()
+        url = obj.get_url()
+        additional_urls = tuple(dict.fromkeys(obj.get_additional_urls()))
+        self._keys[obj] = material, url, additional_urls
+
+        if material is not None:
+            self.materials.setdefault(material, {})[obj] = None
+        if url is not None:
+            self.urls.setdefault(url, {})[obj] = None
+        for additional_url in additional_urls:
+            self.additional_urls.setdefault(additional_url, {})[obj] = None
+
+    def _unindex_canvas(self, obj: TowerObject):
+        material, url, additional_urls = self._keys.pop(obj)
+        indexes = (self.materials, (material,)), (self.urls, (url,)), (self.additional_urls, additional_urls)
+        for index, keys in indexes:
+            for key in keys:
+                matches = index.get(key)
+                if matches is not None:
+                    matches.pop(obj, None)
+                    if not matches:
+                        del index[key]
+
+    @staticmethod
+    def _pop_matches(index: dict[str, dict[TowerObject, None]], mapping: dict[str, str]) -> dict[TowerObject, str]:
+        # Takes the canvases whose key is replaced out of the index, with their replacement. Every canvas is matched
+        #  before any is changed, which keeps chained mappings from being applied twice
+        matches = {}
+        for old, new in mapping.items():
+            if old in index:
+                matches.update(dict.fromkeys(index.pop(old), new))
+        return matches
+
+    def _replace(self, materials: dict[TowerObject, str], urls: dict[TowerObject, str],
+                 additional_urls: dict[TowerObject, str], mapping: dict[str, str]) -> int:
+        # Changes the canvases matched by _pop_matches and indexes them again
+        changed = materials | urls | additional_urls
+        for obj in changed:
+            self._unindex_canvas(obj)
+            if obj in materials:
+                obj.set_material(materials[obj])
+            if obj in urls:
+                obj.set_url(urls[obj])
+            if obj in additional_urls:
+                obj.set_additional_urls([mapping.get(url, url) for url in obj.get_additional_urls()])
+            self._index_canvas(obj)
+        return len(changed)
+
+    def replace_materials(self, mapping: dict[str, str]) -> int:
+        """Replaces the materials of the indexed canvases
+
+        Args:
+            mapping: New material of every material to replace
+
+        Returns:
+            Number of canvases changed
+        """
+        return self._replace(self._pop_matches(self.materials, mapping), {}, {}, mapping)
+
+    def replace_urls(self, mapping: dict[str, str], additional_urls: bool = False) -> int:
+        """Replaces the URLs of the indexed canvases
+
+        Args:
+            mapping: New URL of every URL to replace
+            additional_urls: Whether to replace matching additional URLs (AdditionalURLs) as well
+
+        Returns:
+            Number of canvases changed
+        """
+        additional_matches = self._pop_matches(self.additional_urls, mapping) if additional_urls else {}
+        return self._replace({}, self._pop_matches(self.urls, mapping), additional_matches, mapping)
+
+    def replace(self, mapping: dict[str, str], additional_urls: bool = False) -> int:
+        """Replaces materials and URLs of the indexed canvases from one table
+
+        Empty values are not replaced, since every canvas has an empty material or an empty URL, so they would match
+        canvases of both kinds. Use replace_materials or replace_urls to replace them.
+
+        Args:
+            mapping: Replacement of every material or URL to replace
+            additional_urls: Whether to replace matching additional URLs (AdditionalURLs) as well
+
+        Returns:
+            Number of canvases changed
+        """
+        mapping = {old: new for old, new in mapping.items() if old}
+        additional_matches = self._pop_matches(self.additional_urls, mapping) if additional_urls else {}
+        return self._replace(self._pop_matches(self.materials, mapping), self._pop_matches(self.urls, mapping),
+                             additional_matches, mapping)
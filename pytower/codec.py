@@ -0,0 +1,1010 @@
+"""Native CondoData/.map codec
+
+In-process reader/writer for the binary format handled by tower-unite-suitebro. Decoding produces exactly the dict that
+``json.load`` returns for the parser's ``to-json`` output, and encoding produces the same bytes as the parser's
+``to-save`` command, so the two paths can be used interchangeably.
+
+The quirks of the external parser are mirrored on purpose so that results stay identical:
+ - the group table at the end of the file is written but never read back (``groups`` always decodes as ``[]``)
+ - actors are written with a trailing ``u32`` after their property list that the reader does not consume
+ - ``Box`` structs are read with a trailing ``valid`` byte that the writer does not emit
+ - struct keys/values inside maps and sets are assumed to be ``Guid``/``Struct``, and map bytes are read as labels
+"""
+import gc
+import math
+import struct
+
+import numpy as np
+
+_MAGIC = b'suitebro'
+_TINYRICK = b'tinyrick'
+
+_U8 = struct.Struct('<B')
+_I8 = struct.Struct('<b')
+_I16 = struct.Struct('<h')
+_U16 = struct.Struct('<H')
+_I32 = struct.Struct('<i')
+_U32 = struct.Struct('<I')
+_I64 = struct.Struct('<q')
+_U64 = struct.Struct('<Q')
+_F32 = struct.Struct('<f')
+_F64 = struct.Struct('<d')
+_GUID = struct.Struct('<4I')
+_HEADER = struct.Struct('<8sII')
+_TRANSFORM = struct.Struct('<10f')
+_FLOATS = {count: struct.Struct(f'<{count}f') for count in (2, 3, 4, 6)}
+_GROUP = struct.Struct('<II')
+
+_unpack_i32 = _I32.unpack_from
+_unpack_u32 = _U32.unpack_from
+_unpack_u64 = _U64.unpack_from
+
+# Built-in struct types that have a fixed binary layout instead of a nested property list
+_BUILTIN_STRUCTS = {'Guid', 'DateTime', 'Timespan', 'Vector2D', 'Vector', 'Box', 'IntPoint', 'IntVector', 'Quat',
+                    'Rotator', 'LinearColor', 'Color', 'SoftObjectPath', 'GameplayTagContainer', 'WorkshopFile'}
+
+# Fixed-width numeric properties: JSON variant -> (binary property type, struct format)
+_NUMERIC = {'Int8': ('Int8Property', _I8), 'Int16': ('Int16Property', _I16), 'Int': ('IntProperty', _I32),
+            'Int64': ('Int64Property', _I64), 'UInt8': ('UInt8Property', _U8), 'UInt16': ('UInt16Property', _U16),
+            'UInt32': ('UInt32Property', _U32), 'UInt64': ('UInt64Property', _U64),
+            'Float': ('FloatProperty', _F32), 'Double': ('DoubleProperty', _F64)}
+_NUMERIC_BY_TYPE = {ptype: (variant, fmt) for variant, (ptype, fmt) in _NUMERIC.items()}
+
+# Array element formats usable for bulk decoding (the external reader rejects Int8, UInt8 and UInt64 arrays)
+_VEC_FORMATS = {'Int16Property': ('Int16', 'h'), 'IntProperty': ('Int', 'i'), 'Int64Property': ('Int64', 'q'),
+                'UInt16Property': ('UInt16', 'H'), 'UInt32Property': ('UInt32', 'I'),
+                'FloatProperty': ('Float', 'f'), 'DoubleProperty': ('Double', 'd')}
+_VEC_WRITE_FORMATS = {'Int8': 'b', 'Int16': 'h', 'Int': 'i', 'Int64': 'q', 'UInt8': 'B', 'UInt16': 'H', 'UInt32': 'I',
+                      'UInt64': 'Q', 'Float': 'f', 'Double': 'd'}
+_STRING_VECS = {'EnumProperty': 'Enum', 'StrProperty': 'Str', 'NameProperty': 'Name', 'ObjectProperty': 'Object'}
+
+_PROPERTY_TYPES = {'Bool': 'BoolProperty', 'Byte': 'ByteProperty', 'Enum': 'EnumProperty', 'Str': 'StrProperty',
+                   'Name': 'NameProperty', 'Object': 'ObjectProperty', 'FieldPath': 'FieldPathProperty',
+                   'SoftObject': 'SoftObjectProperty', 'Text': 'TextProperty', 'Delegate': 'DelegateProperty',
+                   'MulticastDelegate': 'MulticastDelegateProperty',
+                   'MulticastInlineDelegate': 'MulticastInlineDelegateProperty',
+                   'MulticastSparseDelegate': 'MulticastSparseDelegateProperty', 'Struct': 'StructProperty',
+                   'Array': 'ArrayProperty', 'Set': 'SetProperty', 'Map': 'MapProperty'}
+_PROPERTY_TYPES.update({variant: ptype for variant, (ptype, _) in _NUMERIC.items()})
+
+# FText history types
+_TEXT_NONE = -1
+_TEXT_BASE = 0
+_TEXT_ARGUMENT_FORMAT = 3
+_TEXT_AS_NUMBER = 4
+_TEXT_AS_DATE = 7
+_TEXT_STRING_TABLE_ENTRY = 11
+
+_ARGUMENT_TYPES = ['Int', 'UInt', 'Float', 'Double', 'Text', 'Gender']
+
+
+class CondoDataError(ValueError):
+    """Raised when data cannot be decoded or encoded by the native codec"""
+    pass
+
+
+def _format_guid(a: int, b: int, c: int, d: int) -> str:
+    return f'{a:08x}-{b >> 16:04x}-{b & 0xffff:04x}-{c >> 16:04x}-{c & 0xffff:04x}{d:08x}'
+
+
+def _parse_guid(guid: str) -> tuple[int, int, int, int]:
+    digits = guid.replace('-', '')
+    if len(digits) != 32:
+        raise CondoDataError(f'Invalid GUID: {guid}')
+    return int(digits[:8], 16), int(digits[8:16], 16), int(digits[16:24], 16), int(digits[24:], 16)
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.buf = bytes(data)
+        self.pos = 0
+        self.names = {}
+        self.guids = {}
+        self.float_cache = {}
+
+    def shortest(self, value: float) -> float | None:
+        # tower-unite-suitebro prints most f32 values using their shortest representation (0.1 rather than
+        # 0.10000000149011612), and non-finite values as null, so convert them the same way. Vectors, rotators,
+        # quaternions and item transforms are the exception and keep the exact value of the f32
+        if value == 0.0:
+            return value
+        shortest = self.float_cache.get(value)
+        if shortest is None:
+            shortest = float(str(np.float32(value))) if math.isfinite(value) else None
+            self.float_cache[value] = shortest
+        return shortest
+
+    def floats(self, count: int, exact: bool = False) -> tuple[float, ...] | list[float]:
+        fmt = _FLOATS[count]
+        values = fmt.unpack_from(self.buf, self.pos)
+        self.pos += fmt.size
+        if exact:
+            return values
+        return [self.shortest(value) for value in values]
+
+    def _unpack(self, fmt: struct.Struct):
+        value, = fmt.unpack_from(self.buf, self.pos)
+        self.pos += fmt.size
+        return value
+
+    def u8(self) -> int:
+        value = self.buf[self.pos]
+        self.pos += 1
+        return value
+
+    def i8(self) -> int:
+        return self._unpack(_I8)
+
+    def u32(self) -> int:
+        value, = _unpack_u32(self.buf, self.pos)
+        self.pos += 4
+        return value
+
+    def i32(self) -> int:
+        return self._unpack(_I32)
+
+    def u64(self) -> int:
+        value, = _unpack_u64(self.buf, self.pos)
+        self.pos += 8
+        return value
+
+    def i64(self) -> int:
+        return self._unpack(_I64)
+
+    def f32(self) -> float:
+        return self.shortest(self._unpack(_F32))
+
+    def f64(self) -> float:
+        return self._unpack(_F64)
+
+    def bool32(self) -> bool:
+        return self._unpack(_U32) != 0
+
+    def string(self) -> str:
+        buf = self.buf
+        start = self.pos + 4
+        length, = _unpack_i32(buf, self.pos)
+        if length >= 0:
+            end = start + length
+            self.pos = end
+            return buf[start:end - 1].decode() if length else ''
+
+        end = start - 2 * length
+        self.pos = end
+        return buf[start:end - 2].decode('utf-16-le')
+
+    def name(self) -> str:
+        # Names and types repeat for every object, so decode each one once and share the str instance between them
+        #  (like json.load does for keys)
+        buf = self.buf
+        start = self.pos + 4
+        length, = _unpack_i32(buf, self.pos)
+        if length <= 0:
+            return self.string()
+
+        end = start + length
+        raw = buf[start:end]
+        name = self.names.get(raw)
+        if name is None:
+            name = self.names[raw] = raw[:-1].decode()
+        self.pos = end
+        return name
+
+    def guid(self) -> str:
+        start = self.pos
+        raw = self.buf[start:start + 16]
+        self.pos = start + 16
+        guid = self.guids.get(raw)
+        if guid is None:
+            guid = self.guids[raw] = _format_guid(*_GUID.unpack(raw))
+        return guid
+
+    def optional_guid(self) -> str | None:
+        flag = self.buf[self.pos]
+        self.pos += 1
+        if flag:
+            return self.guid()
+        return None
+
+    def array(self, fmt: str, count: int) -> list:
+        values = struct.unpack_from(f'<{count}{fmt}', self.buf, self.pos)
+        self.pos += struct.calcsize(f'<{count}{fmt}')
+        return list(values)
+
+    def error(self, message: str) -> CondoDataError:
+        return CondoDataError(f'at offset {self.pos:#x}: {message}')
+
+    # Property lists
+    def properties(self) -> dict:
+        props = {}
+        read_name = self.name
+        while True:
+            name = read_name()
+            if name == 'None':
+                return props
+            ptype = read_name()
+            size, = _unpack_u64(self.buf, self.pos)
+            self.pos += 8
+            props[name] = self.property(ptype, size)
+
+    def property(self, ptype: str, size: int) -> dict:
+        if ptype == 'StructProperty':
+            struct_type = self.name()
+            struct_id = self.guid()
+            guid = self.optional_guid()
+            value = self.struct_value(struct_type)
+            data = {'value': value, 'struct_type': self.struct_type(struct_type), 'struct_id': struct_id}
+            return {'Struct': data if guid is None else {'id': guid, **data}}
+
+        numeric = _NUMERIC_BY_TYPE.get(ptype)
+        if numeric is not None:
+            variant, fmt = numeric
+            guid = self.optional_guid()
+            value = self.f32() if fmt is _F32 else self._unpack(fmt)
+            return {variant: {'value': value} if guid is None else {'id': guid, 'value': value}}
+
+        match ptype:
+            case 'BoolProperty':
+                value = self.u8() != 0
+                guid = self.optional_guid()
+                return {'Bool': {'value': value} if guid is None else {'id': guid, 'value': value}}
+            case 'StrProperty' | 'NameProperty' | 'ObjectProperty':
+                guid = self.optional_guid()
+                value = self.string()
+                return {_STRING_VECS[ptype]: {'value': value} if guid is None else {'id': guid, 'value': value}}
+            case 'ByteProperty':
+                enum_type = self.string()
+                guid = self.optional_guid()
+                value = {'Byte': self.u8()} if enum_type == 'None' else {'Label': self.string()}
+                return {'Byte': self._with_id(guid, {'value': value, 'enum_type': enum_type})}
+            case 'EnumProperty':
+                enum_type = self.string()
+                guid = self.optional_guid()
+                return {'Enum': self._with_id(guid, {'value': self.string(), 'enum_type': enum_type})}
+            case 'ArrayProperty':
+                array_type = self.string()
+                guid = self.optional_guid()
+                data = {'array_type': array_type} if guid is None else {'array_type': array_type, 'id': guid}
+                data['value'] = self.value_array(array_type, size)
+                return {'Array': data}
+            case 'SetProperty':
+                set_type = self.string()
+                guid = self.optional_guid()
+                self.u32()  # Removed entries
+                count = self.u32()
+                if set_type == 'StructProperty':
+                    value = {'Struct': [{'Guid': self.guid()} for _ in range(count)]}
+                else:
+                    value = {'Base': self.value_vec(set_type, count, size - 8)}
+                return {'Set': self._with_id(guid, {'set_type': set_type, 'value': value})}
+            case 'MapProperty':
+                key_type = self.string()
+                value_type = self.string()
+                guid = self.optional_guid()
+                self.u32()  # Removed entries
+                count = self.u32()
+                entries = [{'key': self.property_value(key_type, True), 'value': self.property_value(value_type, False)}
+                           for _ in range(count)]
+                data = {} if guid is None else {'id': guid}
+                data['key_type'] = key_type
+                data['value_type'] = value_type
+                data['value'] = entries
+                return {'Map': data}
+            case 'TextProperty':
+                guid = self.optional_guid()
+                return {'Text': self._with_id(guid, {'value': self.text()})}
+            case 'FieldPathProperty':
+                guid = self.optional_guid()
+                return {'FieldPath': self._with_id(guid, {'value': self.field_path()})}
+            case 'SoftObjectProperty':
+                guid = self.optional_guid()
+                return {'SoftObject': self._with_id(guid, {'value': self.string(), 'value2': self.string()})}
+            case 'DelegateProperty':
+                guid = self.optional_guid()
+                return {'Delegate': self._with_id(guid, {'value': self.delegate()})}
+            case 'MulticastDelegateProperty' | 'MulticastInlineDelegateProperty' | 'MulticastSparseDelegateProperty':
+                guid = self.optional_guid()
+                delegates = [self.delegate() for _ in range(self.u32())]
+                return {ptype[:-len('Property')]: self._with_id(guid, {'value': delegates})}
+
+        raise self.error(f'unknown property type: "{ptype}"')
+
+    @staticmethod
+    def _with_id(guid: str | None, data: dict) -> dict:
+        if guid is None:
+            return data
+        return {'id': guid, **data}
+
+    @staticmethod
+    def struct_type(struct_type: str) -> str | dict:
+        if struct_type in _BUILTIN_STRUCTS:
+            return struct_type
+        return {'Struct': struct_type}
+
+    def struct_value(self, struct_type: str) -> dict:
+        if struct_type not in _BUILTIN_STRUCTS:
+            return {'Struct': self.properties()}
+
+        match struct_type:
+            case 'Vector':
+                x, y, z = self.floats(3, exact=True)
+                return {'Vector': {'x': x, 'y': y, 'z': z}}
+            case 'Quat':
+                x, y, z, w = self.floats(4, exact=True)
+                return {'Quat': {'x': x, 'y': y, 'z': z, 'w': w}}
+            case 'Rotator':
+                x, y, z = self.floats(3, exact=True)
+                return {'Rotator': {'x': x, 'y': y, 'z': z}}
+            case 'LinearColor':
+                r, g, b, a = self.floats(4)
+                return {'LinearColor': {'r': r, 'g': g, 'b': b, 'a': a}}
+            case 'Guid':
+                return {'Guid': self.guid()}
+            case 'Color':
+                r, g, b, a = struct.unpack_from('<4B', self.buf, self.pos)
+                self.pos += 4
+                return {'Color': {'r': r, 'g': g, 'b': b, 'a': a}}
+            case 'Vector2D':
+                x, y = self.floats(2)
+                return {'Vector2D': {'x': x, 'y': y}}
+            case 'IntPoint':
+                x, y = struct.unpack_from('<2i', self.buf, self.pos)
+                self.pos += 8
+                return {'IntPoint': {'x': x, 'y': y}}
+            case 'IntVector':
+                x, y, z = struct.unpack_from('<3i', self.buf, self.pos)
+                self.pos += 12
+                return {'IntVector': {'x': x, 'y': y, 'z': z}}
+            case 'Box':
+                ax, ay, az, bx, by, bz = self.floats(6, exact=True)
+                self.u8()  # IsValid, only present when reading
+                return {'Box': {'a': {'x': ax, 'y': ay, 'z': az}, 'b': {'x': bx, 'y': by, 'z': bz}}}
+            case 'DateTime':
+                return {'DateTime': self.u64()}
+            case 'Timespan':
+                return {'Timespan': self.i64()}
+            case 'WorkshopFile':
+                return {'WorkshopFile': self.u64()}
+            case 'SoftObjectPath':
+                return {'SoftObjectPath': [self.string(), self.string()]}
+            case 'GameplayTagContainer':
+                tags = [{'name': self.string()} for _ in range(self.u32())]
+                return {'GameplayTagContainer': {'gameplay_tags': tags}}
+
+    def value_vec(self, array_type: str, count: int, size: int) -> dict:
+        vec_format = _VEC_FORMATS.get(array_type)
+        if vec_format is not None:
+            variant, fmt = vec_format
+            values = self.array(fmt, count)
+            if fmt == 'f':
+                values = [self.shortest(value) for value in values]
+            return {variant: values}
+
+        variant = _STRING_VECS.get(array_type)
+        if variant is not None:
+            return {variant: [self.string() for _ in range(count)]}
+
+        match array_type:
+            case 'BoolProperty':
+                return {'Bool': [value != 0 for value in self.array('B', count)]}
+            case 'ByteProperty':
+                if size == count:
+                    return {'Byte': {'Byte': self.array('B', count)}}
+                return {'Byte': {'Label': [self.string() for _ in range(count)]}}
+            case 'TextProperty':
+                return {'Text': [self.text() for _ in range(count)]}
+            case 'SoftObjectProperty':
+                return {'SoftObject': [[self.string(), self.string()] for _ in range(count)]}
+
+        raise self.error(f'unknown vec type: {array_type}')
+
+    def value_array(self, array_type: str, size: int) -> dict:
+        count = self.u32()
+        if array_type != 'StructProperty':
+            return {'Base': self.value_vec(array_type, count, size - 4)}
+
+        type_name = self.string()
+        name = self.string()
+        self.u64()  # Size of the elements
+        struct_type = self.string()
+        struct_id = self.guid()
+        self.u8()
+        values = [self.struct_value(struct_type) for _ in range(count)]
+        return {'Struct': {'_type': type_name, 'name': name, 'struct_type': self.struct_type(struct_type),
+                           'id': struct_id, 'value': values}}
+
+    def property_value(self, ptype: str, is_key: bool) -> dict:
+        numeric = _NUMERIC_BY_TYPE.get(ptype)
+        if numeric is not None and ptype not in ('UInt8Property', 'UInt64Property'):
+            variant, fmt = numeric
+            return {variant: self.f32() if fmt is _F32 else self._unpack(fmt)}
+
+        variant = _STRING_VECS.get(ptype)
+        if variant is not None:
+            return {variant: self.string()}
+
+        match ptype:
+            case 'BoolProperty':
+                return {'Bool': self.u8() != 0}
+            case 'ByteProperty':
+                return {'Byte': {'Label': self.string()}}
+            case 'SoftObjectProperty':
+                return {'SoftObject': [self.string(), self.string()]}
+            case 'StructProperty':
+                if is_key:
+                    return {'Struct': {'Guid': self.guid()}}
+                return {'Struct': {'Struct': self.properties()}}
+
+        raise self.error(f'unknown property type: "{ptype}"')
+
+    def text(self) -> dict:
+        flags = self.u32()
+        history = self.i8()
+        match history:
+            case -1:
+                culture_invariant = self.string() if self.bool32() else None
+                variant = {'None': {'culture_invariant': culture_invariant}}
+            case 0:
+                variant = {'Base': {'namespace': self.string(), 'key': self.string(), 'source_string': self.string()}}
+            case 3:
+                format_text = self.text()
+                arguments = [{'name': self.string(), 'value': self.argument_value()} for _ in range(self.u32())]
+                variant = {'ArgumentFormat': {'format_text': format_text, 'arguments': arguments}}
+            case 4:
+                source_value = self.argument_value(wide=True)
+                format_options = self.number_format_options() if self.bool32() else None
+                variant = {'AsNumber': {'source_value': source_value, 'format_options': format_options,
+                                        'culture_name': self.string()}}
+            case 7:
+                variant = {'AsDate': {'source_date_time': self.u64(), 'date_style': self.i8(),
+                                      'time_zone': self.string(), 'culture_name': self.string()}}
+            case 11:
+                variant = {'StringTableEntry': {'table': self.string(), 'key': self.string()}}
+            case _:
+                raise self.error(f'unimplemented variant for FTextHistory {history:#x}')
+        return {'flags': flags, 'variant': variant}
+
+    def argument_value(self, wide: bool = False) -> dict:
+        # Arguments of FTextHistory::AsNumber store integers as 64-bit, format arguments as 32-bit
+        arg_type = self.u8()
+        match arg_type:
+            case 0:
+                return {'Int': self.i64() if wide else self.i32()}
+            case 1:
+                return {'UInt': self.u64() if wide else self.u32()}
+            case 2:
+                return {'Float': self.f32()}
+            case 3:
+                return {'Double': self.f64()}
+            case 4:
+                return {'Text': self.text()}
+            case 5:
+                return {'Gender': self.u64()}
+        raise self.error(f'unimplemented variant for FFormatArgumentValue {arg_type:#x}')
+
+    def number_format_options(self) -> dict:
+        return {'always_sign': self.bool32(), 'use_grouping': self.bool32(), 'rounding_mode': self.i8(),
+                'minimum_integral_digits': self.i32(), 'maximum_integral_digits': self.i32(),
+                'minimum_fractional_digits': self.i32(), 'maximum_fractional_digits': self.i32()}
+
+    def field_path(self) -> dict:
+        path = [self.string() for _ in range(self.u32())]
+        return {'path': path, 'owner': self.string()}
+
+    def delegate(self) -> dict:
+        return {'name': self.string(), 'path': self.string()}
+
+    # File sections
+    def item(self) -> dict:
+        item = {'name': self.name(), 'guid': self.guid()}
+        has_tinyrick = self.bool32()
+        item['steam_item_id'] = self.u64()
+
+        if has_tinyrick:
+            size = self.u32()
+            end = self.pos + size
+            if self.buf[self.pos:self.pos + 8] != _TINYRICK:
+                raise self.error('bad magic value: expected tinyrick')
+            self.pos += 8
+            item['format_version'] = self.u32()
+            item['unreal_version'] = self.u32()
+            item['properties'] = self.properties()
+            self.u32()
+            item['actors'] = [{'name': self.string(), 'properties': self.properties()} for _ in range(self.u32())]
+            self.pos = end
+
+        rx, ry, rz, rw, px, py, pz, sx, sy, sz = _TRANSFORM.unpack_from(self.buf, self.pos)
+        self.pos += _TRANSFORM.size
+        item['rotation'] = {'x': rx, 'y': ry, 'z': rz, 'w': rw}
+        item['position'] = {'x': px, 'y': py, 'z': pz}
+        item['scale'] = {'x': sx, 'y': sy, 'z': sz}
+        return item
+
+    def property_list(self) -> dict:
+        name = self.name()
+        size = self.u32()
+        end = self.pos + size
+        props = self.properties()
+        self.pos = end
+        return {'name': name, 'properties': props}
+
+    def suitebro(self) -> dict:
+        magic, format_version, unreal_version = _HEADER.unpack_from(self.buf, 0)
+        if magic != _MAGIC:
+            raise self.error('bad magic value: expected suitebro')
+        self.pos = _HEADER.size
+
+        items = [self.item() for _ in range(self.u32())]
+        properties = [self.property_list() for _ in range(self.u32())]
+
+        # The group table follows, but tower-unite-suitebro only reads its leading marker and discards the rest
+        self.u32()
+
+        return {'header': {'format_version': format_version, 'unreal_version': unreal_version}, 'items': items,
+                'properties': properties, 'groups': []}
+
+
+class _Writer:
+    def __init__(self):
+        self.out = bytearray()
+
+    def _pack(self, fmt: struct.Struct, value):
+        self.out += fmt.pack(value)
+
+    def u8(self, value: int):
+        self.out.append(value)
+
+    def u32(self, value: int):
+        self.out += _U32.pack(value)
+
+    def u64(self, value: int):
+        self.out += _U64.pack(value)
+
+    def bool32(self, value: bool):
+        self.out += _U32.pack(1 if value else 0)
+
+    def string(self, value: str):
+        if not value:
+            self.out += b'\x00\x00\x00\x00'
+        elif value.isascii():
+            self.out += _I32.pack(len(value) + 1)
+            self.out += value.encode('ascii')
+            self.out.append(0)
+        else:
+            encoded = value.encode('utf-16-le')
+            self.out += _I32.pack(-(len(encoded) // 2 + 1))
+            self.out += encoded
+            self.out += b'\x00\x00'
+
+    def guid(self, value: str):
+        self.out += _GUID.pack(*_parse_guid(value))
+
+    def optional_guid(self, value: str | None):
+        if value is None:
+            self.out.append(0)
+        else:
+            self.out.append(1)
+            self.guid(value)
+
+    def reserve(self, fmt: struct.Struct) -> int:
+        offset = len(self.out)
+        self.out += bytes(fmt.size)
+        return offset
+
+    def patch(self, fmt: struct.Struct, offset: int, value: int):
+        fmt.pack_into(self.out, offset, value)
+
+    # Property lists
+    def properties(self, props: dict):
+        for name, prop in props.items():
+            self.string(name)
+            self.property(prop)
+        self.string('None')
+
+    def property(self, prop: dict):
+        variant, data = next(iter(prop.items()))
+        ptype = _PROPERTY_TYPES.get(variant)
+        if ptype is None:
+            raise CondoDataError(f'unknown property variant: {variant}')
+
+        self.string(ptype)
+        size_offset = self.reserve(_U64)
+        guid = data.get('id')
+
+        numeric = _NUMERIC.get(variant)
+        if numeric is not None:
+            self.optional_guid(guid)
+            start = len(self.out)
+            self._pack(numeric[1], data['value'])
+            self.patch(_U64, size_offset, len(self.out) - start)
+            return
+
+        match variant:
+            case 'Bool':
+                self.u8(1 if data['value'] else 0)
+                self.optional_guid(guid)
+                return
+            case 'Byte':
+                self.string(data['enum_type'])
+                self.optional_guid(guid)
+                start = len(self.out)
+                self.byte_value(data['value'])
+            case 'Enum':
+                self.string(data['enum_type'])
+                self.optional_guid(guid)
+                start = len(self.out)
+                self.string(data['value'])
+            case 'Struct':
+                struct_type = data['struct_type']
+                self.string(struct_type if isinstance(struct_type, str) else struct_type['Struct'])
+                self.guid(data['struct_id'])
+                self.optional_guid(guid)
+                start = len(self.out)
+                self.struct_value(data['value'])
+            case 'Array':
+                self.string(data['array_type'])
+                self.optional_guid(guid)
+                start = len(self.out)
+                self.value_array(data['value'])
+            case 'Set':
+                self.string(data['set_type'])
+                self.optional_guid(guid)
+                start = len(self.out)
+                self.u32(0)
+                value = data['value']
+                if 'Struct' in value:
+                    self.u32(len(value['Struct']))
+                    for struct_value in value['Struct']:
+                        self.struct_value(struct_value)
+                else:
+                    self.value_vec(value['Base'], with_count=True)
+            case 'Map':
+                self.string(data['key_type'])
+                self.string(data['value_type'])
+                self.optional_guid(guid)
+                start = len(self.out)
+                self.u32(0)
+                self.u32(len(data['value']))
+                for entry in data['value']:
+                    self.property_value(entry['key'])
+                    self.property_value(entry['value'])
+            case _:
+                self.optional_guid(guid)
+                start = len(self.out)
+                self.simple_value(variant, data)
+
+        self.patch(_U64, size_offset, len(self.out) - start)
+
+    def simple_value(self, variant: str, data: dict):
+        value = data['value']
+        match variant:
+            case 'Str' | 'Name' | 'Object':
+                self.string(value)
+            case 'Text':
+                self.text(value)
+            case 'FieldPath':
+                self.u32(len(value['path']))
+                for part in value['path']:
+                    self.string(part)
+                self.string(value['owner'])
+            case 'SoftObject':
+                self.string(value)
+                self.string(data['value2'])
+            case 'Delegate':
+                self.delegate(value)
+            case 'MulticastDelegate' | 'MulticastInlineDelegate' | 'MulticastSparseDelegate':
+                self.u32(len(value))
+                for delegate in value:
+                    self.delegate(delegate)
+            case _:
+                raise CondoDataError(f'unknown property variant: {variant}')
+
+    def delegate(self, delegate: dict):
+        self.string(delegate['name'])
+        self.string(delegate['path'])
+
+    def byte_value(self, value: dict):
+        if 'Byte' in value:
+            self.u8(value['Byte'])
+        else:
+            self.string(value['Label'])
+
+    def struct_value(self, value: dict):
+        kind, data = next(iter(value.items()))
+        out = self.out
+        match kind:
+            case 'Vector' | 'Rotator':
+                out += struct.pack('<3f', data['x'], data['y'], data['z'])
+            case 'Quat':
+                out += struct.pack('<4f', data['x'], data['y'], data['z'], data['w'])
+            case 'LinearColor':
+                out += struct.pack('<4f', data['r'], data['g'], data['b'], data['a'])
+            case 'Guid':
+                self.guid(data)
+            case 'Color':
+                out += struct.pack('<4B', data['r'], data['g'], data['b'], data['a'])
+            case 'Vector2D':
+                out += struct.pack('<2f', data['x'], data['y'])
+            case 'IntPoint':
+                out += struct.pack('<2i', data['x'], data['y'])
+            case 'IntVector':
+                out += struct.pack('<3i', data['x'], data['y'], data['z'])
+            case 'Box':
+                a, b = data['a'], data['b']
+                out += struct.pack('<6f', a['x'], a['y'], a['z'], b['x'], b['y'], b['z'])
+            case 'DateTime' | 'WorkshopFile':
+                self.u64(data)
+            case 'Timespan':
+                self._pack(_I64, data)
+            case 'SoftObjectPath':
+                self.string(data[0])
+                self.string(data[1])
+            case 'GameplayTagContainer':
+                self.u32(len(data['gameplay_tags']))
+                for tag in data['gameplay_tags']:
+                    self.string(tag['name'])
+            case 'Struct':
+                self.properties(data)
+            case _:
+                raise CondoDataError(f'unknown struct value: {kind}')
+
+    def value_vec(self, vec: dict, with_count: bool):
+        variant, values = next(iter(vec.items()))
+        if variant == 'Byte':
+            kind, values = next(iter(values.items()))
+        if with_count:
+            self.u32(len(values))
+
+        fmt = _VEC_WRITE_FORMATS.get(variant)
+        if fmt is not None:
+            self.out += struct.pack(f'<{len(values)}{fmt}', *values)
+            return
+
+        match variant:
+            case 'Bool':
+                self.out += bytes(1 if value else 0 for value in values)
+            case 'Byte':
+                if kind == 'Byte':
+                    self.out += bytes(values)
+                else:
+                    for value in values:
+                        self.string(value)
+            case 'Enum' | 'Str' | 'Name' | 'Object':
+                for value in values:
+                    self.string(value)
+            case 'Text':
+                for value in values:
+                    self.text(value)
+            case 'SoftObject':
+                for value, value2 in values:
+                    self.string(value)
+                    self.string(value2)
+            case 'Box':
+                for value in values:
+                    self.struct_value({'Box': value})
+            case _:
+                raise CondoDataError(f'unknown vec type: {variant}')
+
+    def value_array(self, value: dict):
+        if 'Base' in value:
+            self.value_vec(value['Base'], with_count=True)
+            return
+
+        data = value['Struct']
+        self.u32(len(data['value']))
+        self.string(data['_type'])
+        self.string(data['name'])
+        size_offset = self.reserve(_U64)
+        struct_type = data['struct_type']
+        self.string(struct_type if isinstance(struct_type, str) else struct_type['Struct'])
+        self.guid(data['id'])
+        self.u8(0)
+        start = len(self.out)
+        for struct_value in data['value']:
+            self.struct_value(struct_value)
+        self.patch(_U64, size_offset, len(self.out) - start)
+
+    def property_value(self, value: dict):
+        variant, data = next(iter(value.items()))
+        numeric = _NUMERIC.get(variant)
+        if numeric is not None:
+            self._pack(numeric[1], data)
+            return
+
+        match variant:
+            case 'Bool':
+                self.u8(1 if data else 0)
+            case 'Byte':
+                self.byte_value(data)
+            case 'Enum' | 'Name' | 'Str' | 'Object':
+                self.string(data)
+            case 'SoftObject' | 'SoftObjectPath':
+                self.string(data[0])
+                self.string(data[1])
+            case 'Struct':
+                self.struct_value(data)
+            case _:
+                raise CondoDataError(f'unknown property value: {variant}')
+
+    def text(self, text: dict):
+        self.u32(text['flags'])
+        kind, data = next(iter(text['variant'].items()))
+        match kind:
+            case 'None':
+                self._pack(_I8, _TEXT_NONE)
+                culture_invariant = data['culture_invariant']
+                self.bool32(culture_invariant is not None)
+                if culture_invariant is not None:
+                    self.string(culture_invariant)
+            case 'Base':
+                self._pack(_I8, _TEXT_BASE)
+                # An empty namespace is still written with its null terminator
+                if data['namespace']:
+                    self.string(data['namespace'])
+                else:
+                    self.out += b'\x01\x00\x00\x00\x00'
+                self.string(data['key'])
+                self.string(data['source_string'])
+            case 'ArgumentFormat':
+                self._pack(_I8, _TEXT_ARGUMENT_FORMAT)
+                self.text(data['format_text'])
+                self.u32(len(data['arguments']))
+                for argument in data['arguments']:
+                    self.string(argument['name'])
+                    self.argument_value(argument['value'])
+            case 'AsNumber':
+                self._pack(_I8, _TEXT_AS_NUMBER)
+                self.argument_value(data['source_value'], wide=True)
+                format_options = data['format_options']
+                self.bool32(format_options is not None)
+                if format_options is not None:
+                    self.bool32(format_options['always_sign'])
+                    self.bool32(format_options['use_grouping'])
+                    self._pack(_I8, format_options['rounding_mode'])
+                    self.out += struct.pack('<4i', format_options['minimum_integral_digits'],
+                                            format_options['maximum_integral_digits'],
+                                            format_options['minimum_fractional_digits'],
+                                            format_options['maximum_fractional_digits'])
+                self.string(data['culture_name'])
+            case 'AsDate':
+                self._pack(_I8, _TEXT_AS_DATE)
+                self.u64(data['source_date_time'])
+                self._pack(_I8, data['date_style'])
+                self.string(data['time_zone'])
+                self.string(data['culture_name'])
+            case 'StringTableEntry':
+                self._pack(_I8, _TEXT_STRING_TABLE_ENTRY)
+                self.string(data['table'])
+                self.string(data['key'])
+            case _:
+                raise CondoDataError(f'unknown text variant: {kind}')
+
+    def argument_value(self, value: dict, wide: bool = False):
+        kind, data = next(iter(value.items()))
+        try:
+            self.u8(_ARGUMENT_TYPES.index(kind))
+        except ValueError:
+            raise CondoDataError(f'unknown argument value: {kind}')
+
+        match kind:
+            case 'Int':
+                self._pack(_I64 if wide else _I32, data)
+            case 'UInt':
+                self._pack(_U64 if wide else _U32, data)
+            case 'Float':
+                self._pack(_F32, data)
+            case 'Double':
+                self._pack(_F64, data)
+            case 'Text':
+                self.text(data)
+            case 'Gender':
+                self.u64(data)
+
+    # File sections
+    def item(self, item: dict):
+        self.string(item['name'])
+        self.guid(item['guid'])
+
+        has_tinyrick = 'properties' in item
+        self.bool32(has_tinyrick)
+        self.u64(item['steam_item_id'])
+
+        if has_tinyrick:
+            size_offset = self.reserve(_U32)
+            start = len(self.out)
+            self.out += _TINYRICK
+            self.u32(item['format_version'])
+            self.u32(item['unreal_version'])
+            self.properties(item['properties'])
+            self.u32(0)
+            self.u32(len(item['actors']))
+            for actor in item['actors']:
+                self.string(actor['name'])
+                self.properties(actor['properties'])
+                self.u32(0)
+            self.patch(_U32, size_offset, len(self.out) - start)
+
+        rot, pos, scale = item['rotation'], item['position'], item['scale']
+        self.out += _TRANSFORM.pack(rot['x'], rot['y'], rot['z'], rot['w'], pos['x'], pos['y'], pos['z'],
+                                    scale['x'], scale['y'], scale['z'])
+
+    def property_list(self, prop_list: dict):
+        self.string(prop_list['name'])
+        size_offset = self.reserve(_U32)
+        start = len(self.out)
+        self.properties(prop_list['properties'])
+        self.u32(0)
+        self.patch(_U32, size_offset, len(self.out) - start)
+
+    def suitebro(self, data: dict):
+        header = data['header']
+        self.out += _HEADER.pack(_MAGIC, header['format_version'], header['unreal_version'])
+
+        self.u32(len(data['items']))
+        for item in data['items']:
+            self.item(item)
+
+        self.u32(len(data['properties']))
+        for prop_list in data['properties']:
+            self.property_list(prop_list)
+
+        self.u32(1)
+        self.u32(len(data['groups']))
+        for group in data['groups']:
+            self.out += _GROUP.pack(group['item_count'], group['group_id'])
+
+
+def decode(data: bytes) -> dict:
+    """Decodes CondoData/.map bytes into a dict
+
+    Args:
+        data: Raw contents of the CondoData/.map file
+
+    Returns:
+        The same dictionary that tower-unite-suitebro's to-json output loads as
+    """
+    reader = _Reader(data)
+
+    # Decoding only allocates a tree of new dicts and lists, so pause the cyclic garbage collector instead of letting it
+    #  repeatedly scan everything allocated so far
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return reader.suitebro()
+    except (struct.error, IndexError) as e:
+        raise reader.error(f'io error: {e}') from e
+    except UnicodeDecodeError as e:
+        raise reader.error(f'invalid string: {e}') from e
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def encode(data: dict) -> bytes:
+    """Encodes a tower-unite-suitebro style dict into CondoData/.map bytes
+
+    Args:
+        data: Dictionary in the format produced by decode (or Suitebro.to_dict)
+
+    Returns:
+        The same bytes that tower-unite-suitebro's to-save command writes for this data
+    """
+    writer = _Writer()
+    try:
+        writer.suitebro(data)
+    except (KeyError, TypeError, struct.error) as e:
+        raise CondoDataError(f'could not encode data: {e!r}') from e
+    return bytes(writer.out)
+
+
+def load(path: str) -> dict:
+    """Reads and decodes the CondoData/.map file at the given path"""
+    with open(path, 'rb') as fd:
+        return decode(fd.read())
+
+
+def dump(data: dict, path: str):
+    """Encodes data and writes it to a CondoData/.map file at the given path"""
+    encoded = encode(data)
+    with open(path, 'wb') as fd:
+        fd.write(encoded)
@@ -9,6 +9,7 @@ KEY_INSTALL_PATH = 'tower_install_path'
 KEY_IMGUR_CLIENT_ID = 'imgur_client_id'
 KEY_CATBOX_USERHASH = 'catbox_userhash'
 KEY_FROM_SOURCE = 'from_source'
+KEY_CACHE_SIZE = 'cache_size'
 
 
 class TowerConfig:
@@ -42,7 +43,8 @@ class TowerConfig:
             "{KEY_INSTALL_PATH}": "{default_install}",
             "{KEY_IMGUR_CLIENT_ID}": null,
             "{KEY_CATBOX_USERHASH}": null,
-            "{KEY_FROM_SOURCE}": false
+            "{KEY_FROM_SOURCE}": false,
+            "{KEY_CACHE_SIZE}": null
         }}''')
 
         # Assign any defaults not in config
@@ -1,49 +1,173 @@
-import json
+import re
+from typing import Callable, Iterable
+
+import numpy as np
+from scipy.spatial.transform import Rotation as R
 
 from .object import TowerObject
 from .selection import Selection
 from .suitebro import get_active_save
 
+# GUIDs as they appear in saves
+_GUID = re.compile(r'[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}')
+
+
+def _guid_pattern(targets: Iterable[str]) -> re.Pattern:
+    # Pattern matching every target. If every target is a GUID, this is the GUID pattern, so that matches still need to
+    #  be looked up, otherwise an alternation of the targets
+    targets = list(targets)
+    if all(_GUID.fullmatch(target) for target in targets):
+        return _GUID
+    return re.compile('|'.join(map(re.escape, sorted(targets, key=len, reverse=True))))
+
+
+def _guid_finder(targets: set[str]) -> Callable[[str], bool]:
+    # Function checking whether a string contains any of the targets
+    if not targets:
+        return lambda text: False
+
+    pattern = _guid_pattern(targets)
+    shortest = min(map(len, targets))
+
+    def find(text: str) -> bool:
+        return len(text) >= shortest and any(match.group(0) in targets for match in pattern.finditer(text))
+
+    return find
+
+
+def _guid_replacer(replacement_table: dict[str, str]) -> Callable[[str], str]:
+    # Function replacing every occurrence of a target of the table in a string, in a single pass over the string. Same
+    #  as replacing the targets one after another, as long as no target contains another (e.g., distinct GUIDs)
+    if not replacement_table:
+        return lambda text: text
+
+    pattern = _guid_pattern(replacement_table)
+    shortest = min(map(len, replacement_table))
+
+    def substitute(match: re.Match) -> str:
+        return replacement_table.get(match.group(0), match.group(0))
+
+    def replace(text: str) -> str:
+        if len(text) < shortest:
+            return text
+        return pattern.sub(substitute, text)
+
+    return replace
+
 
 def replace_guids(datadict, replacement_table):
-    encoding = json.dumps(datadict)
-    for target, replacement in replacement_table.items():
-        encoding = encoding.replace(target, replacement)
-    return json.loads(encoding)
+    replace = _guid_replacer(replacement_table)
+
+    def remap(value):
+        if isinstance(value, str):
+            return replace(value)
+        if isinstance(value, dict):
+            return {replace(key) if isinstance(key, str) else key: remap(val) for key, val in value.items()}
+        if isinstance(value, list):
+            return [remap(val) for val in value]
+        return value
+
+    return remap(datadict)
+
+
+def _copy_objects(selection: Selection, count: int) -> list[list[TowerObject]]:
+    # Copies the objects of the selection count times, giving every copy its own groups and remapping references to
+    #  the GUIDs of the copied objects to the GUIDs of their copies
+    sources = list(selection)
+
+    # Groups are numbered in order of first appearance, after the groups in use and the groups of earlier copies
+    group_indices: dict[int, int] = {}
+    for obj in sources:
+        if obj.group_id() >= 0:
+            group_indices.setdefault(obj.group_id(), len(group_indices))
+    save = get_active_save()
+    max_group_id = max(group_indices, default=-1)
+    if save is not None:
+        max_group_id = max(max_group_id, save.get_max_groupid())
+
+    # The references are found once, since the copies share the data of the sources until it is replaced
+    old_guids = [obj.guid() if obj.has_item() else None for obj in sources]
+    find = _guid_finder({guid for guid in old_guids if guid is not None})
+    locations = [obj.find_strings(find) for obj in sources]
+
+    batches = []
+    for copy_idx in range(count):
+        copies = [obj.copy() for obj in sources]
+        first_group_id = max_group_id + 1 + copy_idx * len(group_indices)
+        for obj, copied in zip(sources, copies):
+            if obj.group_id() >= 0:
+                copied.set_group_id(first_group_id + group_indices[obj.group_id()])
+
+        replace = _guid_replacer({old_guid: copied.guid() for old_guid, copied in zip(old_guids, copies)
+                                  if old_guid is not None})
+        for copied, obj_locations in zip(copies, locations):
+            if obj_locations:
+                copied.replace_strings(replace, obj_locations)
+
+        batches.append(copies)
+    return batches
 
 
 # Returns new selection containing the new copied objects
 def copy_selection(selection: Selection) -> Selection:
-    # First pass: new guids and setup replacement table
-    replacement_table = {}
-    copies: list[TowerObject | None] = [None] * len(selection)
-    new_groups = {}
-    for x, obj in enumerate(selection):
-        if obj.item is not None:
-            old_guid = obj.item['guid']
-
-        copied = obj.copy()
-
-        old_group_id = obj.group_id()
-        if old_group_id >= 0:
-            if old_group_id not in new_groups:
-                save = get_active_save()
-                save.update_groups_meta()
-                max_new_groupid = max(new_groups.values()) if new_groups.values() else -1
-                new_groupid = max(save.get_max_groupid(), max_new_groupid) + 1
-                new_groups[old_group_id] = new_groupid
-
-            copied.set_group_id(new_groups[old_group_id])
-
-        if obj.item is not None:
-            new_guid = copied.item['guid']
-            replacement_table[old_guid] = new_guid
-
-        copies[x] = copied
-
-    # Second pass: replace any references to old guids with new guids
-    for obj in copies:
-        obj.item = replace_guids(obj.item, replacement_table)
-        obj.properties = replace_guids(obj.properties, replacement_table)
-
-    return Selection(copies)
+    return Selection(_copy_objects(selection, 1)[0])
+
+
+def copy_selection_batch(selection: Selection, offsets: np.ndarray, rotations: np.ndarray | None = None,
+                         pivot: np.ndarray | None = None) -> list[Selection]:
+    """Copies a selection several times in one pass, moving every copy
+
+    Group ids and GUIDs are allocated for every copy up front, references are looked up once for all copies, and the
+    transforms of all copies are computed as arrays.
+
+    Args:
+        selection: The selection to copy
+        offsets: N×3 array of the translation of each copy (in world coordinates)
+        rotations: Optional N×4 array of the rotation quaternion (x, y, z, w) of each copy, applied around the pivot
+            before the translation
+        pivot: Point to rotate the copies around, by default the centroid of the items in the selection
+
+    Returns:
+        List of N selections, containing the copies in the order of offsets. The copies are not added to the save
+    """
+    offsets = np.asarray(offsets, dtype=np.float64).reshape(-1, 3)
+    count = len(offsets)
+    if rotations is not None:
+        rotations = np.asarray(rotations, dtype=np.float64).reshape(-1, 4)
+        if len(rotations) != count:
+            raise ValueError(f'Expected {count} rotations, got {len(rotations)}')
+
+    batches = _copy_objects(selection, count)
+
+    # Only items have a transform, and the copies of each item are in the same position in every batch
+    item_indices = [idx for idx, obj in enumerate(batches[0] if batches else []) if obj.has_item()]
+    if not item_indices:
+        return [Selection(copies) for copies in batches]
+
+    positions = np.array([batches[0][idx].position for idx in item_indices], dtype=np.float64)
+    if rotations is None:
+        # N×M×3 array of the position of every copy of every item
+        new_positions = positions[np.newaxis, :, :] + offsets[:, np.newaxis, :]
+        new_rotations = None
+    else:
+        if pivot is None:
+            pivot = np.mean(positions, axis=0)
+        pivot = np.asarray(pivot, dtype=np.float64)
+
+        matrices = R.from_quat(rotations).as_matrix()
+        new_positions = np.einsum('nij,mj->nmi', matrices, positions - pivot) + pivot + offsets[:, np.newaxis, :]
+
+        # Rotate every item by the rotation of its copy, i.e., rotation * item rotation for every pair
+        item_rotations = np.array([batches[0][idx].rotation for idx in item_indices], dtype=np.float64)
+        num_items = len(item_indices)
+        combined = R.from_quat(np.repeat(rotations, num_items, axis=0)) * R.from_quat(np.tile(item_rotations,
+                                                                                               (count, 1)))
+        new_rotations = combined.as_quat().reshape(count, num_items, 4)
+
+    for copy_idx, copies in enumerate(batches):
+        for item_idx, obj_idx in enumerate(item_indices):
+            copies[obj_idx].position = new_positions[copy_idx, item_idx]
+            if new_rotations is not None:
+                copies[obj_idx].rotation = new_rotations[copy_idx, item_idx]
+
+    return [Selection(copies) for copies in batches]
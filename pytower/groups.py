@@ -0,0 +1,167 @@
+"""Group index
+
+Maps the group ids of a save to their members. Objects hold a reference to the index of their save and notify it
+whenever their group id changes, so that the index never needs to be rebuilt.
+"""
+from typing import Iterable
+
+from .object import TowerObject
+
+
+class GroupIndex:
+    """Index of the objects of a save by group id
+
+    Tracks every object it was given, grouped or not, so that objects joining a group later are picked up as well.
+    Objects whose sections were handed out for modification in place (see TowerObject.item) cannot report changes, so
+    their group ids are checked again before every query.
+    """
+    def __init__(self, objects: Iterable[TowerObject]):
+        """Creates an index of the given objects and attaches them to it
+
+        Args:
+            objects: The objects to index
+        """
+        self._group_of: dict[TowerObject, int] = {}
+        self._members: dict[int, dict[TowerObject, None]] = {}
+        # Largest group id, or None if it has to be recomputed because the largest group became empty
+        self._max_group_id: int | None = -1
+        # Objects whose group id may change without notice, see defer
+        self._pending: dict[TowerObject, None] = {}
+        for obj in objects:
+            self.add(obj)
+
+    def add(self, obj: TowerObject):
+        """Adds an object to the index and attaches it, so that it reports changes of its group id
+
+        Args:
+            obj: The object to add
+        """
+        obj._group_index = self
+        group_id = obj.group_id()
+        self._group_of[obj] = group_id
+        self._join(obj, group_id)
+        if obj._exposed:
+            self._pending[obj] = None
+
+    def discard(self, obj: TowerObject):
+        """Removes an object from the index, if it is in it, and detaches it
+
+        Args:
+            obj: The object to remove
+        """
+        group_id = self._group_of.pop(obj, None)
+        if group_id is None:
+            return
+        self._pending.pop(obj, None)
+        if obj._group_index is self:
+            obj._group_index = None
+        self._leave(obj, group_id)
+
+    def update(self, obj: TowerObject):
+        """Moves an object to its current group, called by TowerObject whenever its group id may have changed
+
+        Args:
+            obj: The object that changed
+        """
+        old_group_id = self._group_of.get(obj)
+        if old_group_id is None:
+            return
+
+        group_id = obj.group_id()
+        if group_id != old_group_id:
+            self._leave(obj, old_group_id)
+            self._group_of[obj] = group_id
+            self._join(obj, group_id)
+
+    def defer(self, obj: TowerObject):
+        """Checks the group id of an object before every later query, called once its sections may change in place
+
+        Args:
+            obj: The object whose group id may change without notice
+        """
+        if obj in self._group_of:
+            self._pending[obj] = None
+
+    def detach(self):
+        """Detaches every object, after which the index is no longer kept up to date"""
+        for obj in self._group_of:
+            if obj._group_index is self:
+                obj._group_index = None
+        self._pending.clear()
+
+    def _sync(self):
+        for obj in self._pending:
+            self.update(obj)
+
+    def _join(self, obj: TowerObject, group_id: int):
+        if group_id < 0:
+            return
+        self._members.setdefault(group_id, {})[obj] = None
+        if self._max_group_id is not None and group_id > self._max_group_id:
+            self._max_group_id = group_id
+
+    def _leave(self, obj: TowerObject, group_id: int):
+        if group_id < 0:
+            return
+        members = self._members[group_id]
+        del members[obj]
+        if not members:
+            del self._members[group_id]
+            if group_id == self._max_group_id:
+                self._max_group_id = None
+
+    def __len__(self) -> int:
+        self._sync()
+        return len(self._members)
+
+    def __contains__(self, group_id: int) -> bool:
+        self._sync()
+        return group_id in self._members
+
+    def group_ids(self) -> list[int]:
+        """Gets the ids of the non-empty groups, in increasing order"""
+        self._sync()
+        return sorted(self._members)
+
+    def members(self, group_id: int) -> list[TowerObject]:
+        """Gets the members of a group
+
+        Args:
+            group_id: The id of the group
+
+        Returns:
+            List of the objects in the group, empty if there is no such group
+        """
+        self._sync()
+        return list(self._members.get(group_id, ()))
+
+    def count(self, group_id: int) -> int:
+        """Gets the number of members of a group
+
+        Args:
+            group_id: The id of the group
+
+        Returns:
+            Number of objects in the group, 0 if there is no such group
+        """
+        self._sync()
+        return len(self._members.get(group_id, ()))
+
+    def max_group_id(self) -> int:
+        """Gets the largest group id in use, or -1 if there are no groups"""
+        self._sync()
+        if self._max_group_id is None:
+            self._max_group_id = max(self._members, default=-1)
+        return self._max_group_id
+
+    def new_group_id(self) -> int:
+        """Gets a group id that is not in use, larger than every group id in use"""
+        return self.max_group_id() + 1
+
+    def meta(self) -> list[dict]:
+        """Gets the group metadata of a save, as stored in its groups section
+
+        Returns:
+            List with the group_id and item_count of every group, in increasing group_id order
+        """
+        return [{'group_id': group_id, 'item_count': len(self._members[group_id])} for group_id in self.group_ids()]
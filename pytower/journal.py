@@ -0,0 +1,272 @@
+"""Undo/redo journal
+
+Records the changes made to a save between checkpoints as compact deltas instead of copies of the save data:
+
+- The sections of every modified object, saved right before its first modification. Only the dictionaries that are
+  modified in place are copied, everything nested in them is shared with the object until it is modified (the same
+  copy-on-write sharing as TowerObject.copy)
+- The transforms that changed, as arrays of their old and new values
+- The positions of the objects that were added or removed, and the order of the objects after sorting them
+"""
+import typing
+
+import numpy as np
+
+from .object import Sections, TowerObject
+from .transforms import TransformBatch
+
+if typing.TYPE_CHECKING:
+    from .suitebro import LazyObjectList, Suitebro
+
+Transforms = tuple[np.ndarray, np.ndarray, np.ndarray]
+ObjectList = typing.Union[list[TowerObject], 'LazyObjectList']
+
+
+def _entries(objs: ObjectList) -> list:
+    # The list underlying a list of objects, see Suitebro._object_entries
+    return objs if isinstance(objs, list) else objs._entries
+
+
+class TransformChange:
+    """Transforms of a collection of items that changed"""
+    def __init__(self, objects: list[TowerObject], old: Transforms, new: Transforms):
+        """Records the changed transforms
+
+        Args:
+            objects: The items that changed
+            old: Old position, rotation and scale arrays, one row per item
+            new: New position, rotation and scale arrays, one row per item
+        """
+        self.objects = objects
+        self.old = old
+        self.new = new
+
+    def apply(self, save: 'Suitebro', forward: bool):
+        batch = TransformBatch(self.objects, save._transforms)
+        batch.position, batch.rotation, batch.scale = self.new if forward else self.old
+        batch.apply()
+
+
+class ObjectsChange:
+    """Objects that were added to or removed from a save"""
+    def __init__(self, positions: list[int], entries: list, added: bool):
+        """Records the added or removed objects
+
+        Args:
+            positions: Ascending positions of the objects in the list of objects that contains them
+            entries: The objects (or the raw sections of objects of lazy saves), in the same order
+            added: Whether the objects were added, otherwise they were removed
+        """
+        self.positions = positions
+        self.entries = entries
+        self.added = added
+
+    def apply(self, save: 'Suitebro', forward: bool):
+        save._splice_objects(self.positions, self.entries, insert=self.added == forward)
+
+
+class OrderChange:
+    """Objects of a save that were sorted"""
+    def __init__(self, order: np.ndarray):
+        """Records the new order
+
+        Args:
+            order: The old position of each object, in the new order
+        """
+        self.order = order
+
+    def apply(self, save: 'Suitebro', forward: bool):
+        save._reorder_objects(self.order if forward else np.argsort(self.order))
+
+
+class ReplaceChange:
+    """List of objects of a save that was replaced"""
+    def __init__(self, old: ObjectList, new: ObjectList):
+        """Records the replaced list
+
+        Args:
+            old: The old list
+            new: The new list
+        """
+        # Lists are modified in place when objects are added, so their entries as of now are kept as well
+        self.old = old, list(_entries(old))
+        self.new = new, list(_entries(new))
+
+    def apply(self, save: 'Suitebro', forward: bool):
+        objs, entries = self.new if forward else self.old
+        save.objects = objs
+        save._set_object_entries(list(entries))
+
+
+Change = TransformChange | ObjectsChange | OrderChange | ReplaceChange
+
+
+class JournalStep:
+    """Changes made between two checkpoints
+
+    Attributes:
+        sections: The sections of every modified object. Before the step, its state before the first modification,
+            after the step was undone, its state after the step
+        changes: Every other change, in the order it was made
+    """
+    def __init__(self):
+        self.sections: dict[TowerObject, Sections] = {}
+        self.changes: list[Change] = []
+
+    def is_empty(self) -> bool:
+        # Sorting the objects (see Suitebro.to_dict) does not change the save, only where its objects are
+        return not self.sections and all(isinstance(change, OrderChange) for change in self.changes)
+
+
+class Journal:
+    """Undo/redo history of a save
+
+    Changes are collected into a step until the next checkpoint. undo reverts the steps one by one, and redo applies
+    the reverted steps again until the next change is made.
+    """
+    def __init__(self, save: 'Suitebro'):
+        """Creates an empty history, starting from the current state of the save
+
+        Args:
+            save: The save to record
+        """
+        self._save = save
+        self._step = JournalStep()
+        self._undo_steps: list[JournalStep] = []
+        self._redo_steps: list[JournalStep] = []
+
+        # Whether a step is being undone or redone, during which nothing is recorded
+        self._replaying = False
+
+    def record(self, obj: TowerObject):
+        """Saves the sections of an object before they are modified, called by TowerObject
+
+        Args:
+            obj: The object about to be modified
+        """
+        if not self._replaying and obj not in self._step.sections:
+            self._step.sections[obj] = obj._save_sections()
+
+    def record_transforms(self, objects: list[TowerObject], old: Transforms, new: Transforms):
+        """Records transforms that changed, called by TransformTable.record_changes
+
+        Args:
+            objects: The items that changed
+            old: Old position, rotation and scale arrays, one row per item
+            new: New position, rotation and scale arrays, one row per item
+        """
+        if not self._replaying:
+            self._step.changes.append(TransformChange(objects, old, new))
+
+    def record_objects(self, positions: list[int], entries: list, added: bool):
+        """Records objects that were added to or removed from the save
+
+        Args:
+            positions: Ascending positions of the objects in the list of objects that contains them
+            entries: The objects (or the raw sections of objects of lazy saves), in the same order
+            added: Whether the objects were added, otherwise they were removed
+        """
+        if not self._replaying and positions:
+            self._step.changes.append(ObjectsChange(positions, entries, added))
+
+    def record_order(self, order: np.ndarray):
+        """Records that the objects of the save were sorted
+
+        Args:
+            order: The old position of each object, in the new order
+        """
+        if not self._replaying:
+            self._step.changes.append(OrderChange(order))
+
+    def record_replaced(self, old: ObjectList, new: ObjectList):
+        """Records that the list of objects of the save was replaced
+
+        Args:
+            old: The old list
+            new: The new list
+        """
+        if not self._replaying:
+            self._step.changes.append(ReplaceChange(old, new))
+
+    def checkpoint(self) -> bool:
+        """Ends the current step
+
+        Returns:
+            True if anything changed since the last checkpoint, in which case the steps that were undone can no longer
+            be redone
+        """
+        # Transforms in the transform table are only recorded when asked for
+        if self._save._transforms is not None:
+            self._save._transforms.record_changes()
+
+        # Sorting alone does not end a step, the order is kept track of until the next change
+        if self._step.is_empty():
+            return False
+
+        self._undo_steps.append(self._step)
+        self._step = JournalStep()
+        self._redo_steps.clear()
+        return True
+
+    def undo(self) -> bool:
+        """Reverts the changes made since the last checkpoint, or otherwise the last step
+
+        Returns:
+            True if a step was undone, False if there is nothing left to undo
+        """
+        self.checkpoint()
+        if not self._undo_steps:
+            return False
+
+        self._revert_order()
+        step = self._undo_steps.pop()
+        self._replay(step, forward=False)
+        self._redo_steps.append(step)
+        return True
+
+    def redo(self) -> bool:
+        """Applies the last undone step again
+
+        Returns:
+            True if a step was redone, False if there is nothing to redo, including when changes were made after undo
+        """
+        self.checkpoint()
+        if not self._redo_steps:
+            return False
+
+        self._revert_order()
+        step = self._redo_steps.pop()
+        self._replay(step, forward=True)
+        self._undo_steps.append(step)
+        return True
+
+    def _revert_order(self):
+        # Puts the objects back in the order they had at the last checkpoint, which the positions of added and removed
+        #  objects in the steps refer to
+        if self._step.changes:
+            self._replay(self._step, forward=False)
+            self._step = JournalStep()
+
+    def _replay(self, step: JournalStep, forward: bool):
+        self._replaying = True
+        try:
+            # Exchange the current sections with the saved ones, so that the step can be replayed the other way later.
+            #  Sections hold the transforms of items that are not in the transform table, so the transforms are set
+            #  afterward
+            for obj, saved in step.sections.items():
+                step.sections[obj] = obj._save_sections()
+                obj._load_sections(saved)
+            if step.sections:
+                self._save._indexed = False
+                # The transforms in the loaded sections of items in the table may be outdated
+                if self._save._transforms is not None:
+                    self._save._transforms.mark_changed(step.sections)
+
+            for change in step.changes if forward else reversed(step.changes):
+                change.apply(self._save, forward)
+
+            # The replayed transforms are not changes to record
+            if self._save._transforms is not None:
+                self._save._transforms.record_changes()
+        finally:
+            self._replaying = False
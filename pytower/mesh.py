@@ -468,8 +468,7 @@ def convert_triangle(face: np.ndarray):
     for tri in tris:
         #print('Face')
         #print(tri)
-        wedge = TowerObject(item=WEDGE_ITEM_DATA, properties=WEDGE_PROPERTY_DATA)
-        wedge.item['guid'] = str(uuid.uuid4()).lower()
+        wedge = TowerObject(item=WEDGE_ITEM_DATA | {'guid': str(uuid.uuid4()).lower()}, properties=WEDGE_PROPERTY_DATA)
 
         # Scale from side lengths
         scale = wedge.scale
@@ -3,12 +3,53 @@ import json
 import logging
 import typing
 import uuid
+from typing import Iterator
 
 import numpy as np
 
 from .connections import ItemConnectionObject
 from .util import XYZ, XYZW
 
+if typing.TYPE_CHECKING:
+    from .groups import GroupIndex
+    from .journal import Journal
+    from .suitebro import LazyObjectList
+    from .transforms import TransformTable
+
+# Property-only metadata objects that come first in a save, in order
+METADATA_ORDER = ['CondoWeather', 'CondoSettingsManager', 'Ultra_Dynamic_Sky']
+
+SortKey = tuple[int, int, str]
+
+# Item and properties sections of a TowerObject
+Sections = tuple[dict | None, dict | None]
+
+# Location of a string in the sections of a TowerObject, see TowerObject.find_strings: (0 for the item section or 1 for
+#  the properties section, path of keys and indices to the string, whether the string is a dictionary key)
+StringLocation = tuple[int, tuple, bool]
+
+# Number of modifications made to TowerObjects through their methods, see modification_count
+_modifications = 0
+
+
+def section_sort_key(item: dict | None, properties: dict | None) -> SortKey:
+    """Key giving the order of an object in a save from its sections, see TowerObject.sort_key
+
+    Args:
+        item: The item section of the object
+        properties: The properties section of the object
+
+    Returns:
+        Tuple of (0 for property-only objects or 1 for items, metadata rank, name)
+    """
+    if item is None:
+        name = properties['name']
+        rank = next((rank for rank, prefix in enumerate(METADATA_ORDER) if name.startswith(prefix)),
+                    len(METADATA_ORDER))
+        return 0, rank, name
+    return 1, 0, item['name']
+
+
 ITEMCONNECTIONS_DEFAULT = json.loads('''{
               "Array": {
                 "array_type": "StructProperty",
@@ -31,8 +72,15 @@ class TowerObject:
     """Tower object
 
     Represents an object appearing in the Suitebro file. This includes all the sections of the object.
+
+    Copies made with copy() share the nested data of their sections with the source object (copy-on-write). Values are
+    only copied once they are modified through a TowerObject method, or once the item or properties attribute is
+    accessed, since the caller may then modify them in place.
     """
 
+    __slots__ = ('_item', '_properties', '_transform', '_owned', '_dirty_set', '_group_index', '_name', '_custom_name',
+                 '_group_id', '_is_canvas', '_sort_key', '_journal', '_lazy_entry', '_exposed', '__weakref__')
+
     def __init__(self, item: dict | None = None, properties: dict | None = None, nocopy: bool = False):
         """Initializes TowerObject instance taking in uesave json data
 
@@ -42,88 +90,526 @@ class TowerObject:
             nocopy: If True, then do not deep-copy the item and properties dictionaries
         """
         if nocopy:
-            self.item = item
-            self.properties = properties
+            self._item = item
+            self._properties = properties
         else:
-            self.item = copy.deepcopy(item)
-            self.properties = copy.deepcopy(properties)
+            self._item = copy.deepcopy(item)
+            self._properties = copy.deepcopy(properties)
+
+        # (table, row) of the TransformTable holding this object's transform, if any
+        self._transform: tuple['TransformTable', int] | None = None
+
+        # Copy-on-write state: None if no nested data is shared with other objects, otherwise the ids of the dicts and
+        #  lists that belong to this object alone
+        self._owned: set[int] | None = None
+
+        # Set of the Suitebro that serialized this object, notified whenever the object changes in a way that the
+        #  cached serialization does not pick up
+        self._dirty_set: set['TowerObject'] | None = None
+
+        # Group index of the Suitebro this object is in, notified whenever the group id of the object may have changed
+        self._group_index: 'GroupIndex | None' = None
+
+        # Journal of the Suitebro this object is in, given the state of the sections before they are first modified
+        self._journal: 'Journal | None' = None
+
+        # (list, raw entry) of the LazyObjectList that created this object, which only caches it weakly
+        self._lazy_entry: tuple['LazyObjectList', tuple] | None = None
+
+        # Whether the sections were handed out through the item or properties attributes, see _expose
+        self._exposed = False
+
+        self._clear_caches()
+
+    @property
+    def item(self) -> dict | None:
+        """Item section, as parsed from tower-unite-suitebro
+
+        May be modified in place. Changes made after the next to_dict of the save are only picked up by it once
+        invalidate is called.
+        """
+        self._record()
+        self._materialize()
+        self._expose()
+        return self._item
+
+    @item.setter
+    def item(self, item: dict | None):
+        self._record()
+        self._materialize()
+        self._item = item
+        self._pin()
+        self.invalidate()
+
+    @property
+    def properties(self) -> dict | None:
+        """Properties section, as parsed from tower-unite-suitebro
+
+        May be modified in place. Changes made after the next to_dict of the save are only picked up by it once
+        invalidate is called.
+        """
+        self._record()
+        self._materialize()
+        self._expose()
+        return self._properties
+
+    @properties.setter
+    def properties(self, properties: dict | None):
+        self._record()
+        self._materialize()
+        self._properties = properties
+        self._pin()
+        self.invalidate()
+
+    def has_item(self) -> bool:
+        """Whether the object has an item section, i.e., whether it is not a property-only object"""
+        return self._item is not None
+
+    def sections(self) -> Sections:
+        """Gets the item and properties sections without copying any shared data
+
+        Nested values of the returned sections may be shared with other objects, so they must not be modified in place.
+        Use the item and properties attributes to modify the sections.
+
+        Returns:
+            Tuple of the item section and properties section
+        """
+        return self._item, self._properties
+
+    def find_strings(self, predicate: typing.Callable[[str], bool]) -> list[StringLocation]:
+        """Finds the strings in the item and properties sections that satisfy a predicate, including dictionary keys
+
+        Args:
+            predicate: Function returning whether a string should be found
+
+        Returns:
+            Locations of the found strings, usable with replace_strings on this object and on its copies (see copy), as
+            long as the structure of their sections does not change
+        """
+        locations: list[StringLocation] = []
+
+        def find(section: int, container: dict | list, path: tuple):
+            is_dict = isinstance(container, dict)
+            for key, value in container.items() if is_dict else enumerate(container):
+                if is_dict and isinstance(key, str) and predicate(key):
+                    locations.append((section, path + (key,), True))
+                if isinstance(value, str):
+                    if predicate(value):
+                        locations.append((section, path + (key,), False))
+                elif isinstance(value, (dict, list)) and value:
+                    find(section, value, path + (key,))
+
+        for section, data in enumerate((self._item, self._properties)):
+            if data is not None:
+                find(section, data, ())
+        return locations
+
+    def replace_strings(self, replace: typing.Callable[[str], str],
+                        locations: list[StringLocation] | None = None) -> bool:
+        """Replaces the strings in the item and properties sections, including dictionary keys
+
+        Only the dicts and lists leading to a replaced string are copied, so data shared with other objects (see copy)
+        stays shared where nothing was replaced.
+
+        Args:
+            replace: Function returning the replacement of a string, or the string itself to keep it
+            locations: Locations of the strings to replace, as returned by find_strings, to avoid searching the
+                sections of many copies of the same object. By default, every string is passed to replace
+
+        Returns:
+            True if any string was replaced
+        """
+        if locations is None:
+            locations = self.find_strings(lambda text: replace(text) != text)
+
+        if locations:
+            self._record()
+
+        sections = (self._item, self._properties)
+        replaced = False
+        renamed: dict[tuple[int, tuple], dict[str, str]] = {}
+        for section, path, is_key in locations:
+            if is_key:
+                new_key = replace(path[-1])
+                if new_key != path[-1]:
+                    renamed.setdefault((section, path[:-1]), {})[path[-1]] = new_key
+                continue
+
+            value = sections[section]
+            for key in path:
+                value = value[key]
+            new_value = replace(value)
+            if new_value != value:
+                self._own(sections[section], *path[:-1])[path[-1]] = new_value
+                replaced = True
+
+        # Deepest dicts first, so that the paths of the remaining dicts still use their old keys
+        for (section, path), keys in sorted(renamed.items(), key=lambda entry: len(entry[0][1]), reverse=True):
+            container = self._own(sections[section], *path)
+            entries = list(container.items())
+            container.clear()
+            container.update((keys.get(key, key), value) for key, value in entries)
+            replaced = True
+
+        if replaced:
+            self.invalidate()
+        return replaced
+
+    def _containers(self) -> Iterator[dict]:
+        # Dictionaries that are never shared with other objects, the top level of each section and its properties
+        for section in (self._item, self._properties):
+            if section is not None:
+                yield section
+                yield section['properties']
+
+    def _share(self) -> 'TowerObject':
+        # Nested values of the source are now shared as well, so both objects copy them before modifying them
+        shared = TowerObject(*self._save_sections(), nocopy=True)
+        shared._share_nested()
+        return shared
+
+    def _save_sections(self) -> Sections:
+        # Copies the containers that are modified in place (see _containers) and shares everything nested in them with
+        #  the copies, so that the returned sections keep the current state while this object is modified
+        def share_section(section: dict | None) -> dict | None:
+            if section is None:
+                return None
+            shared = dict(section)
+            shared['properties'] = dict(section['properties'])
+            return shared
+
+        saved = share_section(self._item), share_section(self._properties)
+        self._share_nested()
+        return saved
+
+    def _load_sections(self, saved: Sections):
+        # Replaces the state of the sections with sections returned by _save_sections. The section dictionaries are
+        #  updated in place where possible, since saves and the serialization cache refer to them
+        def load_section(section: dict | None, saved_section: dict | None) -> dict | None:
+            if saved_section is None:
+                return None
+            if section is None:
+                section = {'properties': {}}
+            properties = section['properties']
+            properties.clear()
+            properties.update(saved_section['properties'])
+            section.clear()
+            section.update(saved_section)
+            section['properties'] = properties
+            return section
+
+        self._item = load_section(self._item, saved[0])
+        self._properties = load_section(self._properties, saved[1])
+        self._share_nested()
+        self.invalidate()
+
+    def _share_nested(self):
+        # Nested values of the sections may now be shared with other objects, only the containers belong to this object
+        self._owned = set(map(id, self._containers()))
+        self._pin()
+
+    def _pin(self):
+        # Called once this object holds state that its raw lazy entry does not record, such as ownership of shared data
+        #  or replaced sections, so that it must outlive the weak cache of its lazy list
+        if self._lazy_entry is not None:
+            lazy_list, entry = self._lazy_entry
+            lazy_list._pin(entry, self)
+
+    def _record(self):
+        # Lets the journal keep the state of the sections before they are modified
+        if self._journal is not None:
+            self._journal.record(self)
+
+    def _own(self, container: dict | list, *path: str | int) -> dict | list:
+        # Walks the path from container, shallow-copying every dict and list along it that may be shared with other
+        #  objects, so that the returned value can be modified in place
+        for key in path:
+            value = container[key]
+            if self._owned is not None and id(value) not in self._owned:
+                value = copy.copy(value)
+                container[key] = value
+                self._owned.add(id(value))
+            container = value
+        return container
+
+    def _set_owned(self, container: dict | list, key: str | int, value: typing.Any):
+        # Sets container[key] to a value that is not shared with other objects
+        container[key] = value
+        if self._owned is not None and isinstance(value, (dict, list)):
+            self._owned.add(id(value))
+
+    def _materialize(self):
+        # Copies every value that may still be shared with other objects
+        if self._owned is None:
+            return
+
+        owned = self._owned
+
+        def materialize(container: dict | list):
+            entries = container.items() if isinstance(container, dict) else enumerate(container)
+            for key, value in list(entries):
+                if not isinstance(value, (dict, list)):
+                    continue
+                if id(value) in owned:
+                    materialize(value)
+                else:
+                    container[key] = copy.deepcopy(value)
+
+        for section in (self._item, self._properties):
+            if section is not None:
+                materialize(section)
+        self._owned = None
+
+    def invalidate(self):
+        """Clears the cached name, custom name, group id and canvas flag
+
+        Only needed after modifying the item or properties sections in place once the save was serialized by to_dict
+        since they were obtained, or after modifying them without going through the item or properties attributes
+        """
+        self._mark_dirty()
+        self._clear_caches()
+        if self._group_index is not None:
+            self._group_index.update(self)
+
+    def _expose(self):
+        # The sections are about to be modified in place, at any time from now on, so the values derived from them are
+        #  no longer cached and the group index checks the group id of this object before every query
+        self._exposed = True
+        self._mark_dirty()
+        self._clear_caches()
+        if self._group_index is not None:
+            self._group_index.defer(self)
+
+    def _clear_caches(self):
+        self._name: str | None = None
+        self._custom_name: str | None = None
+        self._group_id: int | None = None
+        self._is_canvas: bool | None = None
+        self._sort_key: SortKey | None = None
+
+    def _mark_dirty(self):
+        global _modifications
+        _modifications += 1
+        if self._dirty_set is not None:
+            self._dirty_set.add(self)
+
+    def sort_key(self) -> SortKey:
+        """Key giving the order of objects in a save
+
+        Property-only objects come first, starting with the metadata objects in METADATA_ORDER, followed by items
+        sorted by name.
+
+        Returns:
+            Tuple of (0 for property-only objects or 1 for items, metadata rank, name)
+        """
+        if self._exposed:
+            self._clear_caches()
+        if self._sort_key is None:
+            self._sort_key = section_sort_key(self._item, self._properties)
+        return self._sort_key
 
     def is_canvas(self) -> bool:
-        if self.item is None:
-            return False
+        if self._exposed:
+            self._clear_caches()
+        if self._is_canvas is None:
+            if self._item is None:
+                self._is_canvas = False
+            else:
+                item_props = self._item['properties']
+                self._is_canvas = self.get_name().startswith('Canvas') or 'SurfaceMaterial' in item_props \
+                    or 'URL' in item_props
+        return self._is_canvas
+
+    def get_material(self) -> str | None:
+        """Gets the material (SurfaceMaterial) of a canvas
+
+        Returns:
+            The material, which is empty for canvases showing an image, or None if the object has no material
+        """
+        if self._properties is None or 'SurfaceMaterial' not in self._properties['properties']:
+            return None
+        return self._properties['properties']['SurfaceMaterial']['Object']['value']
 
-        item_props = self.item['properties']
-        return self.get_name().startswith('Canvas') or 'SurfaceMaterial' in item_props or 'URL' in item_props
+    def get_url(self) -> str | None:
+        """Gets the image URL of a canvas
+
+        Returns:
+            The URL, which is empty for canvases showing a material, or None if the object has no URL
+        """
+        if self._properties is None or 'URL' not in self._properties['properties']:
+            return None
+        return self._properties['properties']['URL']['Str']['value']
+
+    def get_additional_urls(self) -> list[str]:
+        """Gets the additional image URLs of a canvas (AdditionalURLs), which are empty for most canvases"""
+        if self._properties is None or 'AdditionalURLs' not in self._properties['properties']:
+            return []
+        return list(self._properties['properties']['AdditionalURLs']['Array']['value']['Base']['Str'])
+
+    def set_material(self, material: str):
+        """Makes a canvas show a material instead of an image
+
+        Args:
+            material: The material to show
+        """
+        self._record()
+        item_props = self._item['properties']
+        if 'URL' in item_props:
+            del item_props['URL']
+        self._set_owned(item_props, 'SurfaceMaterial', {'Object': {'value': material}})
+
+        prop_props = self._properties['properties']
+        self._set_owned(prop_props, 'SurfaceMaterial', {'Object': {'value': material}})
+        self._set_owned(prop_props, 'URL', {'Str': {'value': ''}})
+        self._mark_dirty()
+
+    def set_url(self, url: str):
+        """Makes a canvas show an image instead of a material
+
+        Args:
+            url: URL of the image to show
+        """
+        self._record()
+        item_props = self._item['properties']
+        if 'SurfaceMaterial' in item_props:
+            del item_props['SurfaceMaterial']
+        self._set_owned(item_props, 'URL', {'Str': {'value': url}})
+
+        prop_props = self._properties['properties']
+        self._set_owned(prop_props, 'SurfaceMaterial', {'Object': {'value': ''}})
+        self._set_owned(prop_props, 'URL', {'Str': {'value': url}})
+        self._mark_dirty()
+
+    def set_additional_urls(self, urls: list[str]):
+        """Sets the additional image URLs of a canvas that has them
+
+        Args:
+            urls: The new URLs
+        """
+        self._record()
+        for section in (self._item, self._properties):
+            if section is not None and 'AdditionalURLs' in section['properties']:
+                array = self._own(section['properties'], 'AdditionalURLs', 'Array', 'value', 'Base')
+                self._set_owned(array, 'Str', list(urls))
+        self._mark_dirty()
 
     def get_name(self) -> str:
-        if self.item is None:
-            return self.properties['name']
-        return self.item['name']
+        if self._exposed:
+            self._clear_caches()
+        if self._name is None:
+            self._name = self._properties['name'] if self._item is None else self._item['name']
+        return self._name
 
     def get_custom_name(self) -> str:
-        if self.item is None or 'ItemCustomName' not in self.item['properties']:
-            return ''
-        return self.item['properties']['ItemCustomName']['Name']['value']
+        if self._exposed:
+            self._clear_caches()
+        if self._custom_name is None:
+            if self._item is None or 'ItemCustomName' not in self._item['properties']:
+                self._custom_name = ''
+            else:
+                self._custom_name = self._item['properties']['ItemCustomName']['Name']['value']
+        return self._custom_name
+
+    def set_custom_name(self, name: str):
+        self._record()
+        self._set_owned(self._item['properties'], 'ItemCustomName', {'Name': {'value': name}})
+        if self._properties is not None and 'ItemCustomName' in self._properties['properties']:
+            self._set_owned(self._properties['properties'], 'ItemCustomName', {'Name': {'value': name}})
+        self._custom_name = name
+        self._mark_dirty()
 
     def matches_name(self, name) -> bool:
         name = name.casefold()
         return self.get_name().casefold() == name or self.get_custom_name().casefold() == name
 
     def group_id(self) -> int:
-        if self.item is None or 'GroupID' not in self.item['properties']:
-            return -1
-        return self.item['properties']['GroupID']['Int']['value']
+        if self._exposed:
+            self._clear_caches()
+        if self._group_id is None:
+            if self._item is None or 'GroupID' not in self._item['properties']:
+                self._group_id = -1
+            else:
+                self._group_id = self._item['properties']['GroupID']['Int']['value']
+        return self._group_id
 
     def set_group_id(self, group_id: int):
-        self.item['properties']['GroupID'] = {'Int': {'value': group_id}}
-        if self.properties is not None:
-            self.properties['properties']['GroupID'] = {'Int': {'value': group_id}}
+        self._record()
+        self._set_owned(self._item['properties'], 'GroupID', {'Int': {'value': group_id}})
+        if self._properties is not None:
+            self._set_owned(self._properties['properties'], 'GroupID', {'Int': {'value': group_id}})
+        self._group_id = group_id
+        self._group_changed()
 
     # Removes group info from self
     def ungroup(self):
-        if self.item is not None and 'GroupID' in self.item['properties']:
-            del self.item['properties']['GroupID']
+        self._record()
+        if self._item is not None and 'GroupID' in self._item['properties']:
+            del self._item['properties']['GroupID']
+
+            if self._properties is not None:
+                del self._properties['properties']['GroupID']
+        self._group_id = -1
+        self._group_changed()
 
-            if self.properties is not None:
-                del self.properties['properties']['GroupID']
+    def _group_changed(self):
+        self._mark_dirty()
+        if self._group_index is not None:
+            self._group_index.update(self)
 
     def copy(self) -> 'TowerObject':
-        copied = TowerObject(item=self.item, properties=self.properties)
-        if copied.item is not None:
-            copied.item['guid'] = str(uuid.uuid4()).lower()
+        copied = self._share()
+        if copied._item is not None:
+            copied._item['guid'] = str(uuid.uuid4()).lower()
+
+        # The sections may hold an outdated transform while it is stored in a TransformTable
+        if self._transform is not None:
+            copied._store_position(self.position)
+            copied._store_rotation(self.rotation)
+            copied._store_scale(self.scale)
         return copied
 
+    def flush_transform(self):
+        """Writes the transform back into the sections and detaches the object from its TransformTable, if any"""
+        if self._transform is None:
+            return
+
+        position, rotation, scale = self.position, self.rotation, self.scale
+        self._transform = None
+        self._store_position(position)
+        self._store_rotation(rotation)
+        self._store_scale(scale)
+
     def guid(self) -> str:
-        return self.item['guid']
+        return self._item['guid']
 
     def _get_xyz_attr(self, name: str) -> XYZ | None:
-        if self.item is None:
+        if self._item is None:
             return None
-        xyz = self.item[name]
+        xyz = self._item[name]
         return np.array([xyz['x'], xyz['y'], xyz['z']]).view(XYZ)
 
     def _set_xyz_attr(self, name: str, value: XYZ):
-        if self.item is None:
+        if self._item is None:
             logging.warning(f'Attempted to xyz set {name} on a property-only object!')
             return
 
-        pos = self.item[name]
+        pos = self._own(self._item, name)
         pos['x'] = value[0]
         pos['y'] = value[1]
         pos['z'] = value[2]
 
     def _get_xyzw_attr(self, name: str) -> XYZW | None:
-        if self.item is None:
+        if self._item is None:
             return None
-        xyzw = self.item[name]
+        xyzw = self._item[name]
         return np.array([xyzw['x'], xyzw['y'], xyzw['z'], xyzw['w']]).view(XYZW)
 
     def _set_xyzw_attr(self, name: str, value: XYZW):
-        if self.item is None:
+        if self._item is None:
             logging.warning(f'Attempted to xyzw set {name} on a property-only object!')
             return
 
-        pos = self.item[name]
+        pos = self._own(self._item, name)
         pos['x'] = value[0]
         pos['y'] = value[1]
         pos['z'] = value[2]
@@ -132,136 +618,176 @@ class TowerObject:
     @property
     def position(self) -> XYZ | None:
         """World position"""
+        if self._transform is not None:
+            table, row = self._transform
+            return table.position[row].copy().view(XYZ)
         return self._get_xyz_attr('position')
 
     @position.setter
     def position(self, value: XYZ):
+        if self._transform is not None:
+            table, row = self._transform
+            table.position[row] = value
+            return
+        self._record()
+        self._store_position(value)
+
+    def _store_position(self, value: XYZ):
         self._set_xyz_attr('position', value)
 
-        if self.item and self.properties:
-            item_props = self.item['properties']
-            prop_props = self.properties['properties']
+        if self._item and self._properties:
+            item_props = self._item['properties']
+            prop_props = self._properties['properties']
 
             if 'RespawnLocation' in prop_props:
-                translation = prop_props['RespawnLocation']['Struct']['value']['Struct']['Translation']['Struct']
-                translation['value']['Vector']['x'] = value[0]
-                translation['value']['Vector']['y'] = value[1]
-                translation['value']['Vector']['z'] = value[2]
-
-                item_props['RespawnLocation'] = prop_props['RespawnLocation']
+                translation = self._own(prop_props, 'RespawnLocation', 'Struct', 'value', 'Struct', 'Translation',
+                                        'Struct', 'value', 'Vector')
+                translation['x'] = value[0]
+                translation['y'] = value[1]
+                translation['z'] = value[2]
 
+                self._set_owned(item_props, 'RespawnLocation', prop_props['RespawnLocation'])
 
     @property
     def rotation(self) -> XYZW | None:
         """Rotation quaternion"""
+        if self._transform is not None:
+            table, row = self._transform
+            return table.rotation[row].copy().view(XYZW)
         return self._get_xyzw_attr('rotation')
 
     @rotation.setter
     def rotation(self, value: XYZW):
+        if self._transform is not None:
+            table, row = self._transform
+            table.rotation[row] = value
+            return
+        self._record()
+        self._store_rotation(value)
+
+    def _store_rotation(self, value: XYZW):
         self._set_xyzw_attr('rotation', value)
 
-        if self.item and self.properties:
-            item_props = self.item['properties']
-            prop_props = self.properties['properties']
+        if self._item and self._properties:
+            item_props = self._item['properties']
+            prop_props = self._properties['properties']
 
             if 'RespawnLocation' in prop_props:
-                rot = prop_props['RespawnLocation']['Struct']['value']['Struct']['Rotation']['Struct']['value']
-                rot['Quat']['x'] = value[0]
-                rot['Quat']['y'] = value[1]
-                rot['Quat']['z'] = value[2]
-                rot['Quat']['w'] = value[3]
+                rot = self._own(prop_props, 'RespawnLocation', 'Struct', 'value', 'Struct', 'Rotation', 'Struct',
+                                'value', 'Quat')
+                rot['x'] = value[0]
+                rot['y'] = value[1]
+                rot['z'] = value[2]
+                rot['w'] = value[3]
 
-                item_props['RespawnLocation'] = prop_props['RespawnLocation']
+                self._set_owned(item_props, 'RespawnLocation', prop_props['RespawnLocation'])
 
     @property
     def scale(self) -> XYZ | None:
         """Local scale"""
+        if self._transform is not None:
+            table, row = self._transform
+            return table.scale[row].copy().view(XYZ)
         return self._get_xyz_attr('scale')
 
     @scale.setter
     def scale(self, value: XYZ):
+        if self._transform is not None:
+            table, row = self._transform
+            table.scale[row] = value
+            return
+        self._record()
+        self._store_scale(value)
+
+    def _store_scale(self, value: XYZ):
         self._set_xyz_attr('scale', value)
 
-        if self.properties:
-            props = self.properties['properties']
+        if self._properties:
+            props = self._properties['properties']
 
             if 'WorldScale' in props:
-                props['WorldScale']['Struct']['value']['Vector']['x'] = value[0]
-                props['WorldScale']['Struct']['value']['Vector']['y'] = value[1]
-                props['WorldScale']['Struct']['value']['Vector']['z'] = value[2]
+                world_scale = self._own(props, 'WorldScale', 'Struct', 'value', 'Vector')
+                world_scale['x'] = value[0]
+                world_scale['y'] = value[1]
+                world_scale['z'] = value[2]
 
-                self.item['properties']['WorldScale'] = props['WorldScale']
+                self._set_owned(self._item['properties'], 'WorldScale', props['WorldScale'])
 
-            if ('RespawnLocation' in props and 'properties' in self.item
-                    and 'RespawnLocation' in self.item['properties']):
-                scale3d_data = props['RespawnLocation']['Struct']['value']['Struct']['Scale3D']
-                scale3d = scale3d_data['Struct']['value']['Vector']
+            if ('RespawnLocation' in props and 'properties' in self._item
+                    and 'RespawnLocation' in self._item['properties']):
+                scale3d = self._own(props, 'RespawnLocation', 'Struct', 'value', 'Struct', 'Scale3D', 'Struct', 'value',
+                                    'Vector')
                 scale3d['x'] = value[0]
                 scale3d['y'] = value[1]
                 scale3d['z'] = value[2]
 
-                self.item['properties']['RespawnLocation'] = props['RespawnLocation']
+                self._set_owned(self._item['properties'], 'RespawnLocation', props['RespawnLocation'])
 
     def _check_connetions(self):
-        if self.item is not None and 'ItemConnections' not in self.item.keys():
-            self.item['ItemConnections'] = copy.deepcopy(ITEMCONNECTIONS_DEFAULT)
+        if self._item is not None and 'ItemConnections' not in self._item.keys():
+            self._set_owned(self._item, 'ItemConnections', copy.deepcopy(ITEMCONNECTIONS_DEFAULT))
 
     def add_connection(self, con: ItemConnectionObject):
-        assert self.item is not None
+        assert self._item is not None
+        self._record()
         self._check_connetions()
 
-        connections = self.item['properties']['ItemConnections']['Array']['value']['Struct']['value']
+        item_props = self._item['properties']
+        connections = self._own(item_props, 'ItemConnections', 'Array', 'value', 'Struct', 'value')
         connections.append(con.to_dict())
 
-        if self.properties is not None:
-            self.properties['properties']['ItemConnections'] = self.item['properties']['ItemConnections']
+        if self._properties is not None:
+            self._set_owned(self._properties['properties'], 'ItemConnections', item_props['ItemConnections'])
 
     def get_connections(self) -> list[ItemConnectionObject]:
-        assert self.item is not None
+        assert self._item is not None
+        self._record()
         self._check_connetions()
 
+        # Connections can be modified in place through the returned objects, so they must not be shared
+        connections = self._own(self._item['properties'], 'ItemConnections', 'Array', 'value', 'Struct', 'value')
+        if self._owned is not None:
+            for idx, data in enumerate(connections):
+                if id(data) not in self._owned:
+                    self._set_owned(connections, idx, copy.deepcopy(data))
+
         cons = []
-        for data in self.item['properties']['ItemConnections']['Array']['value']['Struct']['value']:
+        for data in connections:
             cons.append(ItemConnectionObject(data))
 
         return cons
 
     def set_connections(self, cons: list[ItemConnectionObject]):
-        assert self.item is not None
+        assert self._item is not None
+        self._record()
         self._check_connetions()
 
-        self.item['properties']['ItemConnections']['Array']['value']['Struct']['value'] \
-            = list(map(lambda con: con.to_dict(), cons))
+        item_props = self._item['properties']
+        struct = self._own(item_props, 'ItemConnections', 'Array', 'value', 'Struct')
+        self._set_owned(struct, 'value', list(map(lambda con: con.to_dict(), cons)))
 
-        if self.properties is not None:
-            self.properties['properties']['ItemConnections'] = self.item['properties']['ItemConnections']
+        if self._properties is not None:
+            self._set_owned(self._properties['properties'], 'ItemConnections', item_props['ItemConnections'])
 
     def __lt__(self, other):
         if not isinstance(other, TowerObject):
             return False
+        return self.sort_key() < other.sort_key()
 
-        if self.item is None and other.item is None:
-            # CondoWeather needs to always be first, followed by CondoSettingsManager, then Ultra_Dynamic_Sky?
-            if self.properties['name'].startswith('CondoWeather'):
-                return True
-            elif self.properties['name'].startswith('CondoSettingsManager'):
-                return not other.properties['name'].startswith('CondoWeather')
-            elif self.properties['name'].startswith('Ultra_Dynamic_Sky'):
-                return (not other.properties['name'].startswith('CondoWeather')) and \
-                    (not other.properties['name'].startswith('CondoSettingsManager'))
+    def __repl__(self):
+        return f'TowerObject({self._item}, {self._properties})'
 
-            return self.properties['name'] < other.properties['name']
+    def __str__(self):
+        return self.__repl__()
 
-        if self.item is None:
-            return True
 
-        if other.item is None:
-            return False
+def modification_count() -> int:
+    """Gets the number of modifications made to any TowerObject so far
 
-        return self.item['name'] < other.item['name']
+    Counts changes made through TowerObject methods and calls to TowerObject.invalidate, except for changes to
+    positions, rotations and scales, which are mostly made through the arrays of a TransformTable.
 
-    def __repl__(self):
-        return f'TowerObject({self.item}, {self.properties})'
-
-    def __str__(self):
-        return self.__repl__()
+    Returns:
+        The modification count, which only ever increases
+    """
+    return _modifications
@@ -0,0 +1,109 @@
+"""Parallel per-group tool execution
+
+Runs a tool separately on every group of a selection (and on every ungrouped object by itself) across a pool of worker
+processes. Only tools that declare GROUP_PARALLEL = True can be run this way: they must only change the transforms of
+the objects they are given, since workers run on copies of the objects and only send back the transforms that changed.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from types import ModuleType
+
+import numpy as np
+
+from .object import TowerObject
+from .selection import Selection
+from .suitebro import Suitebro
+from .tool_lib import ParameterDict, load_tool
+from .transforms import TransformBatch
+
+# Number of chunks of groups per worker, so that workers that get cheap chunks pick up more of them
+CHUNKS_PER_JOB = 4
+
+# Tool modules loaded by this worker process, by script path
+_worker_tools: dict[str, ModuleType] = {}
+
+Sections = tuple[dict | None, dict | None]
+TransformDelta = tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def _partition(groups: list[list[TowerObject]], num_chunks: int) -> list[list[list[TowerObject]]]:
+    # Splits the groups into contiguous chunks of about the same number of objects
+    total = sum(map(len, groups))
+    chunk_size = max(1, -(-total // max(1, num_chunks)))
+    chunks = []
+    chunk = []
+    chunk_len = 0
+    for group in groups:
+        chunk.append(group)
+        chunk_len += len(group)
+        if chunk_len >= chunk_size:
+            chunks.append(chunk)
+            chunk = []
+            chunk_len = 0
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def _run_chunk(tool_path: str, params: ParameterDict, groups: list[list[Sections]]) -> TransformDelta:
+    # Runs the tool on every group of a chunk, in a worker process. Returns the index of every item (in the order of
+    #  the items of the chunk) whose transform changed, and its new position, rotation and scale
+    module = _worker_tools.get(tool_path)
+    if module is None:
+        module, _ = load_tool(tool_path, verbose=False)
+        _worker_tools[tool_path] = module
+
+    objects = [[TowerObject(item, properties, nocopy=True) for item, properties in group] for group in groups]
+    save = Suitebro('CondoData', '.', {'items': [], 'properties': []})
+    save.objects = [obj for group in objects for obj in group]
+
+    before = TransformBatch(save.objects, save.transforms)
+    for group in objects:
+        module.main(save, Selection(group, registry=save.registry), params)
+    after = TransformBatch(save.objects, save.transforms)
+
+    changed = np.flatnonzero(np.any(before.position != after.position, axis=1) |
+                             np.any(before.rotation != after.rotation, axis=1) |
+                             np.any(before.scale != after.scale, axis=1))
+    return changed, after.position[changed], after.rotation[changed], after.scale[changed]
+
+
+def run_per_group(save: Suitebro, module: ModuleType, selection: Selection, params: ParameterDict,
+                  jobs: int | None = None):
+    """Runs a tool on every group of a selection, and on every ungrouped object by itself, in parallel
+
+    Args:
+        save: The save the selection is from
+        module: The tool module, which must declare GROUP_PARALLEL = True
+        selection: The selection to split into groups
+        params: The parameters passed to the tool
+        jobs: Number of worker processes, by default the number of CPUs
+    """
+    groups = [list(group) for _, group in selection.groups()]
+    groups += [[obj] for obj in selection.ungrouped()]
+    if not groups:
+        return
+
+    jobs = jobs or os.cpu_count() or 1
+    chunks = _partition(groups, jobs * CHUNKS_PER_JOB)
+
+    # Workers read the transforms from the sections, so write back the ones held by the transform table
+    table = save.transforms
+    table.flush()
+
+    tool_path = module.__file__
+    with ProcessPoolExecutor(max_workers=min(jobs, len(chunks))) as executor:
+        futures = [executor.submit(_run_chunk, tool_path, params, [[obj.sections() for obj in group]
+                                                                   for group in chunk])
+                   for chunk in chunks]
+
+        for chunk, future in zip(chunks, futures):
+            changed, position, rotation, scale = future.result()
+            if len(changed) == 0:
+                continue
+
+            batch = TransformBatch((obj for group in chunk for obj in group), table)
+            batch.position[changed] = position
+            batch.rotation[changed] = rotation
+            batch.scale[changed] = scale
+            batch.apply()
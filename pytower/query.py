@@ -0,0 +1,359 @@
+"""Selection queries
+
+Parses the expressions given to --select into selectors, optimizes them and caches their results per save.
+
+Grammar, from lowest to highest precedence:
+    query      := chain
+    chain      := or (';' or)*             each part selects from the result of the previous one
+    or         := and (('|' | 'or') and)*
+    and        := not (('&' | 'and') not)*
+    not        := ('!' | 'not') not | '(' query ')' | term
+    term       := comparison | selector
+    comparison := attribute ('<' | '<=' | '>' | '>=' | '=' | '==' | '!=') number
+    selector   := any selection mode accepted by parse_selector, e.g., regex:Canvas.* or box:0,0,0/100,100,100
+
+Attributes are group and the components of transforms: position.x, rotation.w, scale.z, etc. Parentheses inside a
+term (e.g., regex:(Canvas|Cube).*) are part of the term. Parts of a term can be quoted with " or ' to include
+operators or whitespace, e.g., regex:"Canvas|Cube" or customname:'Rock and Roll'.
+"""
+import functools
+import re
+import weakref
+
+import numpy as np
+
+from .selection import *
+from .suitebro import Suitebro
+from .util import xyz
+
+# Number of results cached per save by select
+RESULT_CACHE_SIZE = 32
+
+_OPERATOR_CHARS = '()&|;!'
+_KEYWORDS = {'and': '&', 'or': '|', 'not': '!'}
+_COMPARISON = re.compile(r'([a-z]+(?:\.[a-z])?)\s*(<=|>=|==|!=|<|>|=)\s*([-+0-9.e]+)', re.IGNORECASE)
+
+
+class QueryError(ValueError):
+    """Raised for queries that cannot be parsed"""
+
+
+def _parse_seed(options: list[str]) -> int | None:
+    # Parses the options of the sampling selection modes, of which seed=<N> is the only one
+    seed = None
+    for option in options:
+        name, _, value = option.partition('=')
+        if name.strip() != 'seed':
+            raise ValueError(f'unknown option: {option}')
+        seed = int(value)
+    return seed
+
+
+def parse_selector(selection_input: str):
+    sel_input = selection_input.casefold().strip()
+    sel_split = sel_input.split(':')
+    sel_split_case_sensitive = selection_input.strip().split(':')
+
+    if len(sel_split) > 2:
+        return None
+    elif sel_input == 'item' or sel_input == 'items':
+        selector = ItemSelector()
+    elif sel_input == 'all' or sel_input == 'everything':
+        selector = EverythingSelector()
+    elif sel_input == 'none' or sel_input == 'nothing':
+        selector = NothingSelector()
+    elif sel_input.startswith('group:'):
+        gid_input = sel_split[1]
+        try:
+            group_id = int(gid_input)
+            selector = GroupSelector(group_id)
+        except ValueError:
+            print(f'{gid_input} is not valid group_id!')
+            return None
+    elif sel_input.startswith('regex:'):
+        selector = RegexSelector(sel_split_case_sensitive[1])
+    elif sel_input.startswith('name:'):
+        selector = NameSelector(sel_split[1])
+    elif sel_input.startswith('customname:'):
+        selector = CustomNameSelector(sel_split[1])
+    elif sel_input.startswith('objname:'):
+        selector = ObjectNameSelector(sel_split[1])
+    elif sel_input.startswith('random:'):
+        params = sel_split[1].split('/')
+        probability = float(params[0])
+        selector = RandomSelector(probability, seed=_parse_seed(params[1:]))
+    elif sel_input.startswith('percent:') or re.fullmatch('\\d+\\.?\\d*%(/.*)?', sel_input):
+        params = (sel_split[1] if sel_input.startswith('percent:') else sel_input).split('/')
+        percentage = float(params[0].removesuffix('%'))
+        selector = PercentSelector(percentage, seed=_parse_seed(params[1:]))
+    elif sel_input.startswith('take:') or re.match('\\d+', sel_input):
+        params = (sel_split[1] if sel_input.startswith('take:') else sel_input).split('/')
+        num = int(params[0])
+        selector = TakeSelector(num, seed=_parse_seed(params[1:]))
+    elif sel_input.startswith('box:'):
+        positions = sel_split[1].split('/')
+        pos1 = xyz(positions[0])
+        pos2 = xyz(positions[1])
+        selector = BoxSelector(pos1, pos2)
+    elif sel_input.startswith('sphere:'):
+        params = sel_split[1].split('/')
+        center = xyz(params[0])
+        radius = float(params[1])
+        selector = SphereSelector(center, radius)
+    elif sel_input.startswith('nearest:'):
+        params = sel_split[1].split('/')
+        center = xyz(params[0])
+        count = int(params[1])
+        selector = NearestSelector(center, count)
+    elif sel_input.startswith('within:'):
+        params = sel_split[1].split('/')
+        guid = params[0]
+        radius = float(params[1])
+        selector = WithinSelector(guid, radius)
+    else:
+        return None
+
+    return selector
+
+
+class _Token:
+    def __init__(self, kind: str, value: str, pos: int, spaced: bool):
+        # kind is 'op' for operators (value is one of _OPERATOR_CHARS) or 'word' for parts of terms. spaced tells
+        #  whether the token was preceded by whitespace
+        self.kind = kind
+        self.value = value
+        self.pos = pos
+        self.spaced = spaced
+
+
+def _tokenize(text: str) -> list[_Token]:
+    tokens = []
+    pos = 0
+    spaced = False
+    while pos < len(text):
+        char = text[pos]
+        if char.isspace():
+            spaced = True
+            pos += 1
+            continue
+
+        # '!=' is a comparison rather than a negation
+        if char in _OPERATOR_CHARS and not text.startswith('!=', pos):
+            tokens.append(_Token('op', char, pos, spaced))
+            spaced = False
+            pos += 1
+            continue
+
+        # Words run until whitespace or an operator, except inside quotes, and inside parentheses opened by the word
+        start = pos
+        word = []
+        depth = 0
+        quoted = False
+        while pos < len(text):
+            char = text[pos]
+            if char in '"\'':
+                end = text.find(char, pos + 1)
+                if end < 0:
+                    raise QueryError(f'Unterminated quote at position {pos}')
+                word.append(text[pos + 1:end])
+                quoted = True
+                pos = end + 1
+                continue
+            if depth == 0 and (char.isspace() or (char in _OPERATOR_CHARS and not text.startswith('!=', pos)
+                                                  and not (char == '(' and word))):
+                break
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+            word.append(char)
+            pos += 1
+
+        value = ''.join(word)
+        if not quoted and value.casefold() in _KEYWORDS:
+            tokens.append(_Token('op', _KEYWORDS[value.casefold()], start, spaced))
+        else:
+            tokens.append(_Token('word', value, start, spaced))
+        spaced = False
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def _peek(self) -> _Token | None:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _accept(self, op: str) -> bool:
+        token = self._peek()
+        if token is not None and token.kind == 'op' and token.value == op:
+            self.pos += 1
+            return True
+        return False
+
+    def parse(self) -> Selector:
+        if not self.tokens:
+            raise QueryError('Empty selection')
+        selector = self._chain()
+        token = self._peek()
+        if token is not None:
+            raise QueryError(f'Unexpected "{token.value}" at position {token.pos}')
+        return selector
+
+    def _chain(self) -> Selector:
+        selectors = [self._or()]
+        while self._accept(';'):
+            selectors.append(self._or())
+        return selectors[0] if len(selectors) == 1 else ChainSelector(*selectors)
+
+    def _or(self) -> Selector:
+        selectors = [self._and()]
+        while self._accept('|'):
+            selectors.append(self._and())
+        return selectors[0] if len(selectors) == 1 else OrSelector(*selectors)
+
+    def _and(self) -> Selector:
+        selectors = [self._not()]
+        while self._accept('&'):
+            selectors.append(self._not())
+        return selectors[0] if len(selectors) == 1 else AndSelector(*selectors)
+
+    def _not(self) -> Selector:
+        if self._accept('!'):
+            return NotSelector(self._not())
+        if self._accept('('):
+            selector = self._chain()
+            if not self._accept(')'):
+                token = self._peek()
+                where = f'position {token.pos}' if token is not None else 'end of selection'
+                raise QueryError(f'Expected ")" at {where}')
+            return selector
+        return self._term()
+
+    def _term(self) -> Selector:
+        token = self._peek()
+        if token is None or token.kind != 'word':
+            where = f'"{token.value}" at position {token.pos}' if token is not None else 'end of selection'
+            raise QueryError(f'Expected a selection mode, got {where}')
+
+        # Consecutive words form a single term, e.g., the three words of "scale.z > 2"
+        parts = [token.value]
+        self.pos += 1
+        while (token := self._peek()) is not None and token.kind == 'word':
+            parts.append(' ' + token.value if token.spaced else token.value)
+            self.pos += 1
+        return _parse_term(''.join(parts))
+
+
+def _parse_term(term: str) -> Selector:
+    comparison = _COMPARISON.fullmatch(term)
+    if comparison is not None:
+        attribute, op, value = comparison.groups()
+        try:
+            return AttributeSelector(attribute, op, float(value))
+        except ValueError as e:
+            raise QueryError(f'Invalid comparison "{term}": {e}') from e
+
+    try:
+        selector = parse_selector(term)
+    except (ValueError, IndexError) as e:
+        raise QueryError(f'Invalid selection "{term}": {e}') from e
+    if selector is None:
+        raise QueryError(f'Invalid selection "{term}"')
+    return selector
+
+
+def parse_query(query: str) -> Selector:
+    """Parses a query into a selector, see the module documentation for the syntax
+
+    Args:
+        query: The query to parse
+
+    Returns:
+        Selector evaluating the query
+
+    Raises:
+        QueryError: If the query is invalid
+    """
+    return _Parser(query).parse()
+
+
+@functools.lru_cache(maxsize=128)
+def compile_query(query: str) -> Selector:
+    """Parses and optimizes a query
+
+    Args:
+        query: The query to compile
+
+    Returns:
+        Optimized selector evaluating the query
+
+    Raises:
+        QueryError: If the query is invalid
+    """
+    return parse_query(query).optimize()
+
+
+class _CachedResult:
+    def __init__(self, revision: int, transforms: tuple | None, selection: Selection):
+        self.revision = revision
+        self.transforms = transforms
+        self.selection = selection
+
+
+# Results of select, per save
+_results: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _transforms_snapshot(save: Suitebro) -> tuple:
+    table = save.transforms
+    return table, table.position.copy(), table.rotation.copy(), table.scale.copy()
+
+
+def _transforms_unchanged(save: Suitebro, snapshot: tuple) -> bool:
+    table, position, rotation, scale = snapshot
+    return save.transforms is table and np.array_equal(table.position, position) and \
+        np.array_equal(table.rotation, rotation) and np.array_equal(table.scale, scale)
+
+
+def select(save: Suitebro, query: str) -> Selection:
+    """Selects objects of a save using a query
+
+    Results of deterministic queries (e.g., without unseeded random:, take: or percentages) are cached, and reused as
+    long as the revision of the save and the transforms of its objects do not change.
+
+    Args:
+        save: The save to select from
+        query: The query, see the module documentation for the syntax
+
+    Returns:
+        Selection of the objects matched by the query
+
+    Raises:
+        QueryError: If the query is invalid
+    """
+    query = query.strip()
+    selector = compile_query(query)
+    revision = save.revision
+
+    results = _results.setdefault(save, {})
+    cached = results.get(query)
+    if cached is not None and cached.revision == revision and \
+            (cached.transforms is None or _transforms_unchanged(save, cached.transforms)):
+        # Keep recently used results at the end, so that the oldest ones are evicted first
+        results[query] = results.pop(query)
+        return Selection(cached.selection)
+
+    columns = save.columns
+    selection = columns.selection(selector.mask(columns, columns.everything()))
+
+    if selector.deterministic:
+        transforms = _transforms_snapshot(save) if selector.uses_transforms else None
+        results.pop(query, None)
+        results[query] = _CachedResult(revision, transforms, selection)
+        while len(results) > RESULT_CACHE_SIZE:
+            del results[next(iter(results))]
+    return Selection(selection)
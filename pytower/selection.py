@@ -1,28 +1,193 @@
-import itertools
+import bisect
 import math
+import operator
 import random
 
 import numpy as np
 
 from .object import TowerObject
 
-from abc import ABC, abstractmethod
+from abc import ABC
+from collections.abc import MutableSet, Set as AbstractSet
 import re
+import weakref
+from typing import Iterable, Iterator
 
 from .util import XYZ
 
+# Selections smaller than this are filtered directly instead of querying the spatial index of the save
+SPATIAL_INDEX_MIN_SIZE = 256
 
-class Selection(set[TowerObject]):
-    @staticmethod
-    def _group_key(obj: TowerObject):
-        return obj.group_id()
+# Selection of the objects of each spatial index, see _indexed
+_indexed_selections: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
 
-    def groups(self) -> set[tuple[int, 'Selection']]:
-        data = sorted(filter(lambda obj: obj.group_id() >= 0, self), key=Selection._group_key)
-        return {(group_id, Selection(group)) for group_id, group in itertools.groupby(data, Selection._group_key)}
+# (columns, mask of their rows in the index) for each spatial index, see _unindexed_rows
+_indexed_masks: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+class ObjectRegistry:
+    """Append-only numbering of TowerObjects
+
+    Selections store the rows of their objects in a registry rather than the objects themselves. Objects are only ever
+    appended, so rows stay valid when the objects of a save are sorted, added or removed.
+
+    Attributes:
+        objects: The registered objects, in row order
+    """
+    def __init__(self):
+        self.objects: list[TowerObject] = []
+        self._rows: dict[TowerObject, int] = {}
+        self._ids = np.empty(0, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def rows(self, objs: Iterable[TowerObject]) -> np.ndarray:
+        """Gets the rows of the given objects, registering objects that are not registered yet
+
+        Args:
+            objs: The objects to look up
+
+        Returns:
+            Integer array with the row of each object, in the same order
+        """
+        rows = self._rows
+        objects = self.objects
+
+        def row(obj: TowerObject) -> int:
+            found = rows.get(obj)
+            if found is None:
+                found = rows[obj] = len(objects)
+                objects.append(obj)
+            return found
+
+        return np.fromiter(map(row, objs), dtype=np.intp)
+
+    def lookup(self, objs: Iterable[TowerObject]) -> np.ndarray:
+        """Gets the rows of the given objects, skipping objects that are not registered
+
+        Args:
+            objs: The objects to look up
+
+        Returns:
+            Integer array with the row of each registered object, in the same order
+        """
+        rows = self._rows
+        return np.fromiter((rows[obj] for obj in objs if obj in rows), dtype=np.intp)
+
+    def find(self, obj: TowerObject) -> int:
+        """Gets the row of an object, or -1 if it is not registered"""
+        return self._rows.get(obj, -1)
+
+    def ids(self) -> np.ndarray:
+        """Array of the id() of each registered object, in row order"""
+        if len(self._ids) < len(self.objects):
+            new_ids = np.fromiter(map(id, self.objects[len(self._ids):]), dtype=np.uint64)
+            self._ids = np.concatenate((self._ids, new_ids))
+        return self._ids
+
+
+def _default_registry() -> ObjectRegistry:
+    # Registry of the active save, so that the Selections over its objects can be combined without remapping rows
+    from .suitebro import get_active_save
+    save = get_active_save()
+    return save.registry if save is not None else ObjectRegistry()
+
+
+def _frozen(rows: np.ndarray) -> np.ndarray:
+    # Row arrays are shared between Selections, so they must never be modified in place
+    rows.flags.writeable = False
+    return rows
+
+
+class Selection(MutableSet):
+    """Set of TowerObjects, stored as a sorted array of rows in an ObjectRegistry
+
+    Iteration follows registry order, i.e., the order the objects were first selected in (usually save order), so it is
+    deterministic. Set algebra between Selections over the same registry is done on the row arrays.
+    """
+    __slots__ = ('_registry', '_rows', '_members')
+
+    def __init__(self, objs: Iterable[TowerObject] = (), registry: ObjectRegistry | None = None):
+        """Creates a selection of the given objects
+
+        Args:
+            objs: The objects to select
+            registry: Registry to number the objects in. Defaults to the registry of objs if it is a Selection, or else
+                to the registry of the active save
+        """
+        if isinstance(objs, Selection):
+            if registry is None or registry is objs._registry:
+                self._registry = objs._registry
+                self._rows = objs._rows
+                self._members = objs._members
+                return
+        elif registry is None:
+            registry = _default_registry()
+
+        self._registry = registry
+        self._rows = _frozen(np.unique(registry.rows(objs)))
+        self._members: bytes | None = None
+
+    @classmethod
+    def _from_rows(cls, registry: ObjectRegistry, rows: np.ndarray) -> 'Selection':
+        # rows must be sorted and unique
+        selection = cls.__new__(cls)
+        selection._registry = registry
+        selection._rows = _frozen(rows)
+        selection._members = None
+        return selection
+
+    def _replace(self, rows: np.ndarray):
+        self._rows = _frozen(rows)
+        self._members = None
+
+    @property
+    def registry(self) -> ObjectRegistry:
+        return self._registry
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Sorted, read-only array of the rows of the selected objects in the registry"""
+        return self._rows
+
+    def _other_rows(self, other: Iterable[TowerObject], register: bool) -> np.ndarray:
+        # Sorted rows of other in this selection's registry. Unless register is set, objects that are not registered
+        #  are skipped, since they cannot be in this selection anyway
+        if isinstance(other, Selection) and other._registry is self._registry:
+            return other._rows
+        if register:
+            return np.unique(self._registry.rows(other))
+        return np.unique(self._registry.lookup(other))
+
+    def groups(self) -> list[tuple[int, 'Selection']]:
+        """Splits the grouped objects of the selection by group
+
+        Returns:
+            List of (group_id, group) pairs, sorted by group_id
+        """
+        group_ids = self._group_ids()
+        order = np.argsort(group_ids, kind='stable')
+        group_ids = group_ids[order]
+        start = np.searchsorted(group_ids, 0)
+        # The sort is stable, so the rows of each group stay sorted
+        rows = self._rows[order[start:]]
+        group_ids = group_ids[start:]
+        if len(rows) == 0:
+            return []
+
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(group_ids)) + 1))
+        ends = np.append(starts[1:], len(rows))
+        return [(group_id, Selection._from_rows(self._registry, rows[group_start:group_end]))
+                for group_id, group_start, group_end in zip(group_ids[starts].tolist(), starts.tolist(), ends.tolist())]
 
     def ungrouped(self) -> 'Selection':
-        return Selection({obj for obj in self if obj.group_id() < 0})
+        return Selection._from_rows(self._registry, self._rows[self._group_ids() < 0])
+
+    def _group_ids(self) -> np.ndarray:
+        objects = self._registry.objects
+        return np.fromiter((objects[row].group_id() for row in self._rows.tolist()), dtype=np.int64,
+                           count=len(self._rows))
 
     def destroy_groups(self):
         for obj in self:
@@ -31,35 +196,461 @@ class Selection(set[TowerObject]):
     def get(self) -> TowerObject:
         return next(iter(self))
 
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[TowerObject]:
+        objects = self._registry.objects
+        return (objects[row] for row in self._rows.tolist())
+
+    def __contains__(self, obj) -> bool:
+        row = self._registry.find(obj)
+        if row < 0:
+            return False
+        # Membership bitmap over the registry, built on first use since tools often test many objects
+        if self._members is None or row >= len(self._members):
+            members = np.zeros(len(self._registry), dtype=np.uint8)
+            members[self._rows] = 1
+            self._members = members.tobytes()
+        return self._members[row] == 1
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Selection):
+            if len(self) != len(other):
+                return False
+            if other._registry is not self._registry:
+                other_rows = self._other_rows(other, register=False)
+                return len(other_rows) == len(self) and np.array_equal(other_rows, self._rows)
+            return np.array_equal(self._rows, other._rows)
+        return super().__eq__(other)
+
+    def __hash__(self):
+        # Combines the ids of the objects, so that equal selections over different registries have equal hashes
+        ids = self._registry.ids()[self._rows]
+        return hash((len(ids), int(np.bitwise_xor.reduce(ids)), int(np.sum(ids))))
+
+    def __repr__(self) -> str:
+        return f'Selection({list(self)!r})'
+
+    def copy(self) -> 'Selection':
+        return Selection(self)
+
+    # Set algebra. The arguments of the named methods can be any iterables of TowerObjects, while the operators require
+    #  a set, like the corresponding set methods
+
+    def union(self, *others: Iterable[TowerObject]) -> 'Selection':
+        rows = self._rows
+        for other in others:
+            rows = np.union1d(rows, self._other_rows(other, register=True))
+        return Selection._from_rows(self._registry, rows)
+
+    def intersection(self, *others: Iterable[TowerObject]) -> 'Selection':
+        rows = self._rows
+        for other in others:
+            rows = np.intersect1d(rows, self._other_rows(other, register=False), assume_unique=True)
+        return Selection._from_rows(self._registry, rows)
+
+    def difference(self, *others: Iterable[TowerObject]) -> 'Selection':
+        rows = self._rows
+        for other in others:
+            rows = np.setdiff1d(rows, self._other_rows(other, register=False), assume_unique=True)
+        return Selection._from_rows(self._registry, rows)
+
+    def symmetric_difference(self, other: Iterable[TowerObject]) -> 'Selection':
+        rows = np.setxor1d(self._rows, self._other_rows(other, register=True), assume_unique=True)
+        return Selection._from_rows(self._registry, rows)
+
+    def issubset(self, other: Iterable[TowerObject]) -> bool:
+        return len(self.difference(other)) == 0
+
+    def issuperset(self, other: Iterable[TowerObject]) -> bool:
+        return len(Selection(other, registry=self._registry).difference(self)) == 0
+
+    def isdisjoint(self, other: Iterable[TowerObject]) -> bool:
+        return len(self.intersection(other)) == 0
+
+    def __or__(self, other: AbstractSet) -> 'Selection':
+        return self.union(other)
+
+    def __and__(self, other: AbstractSet) -> 'Selection':
+        return self.intersection(other)
+
+    def __sub__(self, other: AbstractSet) -> 'Selection':
+        return self.difference(other)
+
+    def __xor__(self, other: AbstractSet) -> 'Selection':
+        return self.symmetric_difference(other)
+
+    __ror__ = __or__
+    __rand__ = __and__
+    __rxor__ = __xor__
+
     def __add__(self, other: 'Selection') -> 'Selection':
         if not isinstance(other, Selection):
             raise ValueError(f'Cannot add Selection with {type(other)}!')
 
-        return Selection(self.union(other))
+        return self.union(other)
 
-    def __iadd__(self, other: 'Selection') -> None:
+    def __mul__(self, other: 'Selection') -> 'Selection':
         if not isinstance(other, Selection):
-            raise ValueError(f'Cannot add Selection with {type(other)}!')
+            raise ValueError(f'Cannot multiply Selection with {type(other)}!')
 
+        return self.intersection(other)
+
+    # In-place operations replace the row array instead of modifying it, since it may be shared with other Selections
+
+    def add(self, obj: TowerObject):
+        self.update((obj,))
+
+    def discard(self, obj: TowerObject):
+        self.difference_update((obj,))
+
+    def update(self, *others: Iterable[TowerObject]):
+        self._replace(self.union(*others)._rows)
+
+    def intersection_update(self, *others: Iterable[TowerObject]):
+        self._replace(self.intersection(*others)._rows)
+
+    def difference_update(self, *others: Iterable[TowerObject]):
+        self._replace(self.difference(*others)._rows)
+
+    def clear(self):
+        self._replace(np.empty(0, dtype=np.intp))
+
+    def __ior__(self, other: AbstractSet) -> 'Selection':
         self.update(other)
+        return self
 
-    def __mul__(self, other: 'Selection') -> 'Selection':
+    def __iand__(self, other: AbstractSet) -> 'Selection':
+        self.intersection_update(other)
+        return self
+
+    def __isub__(self, other: AbstractSet) -> 'Selection':
+        self.difference_update(other)
+        return self
+
+    def __ixor__(self, other: AbstractSet) -> 'Selection':
+        self._replace(self.symmetric_difference(other)._rows)
+        return self
+
+    def __iadd__(self, other: 'Selection') -> 'Selection':
         if not isinstance(other, Selection):
-            raise ValueError(f'Cannot multiply Selection with {type(other)}!')
+            raise ValueError(f'Cannot add Selection with {type(other)}!')
 
-        return Selection(self.intersection(other))
+        self.update(other)
+        return self
 
-    def __imul__(self, other: 'Selection') -> None:
+    def __imul__(self, other: 'Selection') -> 'Selection':
         if not isinstance(other, Selection):
             raise ValueError(f'Cannot multiply Selection with {type(other)}!')
 
         self.intersection_update(other)
+        return self
 
-    def __hash__(self):
-        return hash(tuple(self))
+
+# Characters with a special meaning in regular expressions, see _literal_prefix
+_REGEX_SPECIAL = set('.^$*+?{}[]()|\\')
+
+
+def _literal_prefix(pattern: str) -> str:
+    # Literal text that every match of the pattern (with re.match) starts with, or '' if it cannot be determined
+    if '|' in pattern:
+        return ''
+
+    prefix = []
+    idx = 1 if pattern.startswith('^') else 0
+    while idx < len(pattern):
+        char = pattern[idx]
+        step = 1
+        if char == '\\':
+            # Escaped punctuation is literal, other escapes are character classes
+            if idx + 1 >= len(pattern) or pattern[idx + 1].isalnum():
+                break
+            char = pattern[idx + 1]
+            step = 2
+        elif char in _REGEX_SPECIAL:
+            break
+
+        # The character is optional if a quantifier follows
+        quantifier = pattern[idx + step:idx + step + 1]
+        if quantifier in ('*', '?', '{'):
+            break
+        prefix.append(char)
+        if quantifier == '+':
+            break
+        idx += step
+    return ''.join(prefix)
+
+
+class _NameColumn:
+    # Dictionary-encoded column of casefolded names, with an inverted index from each distinct name to its rows
+    def __init__(self, names: Iterable[str], count: int):
+        raw_codes: dict[str, int] = {}
+        raw = np.fromiter((raw_codes.setdefault(name, len(raw_codes)) for name in names), dtype=np.intp, count=count)
+
+        # Casefold every distinct name once
+        self.codes_of: dict[str, int] = {}
+        folded = np.fromiter((self.codes_of.setdefault(name.casefold(), len(self.codes_of)) for name in raw_codes),
+                             dtype=np.intp, count=len(raw_codes))
+        self.codes: np.ndarray = folded[raw]
+        self.values: list[str] = list(self.codes_of)
+
+        # Rows sorted by code, and the start of the rows of each code in that order, built on first use
+        self._order: np.ndarray | None = None
+        self._starts: np.ndarray | None = None
+        # Distinct names in sorted order and their codes, built on first use
+        self._sorted_values: list[str] | None = None
+        self._sorted_codes: np.ndarray | None = None
+
+    def rows(self, value: str) -> np.ndarray:
+        # Rows whose name is value (already casefolded)
+        code = self.codes_of.get(value)
+        if code is None:
+            return np.empty(0, dtype=np.intp)
+        if self._order is None:
+            self._order = np.argsort(self.codes, kind='stable')
+            counts = np.bincount(self.codes, minlength=len(self.values))
+            self._starts = np.concatenate(([0], np.cumsum(counts)))
+        return self._order[self._starts[code]:self._starts[code + 1]]
+
+    def _with_prefix(self, prefix: str) -> np.ndarray:
+        # Codes of the names starting with prefix, found by bisecting the sorted names
+        if not prefix:
+            return np.arange(len(self.values))
+        if self._sorted_values is None:
+            order = sorted(range(len(self.values)), key=self.values.__getitem__)
+            self._sorted_values = [self.values[code] for code in order]
+            self._sorted_codes = np.array(order, dtype=np.intp)
+        start = bisect.bisect_left(self._sorted_values, prefix)
+        end = bisect.bisect_left(self._sorted_values, prefix + chr(0x10FFFF), lo=start)
+        return self._sorted_codes[start:end]
+
+    def matches(self, pattern: re.Pattern, within: np.ndarray | None) -> np.ndarray:
+        # Mask of the rows whose name matches the pattern. Only the distinct names starting with the literal prefix of
+        #  the pattern, and used by the rows in within, are matched
+        prefix = '' if pattern.flags & re.IGNORECASE else _literal_prefix(pattern.pattern)
+        candidates = self._with_prefix(prefix)
+        if within is not None:
+            used = np.zeros(len(self.values), dtype=bool)
+            used[self.codes[within]] = True
+            candidates = candidates[used[candidates]]
+
+        matched = np.zeros(len(self.values), dtype=bool)
+        matched[candidates] = [pattern.match(self.values[code]) is not None for code in candidates.tolist()]
+        return matched[self.codes]
+
+
+class ObjectColumns:
+    """Columnar view of a collection of objects, used to evaluate selectors as boolean masks
+
+    Row i of every column describes objects[i]. Names are dictionary-encoded and indexed by name, so that name
+    comparisons only look at the matching rows, and regular expressions are only evaluated once per distinct name.
+
+    Attributes:
+        registry: Registry of the Selections created from masks
+        objects: The objects, in row order
+        name_codes: Code of the casefolded name of each object
+        custom_name_codes: Code of the casefolded custom name of each object
+        group_ids: Group id of each object (-1 if ungrouped)
+        has_item: Whether each object has an item section
+        is_canvas: Whether each object is a canvas
+    """
+    def __init__(self, objects: Iterable[TowerObject], registry: ObjectRegistry | None = None):
+        """Builds the columns for the given objects
+
+        Args:
+            objects: The objects to build columns for
+            registry: Registry of the Selections created from masks. Defaults to the registry of objects if it is a
+                Selection, or else to the registry of the active save
+        """
+        if registry is None:
+            registry = objects.registry if isinstance(objects, Selection) else _default_registry()
+        self.registry = registry
+        self._registry_rows: np.ndarray | None = None
+        self._inverse_rows: np.ndarray | None = None
+        self.objects: list[TowerObject] = list(objects)
+        self._rows: dict[TowerObject, int] = {obj: row for row, obj in enumerate(self.objects)}
+        count = len(self.objects)
+
+        self._names = _NameColumn((obj.get_name() for obj in self.objects), count)
+        self._custom_names = _NameColumn((obj.get_custom_name() for obj in self.objects), count)
+        self.name_codes = self._names.codes
+        self.custom_name_codes = self._custom_names.codes
+        self.group_ids = np.fromiter((obj.group_id() for obj in self.objects), dtype=np.int64, count=count)
+        self.has_item = np.fromiter((obj.has_item() for obj in self.objects), dtype=bool, count=count)
+        self.is_canvas = np.fromiter((obj.is_canvas() for obj in self.objects), dtype=bool, count=count)
+        self._transforms: dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def clear_transforms(self):
+        """Drops the gathered position, rotation and scale columns, so that they are gathered again on next use"""
+        self._transforms.clear()
+
+    def everything(self) -> np.ndarray:
+        """Mask selecting every object"""
+        return np.ones(len(self.objects), dtype=bool)
+
+    def nothing(self) -> np.ndarray:
+        """Mask selecting no objects"""
+        return np.zeros(len(self.objects), dtype=bool)
+
+    def mask_of(self, objs: Iterable[TowerObject]) -> np.ndarray:
+        """Converts a collection of objects to a mask, ignoring objects that have no row
+
+        Args:
+            objs: The objects to select
+
+        Returns:
+            Mask selecting the rows of the objects
+        """
+        mask = self.nothing()
+        if isinstance(objs, Selection) and objs.registry is self.registry:
+            rows = self._selection_rows(objs)
+            mask[rows[rows >= 0]] = True
+            return mask
+
+        rows = self._rows
+        mask[np.fromiter((rows[obj] for obj in objs if obj in rows), dtype=np.intp)] = True
+        return mask
+
+    def covers(self, selection: Selection) -> bool:
+        """Whether every object of the selection has a row"""
+        if selection.registry is self.registry:
+            return bool(np.all(self._selection_rows(selection) >= 0))
+        return all(obj in self._rows for obj in selection)
+
+    def _registry_rows_of_objects(self) -> np.ndarray:
+        # Row in the registry of the object of each row
+        if self._registry_rows is None:
+            self._registry_rows = self.registry.rows(self.objects)
+        return self._registry_rows
+
+    def _selection_rows(self, selection: Selection) -> np.ndarray:
+        # Rows of the objects of a Selection over the registry of the columns, -1 for objects without a row
+        if self._inverse_rows is None or len(self._inverse_rows) < len(self.registry):
+            # Looking up the rows may register objects, so it comes before sizing the inverse
+            registry_rows = self._registry_rows_of_objects()
+            inverse = np.full(len(self.registry), -1, dtype=np.intp)
+            inverse[registry_rows] = np.arange(len(self.objects))
+            self._inverse_rows = inverse
+        return self._inverse_rows[selection.rows]
+
+    def selection(self, mask: np.ndarray) -> Selection:
+        """Converts a mask to a Selection
+
+        Args:
+            mask: Mask over the rows
+
+        Returns:
+            Selection of the objects whose rows are selected by the mask
+        """
+        return Selection._from_rows(self.registry, np.unique(self._registry_rows_of_objects()[mask]))
+
+    def _equals(self, column: _NameColumn, value: str) -> np.ndarray:
+        mask = self.nothing()
+        mask[column.rows(value.casefold())] = True
+        return mask
+
+    def name_equals(self, name: str) -> np.ndarray:
+        """Mask of the objects whose name equals the given name (ignoring case)"""
+        return self._equals(self._names, name)
+
+    def custom_name_equals(self, name: str) -> np.ndarray:
+        """Mask of the objects whose custom name equals the given name (ignoring case)"""
+        return self._equals(self._custom_names, name)
+
+    def name_matches(self, pattern: re.Pattern, within: np.ndarray | None = None) -> np.ndarray:
+        """Mask of the objects whose casefolded name matches the given pattern
+
+        Args:
+            pattern: The pattern to match
+            within: If given, rows outside of this mask may be reported as not matching
+
+        Returns:
+            Mask of the matching rows
+        """
+        return self._names.matches(pattern, within)
+
+    def custom_name_matches(self, pattern: re.Pattern, within: np.ndarray | None = None) -> np.ndarray:
+        """Mask of the objects whose casefolded custom name matches the given pattern
+
+        Args:
+            pattern: The pattern to match
+            within: If given, rows outside of this mask may be reported as not matching
+
+        Returns:
+            Mask of the matching rows
+        """
+        return self._custom_names.matches(pattern, within)
+
+    def _transform(self, attr: str, width: int) -> np.ndarray:
+        # Gathers a transform attribute of every object, from the transform table of the active save where possible
+        column = self._transforms.get(attr)
+        if column is None:
+            from .suitebro import get_active_save
+            column = np.full((len(self.objects), width), np.nan)
+            missing = self.has_item.copy()
+
+            save = get_active_save()
+            if save is not None:
+                table = save.transforms
+                rows = table.lookup(self.objects)
+                found = rows >= 0
+                column[found] = getattr(table, attr)[rows[found]]
+                missing &= ~found
+
+            for row in np.flatnonzero(missing):
+                column[row] = getattr(self.objects[row], attr)
+            column = self._transforms[attr] = column
+        return column
+
+    @property
+    def positions(self) -> np.ndarray:
+        """N×3 array of object positions, NaN for property-only objects
+
+        Positions are taken from the transform table of the active save where possible.
+        """
+        return self._transform('position', 3)
+
+    @property
+    def rotations(self) -> np.ndarray:
+        """N×4 array of object rotation quaternions (x, y, z, w), NaN for property-only objects"""
+        return self._transform('rotation', 4)
+
+    @property
+    def scales(self) -> np.ndarray:
+        """N×3 array of object scales, NaN for property-only objects"""
+        return self._transform('scale', 3)
+
+
+def _columns_for(everything: Selection) -> ObjectColumns:
+    # Columns of the active save if they cover everything, since they are reused until the save changes, or else new
+    #  columns of everything
+    from .suitebro import get_active_save
+    save = get_active_save()
+    if save is not None and everything.registry is save.registry:
+        columns = save.columns
+        if columns.covers(everything):
+            return columns
+    return ObjectColumns(everything)
 
 
 class Selector(ABC):
+    # Hints used by the query planner (see pytower.query), see optimize. Selectors are pointwise if whether an object
+    #  is selected does not depend on the other objects being selected from, i.e.,
+    #  mask(columns, within) == within & mask(columns, everything). Pointwise selectors can be reordered freely, and
+    #  cheaper ones (lower cost) are evaluated first, so that later ones only look at the remaining objects. Lookups
+    #  in an index of the save (names, groups, and positions through the spatial index) are the cheapest, scans of a
+    #  column cost more, and matching every distinct name against a regular expression costs the most.
+    #  Deterministic selectors give the same result each time for the same objects, so their results can be reused.
+    #  uses_transforms marks selectors that look at positions, rotations or scales.
+    cost: int = 10
+    pointwise: bool = False
+    deterministic: bool = False
+    uses_transforms: bool = False
+
     def __init__(self, name):
         self.name = name
 
@@ -67,134 +658,590 @@ class Selector(ABC):
     # Can think of these Selectors operating on the set of everything, and selecting a subset.
     # But nothing's stopping you from then selecting on that subset, and so on, further and further refining the
     #  selection using Selector objects.
-    @abstractmethod
     def select(self, everything: Selection) -> Selection:
-        pass
+        columns = _columns_for(everything)
+        return columns.selection(self.mask(columns, columns.mask_of(everything)))
+
+    # Selectors can also be evaluated on columns, taking in a mask of the rows to select from and outputting a mask of
+    #  the selected rows. Selectors that only implement select are evaluated on the Selection of the masked objects.
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        if type(self).select is Selector.select:
+            raise NotImplementedError(f'{type(self).__name__} must implement select or mask')
+        return columns.mask_of(self.select(columns.selection(within)))
+
+    def __and__(self, other: 'Selector') -> 'Selector':
+        return AndSelector(self, other)
+
+    def __or__(self, other: 'Selector') -> 'Selector':
+        return OrSelector(self, other)
+
+    def __invert__(self) -> 'Selector':
+        return NotSelector(self)
+
+    def optimize(self) -> 'Selector':
+        """Returns an equivalent selector that is cheaper to evaluate, e.g., by reordering pointwise selectors"""
+        return self
+
+
+class CompositeSelector(Selector):
+    """Selector combining the results of other selectors"""
+    def __init__(self, name, *selectors: Selector):
+        super().__init__(name)
+        self.selectors = list(selectors)
+        self.cost = sum(selector.cost for selector in self.selectors)
+        self.pointwise = all(selector.pointwise for selector in self.selectors)
+        self.deterministic = all(selector.deterministic for selector in self.selectors)
+        self.uses_transforms = any(selector.uses_transforms for selector in self.selectors)
+
+    def _flatten(self) -> list[Selector]:
+        # Optimized children, with nested selectors of the same kind merged into this one
+        flat = []
+        for selector in self.selectors:
+            selector = selector.optimize()
+            if type(selector) is type(self):
+                flat += selector.selectors
+            else:
+                flat.append(selector)
+        return flat
+
+    def optimize(self) -> Selector:
+        # Pointwise selectors commute, so they are evaluated cheapest first. The sort is stable, and non-pointwise
+        #  selectors are evaluated separately by mask, so they keep their relative order
+        selectors = self._flatten()
+        selectors.sort(key=lambda selector: selector.cost if selector.pointwise else 0)
+        return type(self)(*selectors)
+
+
+class AndSelector(CompositeSelector):
+    """Selects the objects selected by every one of its selectors"""
+    def __init__(self, *selectors: Selector):
+        super().__init__('AndSelector', *selectors)
+
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        # Pointwise selectors only need to look at the objects selected so far, the others see everything in within
+        mask = within
+        for selector in self.selectors:
+            if selector.pointwise:
+                mask = selector.mask(columns, mask)
+        for selector in self.selectors:
+            if not selector.pointwise:
+                mask = mask & selector.mask(columns, within)
+        return mask
+
+
+class OrSelector(CompositeSelector):
+    """Selects the objects selected by any of its selectors"""
+    def __init__(self, *selectors: Selector):
+        super().__init__('OrSelector', *selectors)
+
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        # Pointwise selectors only need to look at the objects that were not selected yet
+        mask = columns.nothing()
+        remaining = within
+        for selector in self.selectors:
+            if selector.pointwise:
+                selected = selector.mask(columns, remaining)
+                mask |= selected
+                remaining = remaining & ~selected
+        for selector in self.selectors:
+            if not selector.pointwise:
+                mask |= selector.mask(columns, within)
+        return mask
+
+
+class ChainSelector(CompositeSelector):
+    """Applies its selectors one after the other, each one selecting from the result of the previous one"""
+    def __init__(self, *selectors: Selector):
+        super().__init__('ChainSelector', *selectors)
+
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        mask = within
+        for selector in self.selectors:
+            mask = selector.mask(columns, mask)
+        return mask
+
+    def optimize(self) -> Selector:
+        # Only runs of consecutive pointwise selectors can be reordered, since the result of a non-pointwise selector
+        #  depends on what it selects from
+        selectors = []
+        run = []
+        for selector in self._flatten() + [None]:
+            if selector is not None and selector.pointwise:
+                run.append(selector)
+                continue
+            run.sort(key=lambda pointwise: pointwise.cost)
+            selectors += run
+            run = []
+            if selector is not None:
+                selectors.append(selector)
+        return ChainSelector(*selectors)
+
+
+class NotSelector(Selector):
+    def __init__(self, selector: Selector):
+        super().__init__('NotSelector')
+        self.selector = selector
+        self.cost = selector.cost
+        self.pointwise = selector.pointwise
+        self.deterministic = selector.deterministic
+        self.uses_transforms = selector.uses_transforms
+
+    def optimize(self) -> Selector:
+        return NotSelector(self.selector.optimize())
+
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        return within & ~self.selector.mask(columns, within)
 
 
 class NameSelector(Selector):
+    cost = 1
+    pointwise = True
+    deterministic = True
+
     def __init__(self, select_name):
         super().__init__('NameSelector')
         self.select_name = select_name.casefold()
 
-    def select(self, everything: Selection) -> Selection:
-        return Selection({obj for obj in everything if obj.matches_name(self.select_name)})
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        return within & (columns.name_equals(self.select_name) | columns.custom_name_equals(self.select_name))
 
 
 class CustomNameSelector(Selector):
+    cost = 1
+    pointwise = True
+    deterministic = True
+
     def __init__(self, select_name):
         super().__init__('CustomNameSelector')
         self.select_name = select_name.casefold()
 
-    def select(self, everything: Selection) -> Selection:
-        return Selection({obj for obj in everything if obj.get_custom_name().casefold() == self.select_name})
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        return within & columns.custom_name_equals(self.select_name)
 
 
 class ObjectNameSelector(Selector):
+    cost = 1
+    pointwise = True
+    deterministic = True
+
     def __init__(self, select_name):
         super().__init__('ObjectNameSelector')
         self.select_name = select_name.casefold()
 
-    def select(self, everything: Selection) -> Selection:
-        return Selection({obj for obj in everything if obj.get_name().casefold() == self.select_name})
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        return within & columns.name_equals(self.select_name)
 
 
 class RegexSelector(Selector):
+    cost = 5
+    pointwise = True
+    deterministic = True
+
     def __init__(self, pattern: str):
         super().__init__('RegexSelector')
         self.pattern = re.compile(pattern.casefold())
 
-    def select(self, everything: Selection) -> Selection:
-        return Selection({obj for obj in everything if self.pattern.match(obj.get_name().casefold())
-                          or self.pattern.match(obj.get_custom_name().casefold())})
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        return within & (columns.name_matches(self.pattern, within) | columns.custom_name_matches(self.pattern, within))
 
 
 class GroupSelector(Selector):
+    cost = 1
+    pointwise = True
+    deterministic = True
+
     def __init__(self, group_id):
         super().__init__('GroupSelector')
         self.group_id = group_id
 
-    def select(self, everything: Selection) -> Selection:
-        return Selection({obj for obj in everything if obj.group_id() == self.group_id})
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        return within & (columns.group_ids == self.group_id)
 
 
 class ItemSelector(Selector):
+    cost = 1
+    pointwise = True
+    deterministic = True
+
     def __init__(self):
         super().__init__('ItemSelector')
 
-    def select(self, everything: Selection) -> Selection:
-        return Selection({obj for obj in everything if obj.item is not None})
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        return within & columns.has_item
 
 
 class EverythingSelector(Selector):
+    cost = 0
+    pointwise = True
+    deterministic = True
+
     def __init__(self):
         super().__init__('EverythingSelector')
 
     def select(self, everything: Selection) -> Selection:
         return everything
 
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        return within.copy()
+
 
 class NothingSelector(Selector):
+    cost = 0
+    pointwise = True
+    deterministic = True
+
     def __init__(self):
         super().__init__('NothingSelector')
 
     def select(self, everything: Selection) -> Selection:
         return Selection()
 
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        return columns.nothing()
+
+
+class AttributeSelector(Selector):
+    """Compares a numeric attribute of each object to a value
+
+    Attributes are group (the group id, -1 if ungrouped) or a component of a transform: position.x, rotation.w,
+    scale.z, etc. Transform comparisons only select items, and equality is tested with np.isclose.
+    """
+    cost = 2
+    pointwise = True
+    deterministic = True
+
+    TRANSFORMS = {'position': ('positions', 'xyz'), 'rotation': ('rotations', 'xyzw'), 'scale': ('scales', 'xyz')}
+    OPERATORS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge, '=': np.isclose,
+                 '==': np.isclose, '!=': lambda a, b: ~np.isclose(a, b)}
+
+    def __init__(self, attribute: str, op: str, value: float):
+        """Creates a selector comparing attribute <op> value
+
+        Args:
+            attribute: The attribute to compare, e.g., 'scale.z' or 'group'
+            op: The comparison, one of <, <=, >, >=, =, == and !=
+            value: The value to compare to
+
+        Raises:
+            ValueError: If the attribute or comparison is unknown
+        """
+        super().__init__('AttributeSelector')
+        attribute = attribute.casefold()
+        if op not in AttributeSelector.OPERATORS:
+            raise ValueError(f'Unknown comparison: {op}')
+        self.attribute = attribute
+        self.op = op
+        self.value = value
+
+        if attribute == 'group':
+            self._column = None
+            self.uses_transforms = False
+            return
+
+        transform, _, component = attribute.partition('.')
+        if transform not in AttributeSelector.TRANSFORMS or len(component) != 1 or \
+                component not in AttributeSelector.TRANSFORMS[transform][1]:
+            raise ValueError(f'Unknown attribute: {attribute}')
+        column, components = AttributeSelector.TRANSFORMS[transform]
+        self._column = column, components.index(component)
+        self.uses_transforms = True
+
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        compare = AttributeSelector.OPERATORS[self.op]
+        if self._column is None:
+            if self.op in ('=', '==', '!='):
+                compare = operator.eq if self.op != '!=' else operator.ne
+            return within & compare(columns.group_ids, self.value)
+
+        column, component = self._column
+        values = getattr(columns, column)[:, component]
+        return within & columns.has_item & compare(values, self.value)
+
+
+def _rng(seed: int | None) -> np.random.Generator:
+    # Unseeded samplers are seeded from the random module, so that random.seed still makes selections reproducible
+    return np.random.default_rng(random.getrandbits(64) if seed is None else seed)
+
+
+def _sample_mask(columns: ObjectColumns, within: np.ndarray, count: int, rng: np.random.Generator) -> np.ndarray:
+    # Mask selecting count random rows out of the rows selected by within. Generator.choice without replacement only
+    #  does work proportional to count when count is small relative to the number of rows
+    rows = np.flatnonzero(within)
+    count = max(0, min(count, len(rows)))
+    mask = columns.nothing()
+    mask[rows[rng.choice(len(rows), count, replace=False)]] = True
+    return mask
+
+
+def _sample_selection(everything: Selection, count: int, rng: np.random.Generator) -> Selection:
+    # Selection of count random objects of everything, sampled from its rows without building columns
+    rows = everything.rows
+    count = max(0, min(count, len(rows)))
+    return Selection._from_rows(everything.registry, np.sort(rows[rng.choice(len(rows), count, replace=False)]))
+
 
 class PercentSelector(Selector):
-    def __init__(self, percentage):
+    cost = 2
+
+    def __init__(self, percentage, seed: int | None = None):
         super().__init__('PercentSelector')
         self.percentage = percentage
+        self.seed = seed
+        self.deterministic = seed is not None
+
+    def _cutoff(self, count: int) -> int:
+        return int(count * self.percentage / 100 + 0.5)
 
     def select(self, everything: Selection) -> Selection:
-        sequence = list(everything)
-        random.shuffle(sequence)
-        cutoff = int(len(sequence) * self.percentage / 100 + 0.5)
-        return Selection(sequence[0:cutoff])
+        return _sample_selection(everything, self._cutoff(len(everything)), _rng(self.seed))
+
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        return _sample_mask(columns, within, self._cutoff(np.count_nonzero(within)), _rng(self.seed))
 
 
 class TakeSelector(Selector):
-    def __init__(self, number):
+    cost = 2
+
+    def __init__(self, number, seed: int | None = None):
         super().__init__('TakeSelector')
         self.number = number
+        self.seed = seed
+        self.deterministic = seed is not None
 
     def select(self, everything: Selection) -> Selection:
-        sequence = list(everything)
-        random.shuffle(sequence)
-        return Selection(sequence[0:self.number])
+        return _sample_selection(everything, self.number, _rng(self.seed))
+
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        return _sample_mask(columns, within, self.number, _rng(self.seed))
 
 
 class RandomSelector(Selector):
-    def __init__(self, probability):
+    cost = 1
+    pointwise = True
+
+    def __init__(self, probability, seed: int | None = None):
         super().__init__('RandomSelector')
         self.probability = probability
+        self.seed = seed
+        self.deterministic = seed is not None
+
+    # Selecting each object independently with the given probability is the same as drawing the number of selected
+    #  objects from a binomial distribution, and then sampling that many objects
+    def _count(self, rng: np.random.Generator, count: int) -> int:
+        return rng.binomial(count, min(max(self.probability, 0.0), 1.0))
 
     def select(self, everything: Selection) -> Selection:
-        return Selection({obj for obj in everything if random.uniform(0, 1) <= self.probability})
+        rng = _rng(self.seed)
+        return _sample_selection(everything, self._count(rng, len(everything)), rng)
+
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        rng = _rng(self.seed)
+        return _sample_mask(columns, within, self._count(rng, np.count_nonzero(within)), rng)
+
+
+def _spatial_index(count: int):
+    # Spatial index of the active save, if there is one and it is worth querying for this many objects
+    from .suitebro import get_active_save
+    save = get_active_save()
+    if save is None or count < SPATIAL_INDEX_MIN_SIZE:
+        return None
+    return save.spatial_index
+
+
+def _positions(objs: list[TowerObject]) -> np.ndarray:
+    return np.array([obj.position for obj in objs], dtype=np.float64).reshape(-1, 3)
+
+
+def _indexed(registry: ObjectRegistry, index) -> Selection:
+    # Selection of the objects of the spatial index, in the given registry
+    cached = _indexed_selections.get(index)
+    if cached is None or cached.registry is not registry:
+        cached = _indexed_selections[index] = Selection(index.objects, registry=registry)
+    return cached
+
+
+def _unindexed_items(everything: Selection, index) -> list[TowerObject]:
+    # Items of everything that are not in the spatial index, e.g., objects that were not added to the save yet
+    return [obj for obj in everything.difference(_indexed(everything.registry, index)) if obj.has_item()]
+
+
+def _unindexed_rows(columns: ObjectColumns, within: np.ndarray, index) -> np.ndarray:
+    # Rows of the items of within that are not in the spatial index
+    cached = _indexed_masks.get(index)
+    if cached is None or cached[0] is not columns:
+        cached = _indexed_masks[index] = columns, columns.mask_of(index.objects)
+    return np.flatnonzero(within & columns.has_item & ~cached[1])
+
+
+def _row_positions(columns: ObjectColumns, rows: np.ndarray) -> np.ndarray:
+    # Positions of the objects of some rows, without gathering the position column of every object
+    return _positions([columns.objects[row] for row in rows.tolist()])
+
+
+def _spatial_select(everything: Selection, query, test) -> Selection:
+    # Selects the items of everything accepted by test (a function taking an N×3 position array and returning a
+    #  mask), using query (a function taking a SpatialIndex and returning matching objects) for the indexed items
+    index = _spatial_index(len(everything))
+    if index is None:
+        items = [obj for obj in everything if obj.has_item()]
+        return Selection(obj for obj, inside in zip(items, test(_positions(items))) if inside)
+
+    selected = everything.intersection(query(index))
+    unindexed = _unindexed_items(everything, index)
+    selected.update(obj for obj, inside in zip(unindexed, test(_positions(unindexed))) if inside)
+    return selected
+
+
+def _spatial_mask(columns: ObjectColumns, within: np.ndarray, query, test) -> np.ndarray:
+    # Mask version of _spatial_select, selecting the rows of within accepted by test
+    index = _spatial_index(np.count_nonzero(within))
+    if index is None:
+        rows = np.flatnonzero(within & columns.has_item)
+        mask = columns.nothing()
+        mask[rows] = test(_row_positions(columns, rows))
+        return mask
+
+    mask = within & columns.mask_of(query(index))
+    unindexed = _unindexed_rows(columns, within, index)
+    mask[unindexed] = test(_row_positions(columns, unindexed))
+    return mask
+
+
+def _nearest_indexed(index, center: XYZ, count: int, accept) -> list[tuple[float, TowerObject]]:
+    # The count objects of the spatial index nearest to center among those accepted by accept (a function taking an
+    #  object), as (distance, object) pairs. Widens the search until enough accepted objects are found
+    k = count
+    while True:
+        found = index.nearest(center, k)
+        candidates = [(dist, obj) for dist, obj in found if accept(obj)]
+        if len(candidates) >= count or k >= len(index.objects):
+            return candidates
+        k *= 2
 
 
 class BoxSelector(Selector):
+    cost = 1
+    pointwise = True
+    deterministic = True
+    uses_transforms = True
+
     def __init__(self, pos1: XYZ, pos2: XYZ):
         super().__init__('BoxSelector')
         self.min_pos = XYZ.min(pos1, pos2)
         self.max_pos = XYZ.max(pos1, pos2)
 
-    def _contains(self, pos: XYZ):
-        return pos == pos.clamp(self.min_pos, self.max_pos)
+    def _contains(self, positions: np.ndarray) -> np.ndarray:
+        # NaN positions of property-only objects never compare close
+        clamped = np.clip(positions, np.asarray(self.min_pos), np.asarray(self.max_pos))
+        return np.all(np.isclose(positions, clamped), axis=1)
 
     def select(self, everything: Selection) -> Selection:
-        return Selection({obj for obj in everything if self._contains(obj.position)})
+        return _spatial_select(everything, lambda index: index.box(self.min_pos, self.max_pos), self._contains)
+
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        return _spatial_mask(columns, within, lambda index: index.box(self.min_pos, self.max_pos), self._contains)
 
 
 class SphereSelector(Selector):
+    cost = 1
+    pointwise = True
+    deterministic = True
+    uses_transforms = True
+
     def __init__(self, center: XYZ, radius: float):
         super().__init__('SphereSelector')
         self.center = center
         self.radius = radius
 
-    def _contains(self, pos: XYZ):
-        return self.center.distance(pos) < self.radius
+    def _contains(self, positions: np.ndarray) -> np.ndarray:
+        # NaN positions of property-only objects never compare less
+        return np.linalg.norm(positions - self.center, axis=1) < self.radius
+
+    def select(self, everything: Selection) -> Selection:
+        return _spatial_select(everything, lambda index: index.sphere(self.center, self.radius), self._contains)
+
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        return _spatial_mask(columns, within, lambda index: index.sphere(self.center, self.radius), self._contains)
+
+
+class NearestSelector(Selector):
+    cost = 2
+    deterministic = True
+    uses_transforms = True
+
+    def __init__(self, center: XYZ, count: int):
+        super().__init__('NearestSelector')
+        self.center = center
+        self.count = count
 
     def select(self, everything: Selection) -> Selection:
-        return Selection({obj for obj in everything if self._contains(obj.position)})
+        index = _spatial_index(len(everything))
+        if index is None:
+            unindexed = [obj for obj in everything if obj.has_item()]
+            candidates = []
+        else:
+            unindexed = _unindexed_items(everything, index)
+            candidates = _nearest_indexed(index, self.center, self.count, lambda obj: obj in everything)
+
+        distances = np.linalg.norm(_positions(unindexed) - self.center, axis=1)
+        candidates += zip(distances.tolist(), unindexed)
+        candidates.sort(key=lambda candidate: candidate[0])
+        return Selection(obj for _, obj in candidates[:self.count])
+
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        mask = columns.nothing()
+        index = _spatial_index(np.count_nonzero(within))
+        if index is None:
+            rows = np.flatnonzero(within & columns.has_item)
+            distances = np.linalg.norm(_row_positions(columns, rows) - self.center, axis=1)
+            count = max(0, min(self.count, len(rows)))
+            if count > 0:
+                mask[rows[np.argpartition(distances, count - 1)[:count]]] = True
+            return mask
+
+        row_of = columns._rows
+        selectable = within & columns.has_item
+        candidates = _nearest_indexed(index, self.center, self.count,
+                                      lambda obj: obj in row_of and selectable[row_of[obj]])
+        candidates = [(dist, row_of[obj]) for dist, obj in candidates]
+
+        unindexed = _unindexed_rows(columns, within, index)
+        distances = np.linalg.norm(_row_positions(columns, unindexed) - self.center, axis=1)
+        candidates += zip(distances.tolist(), unindexed.tolist())
+        candidates.sort(key=lambda candidate: candidate[0])
+        mask[np.array([row for _, row in candidates[:max(self.count, 0)]], dtype=np.intp)] = True
+        return mask
+
+
+class WithinSelector(Selector):
+    cost = 2
+    pointwise = True
+    deterministic = True
+    uses_transforms = True
+
+    def __init__(self, guid: str, radius: float):
+        super().__init__('WithinSelector')
+        self.guid = guid.casefold()
+        self.radius = radius
+
+    def _target(self, objs: Iterable[TowerObject]) -> TowerObject | None:
+        from .suitebro import get_active_save
+        save = get_active_save()
+        target = save.find_by_guid(self.guid) if save is not None else None
+        if target is None:
+            target = next((obj for obj in objs if obj.has_item() and obj.guid().casefold() == self.guid), None)
+        return target
+
+    def select(self, everything: Selection) -> Selection:
+        target = self._target(everything)
+        if target is None:
+            return Selection()
+
+        return SphereSelector(target.position, self.radius).select(everything)
+
+    def mask(self, columns: ObjectColumns, within: np.ndarray) -> np.ndarray:
+        target = self._target(columns.objects)
+        if target is None:
+            return columns.nothing()
+
+        return SphereSelector(target.position, self.radius).mask(columns, within)
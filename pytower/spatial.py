@@ -0,0 +1,110 @@
+"""Spatial index
+
+KD-tree over the positions of the items in a save, used to answer box, sphere and nearest-neighbor queries without
+testing every object.
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+
+from .object import TowerObject
+from .transforms import TransformTable
+
+
+class SpatialIndex:
+    """KD-tree over the item positions of a TransformTable
+
+    The index is a snapshot: it does not follow later changes to the positions. Use is_current to check whether it
+    still matches its table.
+
+    Attributes:
+        objects: The indexed TowerObjects, in the order of their points in the tree
+        object_set: Set of the indexed TowerObjects
+    """
+    def __init__(self, table: TransformTable):
+        """Builds an index over the current positions of the items in the table
+
+        Args:
+            table: The transform table to index
+        """
+        self._table = table
+        self.objects: list[TowerObject] = list(table.objects)
+        self.object_set: set[TowerObject] = set(self.objects)
+        self._positions = table.position.copy()
+        self._tree = cKDTree(self._positions) if len(self.objects) > 0 else None
+
+    def is_current(self, table: TransformTable) -> bool:
+        """Whether the index matches the given table, i.e., it was built from it and no positions changed since
+
+        Args:
+            table: The transform table to compare against
+
+        Returns:
+            True if the index can still be used for the table
+        """
+        return table is self._table and np.array_equal(table.position, self._positions)
+
+    def _objects_at(self, indices) -> list[TowerObject]:
+        return [self.objects[idx] for idx in indices]
+
+    def box(self, min_pos: np.ndarray, max_pos: np.ndarray) -> list[TowerObject]:
+        """Finds the objects inside an axis-aligned box
+
+        Args:
+            min_pos: Minimum corner of the box
+            max_pos: Maximum corner of the box
+
+        Returns:
+            List of the objects inside the box, including objects on (or within floating point error of) its faces
+        """
+        if self._tree is None:
+            return []
+
+        min_pos = np.asarray(min_pos, dtype=np.float64)
+        max_pos = np.asarray(max_pos, dtype=np.float64)
+
+        # Query the bounding cube of the box, padded by the np.isclose tolerance, then only keep the points that are
+        #  actually inside the box
+        center = (min_pos + max_pos) / 2
+        half_extent = float(np.max(max_pos - min_pos)) / 2
+        tolerance = 1e-8 + 1e-5 * float(np.max(np.abs([min_pos, max_pos])))
+        candidates = np.asarray(self._tree.query_ball_point(center, half_extent + tolerance, p=np.inf),
+                                dtype=np.intp)
+        positions = self._positions[candidates]
+        inside = np.all(np.isclose(positions, np.clip(positions, min_pos, max_pos)), axis=1)
+        return self._objects_at(candidates[inside])
+
+    def sphere(self, center: np.ndarray, radius: float) -> list[TowerObject]:
+        """Finds the objects strictly within the given distance of a point
+
+        Args:
+            center: Center of the sphere
+            radius: Radius of the sphere
+
+        Returns:
+            List of the objects inside the sphere
+        """
+        if self._tree is None:
+            return []
+
+        center = np.asarray(center, dtype=np.float64)
+        candidates = np.asarray(self._tree.query_ball_point(center, radius), dtype=np.intp)
+        distances = np.linalg.norm(self._positions[candidates] - center, axis=1)
+        return self._objects_at(candidates[distances < radius])
+
+    def nearest(self, point: np.ndarray, k: int) -> list[tuple[float, TowerObject]]:
+        """Finds the objects nearest to a point
+
+        Args:
+            point: Point to search around
+            k: Maximum number of objects to find
+
+        Returns:
+            List of up to k (distance, object) pairs, sorted by increasing distance
+        """
+        if self._tree is None or k <= 0:
+            return []
+
+        k = min(k, len(self.objects))
+        distances, indices = self._tree.query(np.asarray(point, dtype=np.float64), k=k)
+        distances, indices = np.atleast_1d(distances), np.atleast_1d(indices)
+        return [(float(dist), self.objects[idx]) for dist, idx in zip(distances, indices)]
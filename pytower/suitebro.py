@@ -1,16 +1,31 @@
+import bisect
 import itertools
 import json
 import logging
 import os
 import platform
 import sys
+import weakref
+from collections.abc import MutableSequence
 from subprocess import Popen, PIPE
+from typing import Iterable, Iterator
 
+import numpy as np
 from colorama import Fore, Back, Style
 
+from . import codec
 from .__config__ import root_directory
-from .selection import Selection
-from .object import TowerObject
+from .cache import SaveCache
+from .groups import GroupIndex
+from .journal import Journal
+from .selection import ObjectColumns, ObjectRegistry
+from .object import TowerObject, modification_count, section_sort_key
+from .spatial import SpatialIndex
+from .transforms import TransformTable
+
+# add_objects inserts new objects into an already sorted object list one at a time when the list is at least this many
+#  times larger than the batch, otherwise the batch is appended and sorted by to_dict
+SORTED_INSERT_RATIO = 64
 
 IO_GW_ITEMS = ['AmmoPickup', 'CustomSpawnPoint', 'HealthPickup', 'SDNL_ArmorPickup', 'GW_SDNLOddball', 'GW_SDNLFlag',
                'GW_BallRaceFinish', 'GW_BallRaceSpawn', 'LaserBeam', 'LeverBasic', 'ButtonShapes', 'PhysicsSlot',
@@ -23,6 +38,193 @@ IO_GW_ITEMS = ['AmmoPickup', 'CustomSpawnPoint', 'HealthPickup', 'SDNL_ArmorPick
                'LeverLightSwitch', 'MoverAdvanced', 'MoverPlayerSlide', 'MoverTrain']
 
 
+RawObject = tuple[dict | None, dict | None]
+SerializedKeys = tuple[dict | None, dict | None, str]
+ObjectKeys = tuple[str | None, str, str]
+
+
+class LazyObjectList(MutableSequence):
+    """Lazy list of TowerObjects
+
+    Sequence view over the raw (item, properties) sections of a save, where each TowerObject is only created once it is
+    accessed. Created objects are only cached weakly and are recreated on demand from the underlying dictionaries once
+    nothing references them anymore. Objects whose sections share data with other objects (see TowerObject.copy) also
+    keep which of that data they own, which the dictionaries do not record, so they are pinned for as long as their
+    entry is in the list.
+    """
+    def __init__(self, raw_objects: Iterable[RawObject | TowerObject] = ()):
+        """Creates a new lazy list
+
+        Args:
+            raw_objects: (item, properties) pairs of sections, or already created TowerObject instances
+        """
+        self._entries: list[RawObject | TowerObject] = list(raw_objects)
+        self._cache: weakref.WeakValueDictionary[int, TowerObject] = weakref.WeakValueDictionary()
+        # Created objects that must not be recreated, by id of their entry, see TowerObject._share_nested
+        self._pinned: dict[int, tuple[RawObject, TowerObject]] = {}
+
+        # Journal given to every created TowerObject, see attach_journal
+        self._journal: Journal | None = None
+
+        # Dirty set of the serialization cache given to every created TowerObject, see attach_dirty_set
+        self._dirty_set: set[TowerObject] | None = None
+
+    def _materialize(self, entry: RawObject | TowerObject) -> TowerObject:
+        if isinstance(entry, TowerObject):
+            return entry
+
+        obj = self._cache.get(id(entry))
+        if obj is None:
+            item, properties = entry
+            obj = TowerObject(item=item, properties=properties, nocopy=True)
+            obj._journal = self._journal
+            obj._dirty_set = self._dirty_set
+            obj._lazy_entry = self, entry
+            self._cache[id(entry)] = obj
+        return obj
+
+    def _pin(self, entry: RawObject, obj: TowerObject):
+        # Keeps a created object alive while its entry is in the list, called by the object once it shares data or its
+        #  sections are replaced
+        if self._cache.get(id(entry)) is obj:
+            self._pinned[id(entry)] = entry, obj
+
+    def _forget(self, entry: RawObject | TowerObject) -> RawObject | TowerObject:
+        # Drops the cached object of an entry leaving the list. Returns the object if it still exists, since it may own
+        #  data the entry does not record, otherwise the entry
+        if isinstance(entry, TowerObject):
+            return entry
+        self._pinned.pop(id(entry), None)
+        obj = self._cache.pop(id(entry), None)
+        if obj is None:
+            return entry
+        obj._lazy_entry = None
+        return obj
+
+    def _sections(self, entry: RawObject | TowerObject) -> RawObject:
+        # Current sections of an entry, which are those of its object if one exists, since they may have been replaced
+        if isinstance(entry, TowerObject):
+            return entry.sections()
+        obj = self._cache.get(id(entry))
+        if obj is None:
+            return entry
+        return obj.sections()
+
+    def attach_journal(self, journal: Journal | None):
+        """Gives a journal to every object of the list, including objects created later
+
+        Args:
+            journal: The journal of the save
+        """
+        self._journal = journal
+        for obj in self._cache.values():
+            obj._journal = journal
+        for entry in self._entries:
+            if isinstance(entry, TowerObject):
+                entry._journal = journal
+
+    def attach_dirty_set(self, dirty: set[TowerObject] | None):
+        """Gives the dirty set of a serialization cache to every object of the list, including objects created later
+
+        Args:
+            dirty: The set that modified objects add themselves to
+        """
+        self._dirty_set = dirty
+        for obj in self._cache.values():
+            obj._dirty_set = dirty
+        for entry in self._entries:
+            if isinstance(entry, TowerObject):
+                entry._dirty_set = dirty
+
+    def materialized_count(self) -> int:
+        """Number of TowerObject instances that currently exist for this list"""
+        return len(self._cache) + sum(1 for entry in self._entries if isinstance(entry, TowerObject))
+
+    def raw(self) -> Iterator[RawObject]:
+        """Iterates over the (item, properties) sections of each object without creating TowerObjects"""
+        return map(self._sections, self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._materialize(entry) for entry in self._entries[index]]
+        return self._materialize(self._entries[index])
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            for entry in self._entries[index]:
+                self._forget(entry)
+            self._entries[index] = list(value)
+        else:
+            self._forget(self._entries[index])
+            self._entries[index] = value
+
+    def __delitem__(self, index):
+        entries = self._entries[index] if isinstance(index, slice) else [self._entries[index]]
+        for entry in entries:
+            self._forget(entry)
+        del self._entries[index]
+
+    def insert(self, index: int, value: TowerObject):
+        self._entries.insert(index, value)
+
+    def __iter__(self) -> Iterator[TowerObject]:
+        for entry in self._entries:
+            yield self._materialize(entry)
+
+    def index(self, value, start: int = 0, stop: int | None = None) -> int:
+        # Compare by the underlying sections so that searching does not create every TowerObject
+        if isinstance(value, TowerObject):
+            item, properties = value.sections()
+            stop = len(self._entries) if stop is None else stop
+            for idx in range(start, stop):
+                entry = self._entries[idx]
+                if entry is value or (not isinstance(entry, TowerObject) and entry[0] is item
+                                      and entry[1] is properties):
+                    return idx
+        raise ValueError(f'{value} is not in list')
+
+    def remove_all(self, values: Iterable[TowerObject]) -> list[tuple[int, RawObject | TowerObject]]:
+        """Removes every given object in a single pass over the list
+
+        Args:
+            values: The objects to remove
+
+        Returns:
+            The position of every removed entry in the list before removing them, and the entry, or its TowerObject if
+            one was created and still exists, in ascending order
+        """
+        removed = {tuple(map(id, obj.sections())) for obj in values}
+        kept = []
+        removed_entries = []
+        for idx, entry in enumerate(self._entries):
+            item, properties = self._sections(entry)
+            if (id(item), id(properties)) in removed:
+                removed_entries.append((idx, self._forget(entry)))
+            else:
+                kept.append(entry)
+        self._entries = kept
+        return removed_entries
+
+    def __contains__(self, value) -> bool:
+        try:
+            self.index(value)
+            return True
+        except ValueError:
+            return False
+
+    def sort(self, key=None, reverse: bool = False):
+        objs = [self._materialize(entry) for entry in self._entries]
+        entry_by_obj = {id(obj): entry for obj, entry in zip(objs, self._entries)}
+        objs.sort(key=key, reverse=reverse)
+        self._entries = [entry_by_obj[id(obj)] for obj in objs]
+
+    def __repr__(self):
+        return f'LazyObjectList({len(self._entries)} objects, {len(self._cache)} materialized)'
+
+
 class Suitebro:
     """Suitebro file
 
@@ -31,13 +233,14 @@ class Suitebro:
     Attributes:
         objects: The list of TowerObject instances contained in the Suitebro file
     """
-    def __init__(self, filename: str, directory: str, data: dict):
+    def __init__(self, filename: str, directory: str, data: dict, lazy: bool = False):
         """Instantiates a new Suitebro instance based on the input filename and directory
 
         Args:
             filename: Name of file
             directory: Path to directory (can be relative or absolute)
             data: The raw json data from tower-unite-suitebro
+            lazy: If True, then objects is a LazyObjectList that only creates TowerObjects once they are accessed
         """
         self.filename = filename
         self.directory = directory
@@ -48,7 +251,7 @@ class Suitebro:
         item_section = self.data['items']
         num_props = len(prop_section)
         num_items = len(item_section)
-        self.objects: list[TowerObject | None] = [None] * (num_items + num_props)
+        raw_objects: list[RawObject | None] = [None] * (num_items + num_props)
 
         # First get all names present in properties to determine item-only objects. Except for property-only metadata
         #  objects, every property name is <SOME ITEM NAME>_C_###, where ### is the index within the item-type grouping
@@ -74,21 +277,191 @@ class Suitebro:
             # print(p['name'] if p is not None else None)
             # print(i['name'] if i is not None else None)
             if i is not None and i['name'] not in prop_names:
-                self.objects[x] = TowerObject(item=i, properties=None, nocopy=True)
+                raw_objects[x] = (i, None)
                 item_idx += 1
             elif i is not None and p is not None and p['name'].startswith(i['name']):
-                self.objects[x] = TowerObject(item=i, properties=p, nocopy=True)
+                raw_objects[x] = (i, p)
                 item_idx += 1
                 prop_idx += 1
             elif p is not None:
-                self.objects[x] = TowerObject(item=None, properties=p, nocopy=True)
+                raw_objects[x] = (None, p)
                 prop_idx += 1
             x += 1
 
         # Now cull Nones at the end of array
-        if None in self.objects:
-            size = self.objects.index(None)
-            self.objects = self.objects[:size]
+        if None in raw_objects:
+            size = raw_objects.index(None)
+            raw_objects = raw_objects[:size]
+
+        self._objects: list[TowerObject] | LazyObjectList
+        if lazy:
+            self._objects = LazyObjectList(raw_objects)
+        else:
+            self._objects = [TowerObject(item=i, properties=p, nocopy=True) for i, p in raw_objects]
+
+        # Lookup indexes, built on first use so that lazy saves are not fully materialized on load
+        self._indexed = False
+        self._index_keys: dict[TowerObject, ObjectKeys] = {}
+        self._guid_index: dict[str, TowerObject] = {}
+        self._name_index: dict[str, dict[TowerObject, None]] = {}
+        self._custom_name_index: dict[str, dict[TowerObject, None]] = {}
+
+        # Numbering of the objects in the Selections over this save
+        self.registry = ObjectRegistry()
+
+        # Revision counter, see revision
+        self._revision = 0
+        self._modifications = modification_count()
+
+        self._transforms: TransformTable | None = None
+        self._spatial_index: SpatialIndex | None = None
+        self._groups: GroupIndex | None = None
+        self._columns: ObjectColumns | None = None
+        self._columns_revision = -1
+
+        # Whether objects are known to be in sort_key order
+        self._sorted = False
+
+        # Undo/redo history, started by the first checkpoint
+        self._journal: Journal | None = None
+
+        # Serialization cache of to_dict by id of the entry of each object (see _entry_key), dropped whenever objects
+        #  are added or removed
+        self._serialized: dict[int, SerializedKeys] | None = None
+        self._serialized_items: list[dict] = []
+        self._serialized_props: list[dict] = []
+        self._dirty: set[TowerObject] = set()
+
+    @property
+    def objects(self) -> list[TowerObject] | LazyObjectList:
+        return self._objects
+
+    @objects.setter
+    def objects(self, objs: list[TowerObject] | LazyObjectList):
+        if self._journal is not None:
+            self._journal.record_replaced(self._objects, objs)
+            self._attach_journal(objs)
+        self._drop_transforms()
+        if self._groups is not None:
+            self._groups.detach()
+            self._groups = None
+        self._objects = objs
+        self._sorted = False
+        self._indexed = False
+        self._serialized = None
+        self._revision += 1
+
+    @property
+    def revision(self) -> int:
+        """Counter that increases whenever objects are added or removed, or objects are modified
+
+        Modifications are detected through modification_count, so they include changes to objects of other saves, and
+        exclude changes to transforms.
+        """
+        modifications = modification_count()
+        if modifications != self._modifications:
+            self._modifications = modifications
+            self._revision += 1
+        return self._revision
+
+    @property
+    def transforms(self) -> TransformTable:
+        """Columnar table of the transforms of every item in the save
+
+        Created on first access. While the table exists, object transforms are stored in its arrays and are only
+        written back into the item and property sections by to_dict. The table is discarded, after being written back,
+        whenever objects are added or removed, and a new one is created on the next access.
+        """
+        if self._transforms is None:
+            self._transforms = TransformTable(self._objects, journal=self._journal)
+        return self._transforms
+
+    @property
+    def spatial_index(self) -> SpatialIndex:
+        """KD-tree index over the positions of every item in the save
+
+        Created on first access, and created again whenever objects were added or removed, or positions changed
+        """
+        transforms = self.transforms
+        if self._spatial_index is None or not self._spatial_index.is_current(transforms):
+            self._spatial_index = SpatialIndex(transforms)
+        return self._spatial_index
+
+    @property
+    def groups(self) -> GroupIndex:
+        """Index of the objects of the save by group id
+
+        Created on first access, and kept up to date as objects are added, removed or change groups
+        """
+        if self._groups is None:
+            self._groups = GroupIndex(self._objects)
+        return self._groups
+
+    @property
+    def columns(self) -> ObjectColumns:
+        """Columnar view of the objects of the save, used to evaluate selectors
+
+        Reused as long as the revision of the save does not change. Transform columns are gathered again after every
+        access, since transforms can change without changing the revision.
+        """
+        revision = self.revision
+        if self._columns is None or self._columns_revision != revision:
+            self._columns = ObjectColumns(self._objects, registry=self.registry)
+            self._columns_revision = revision
+        else:
+            self._columns.clear_transforms()
+        return self._columns
+
+    def _drop_transforms(self):
+        self._spatial_index = None
+        if self._transforms is not None:
+            self._transforms.detach()
+            self._transforms = None
+
+    def _index_object(self, obj: TowerObject):
+        guid = obj.guid().casefold() if obj.has_item() else None
+        name = obj.get_name().casefold()
+        custom_name = obj.get_custom_name().casefold()
+        self._index_keys[obj] = guid, name, custom_name
+
+        if guid is not None:
+            self._guid_index[guid] = obj
+        self._name_index.setdefault(name, {})[obj] = None
+        if custom_name:
+            self._custom_name_index.setdefault(custom_name, {})[obj] = None
+
+    def _unindex_object(self, obj: TowerObject):
+        keys = self._index_keys.pop(obj, None)
+        if keys is None:
+            return
+
+        guid, name, custom_name = keys
+        if guid is not None and self._guid_index.get(guid) is obj:
+            del self._guid_index[guid]
+        for index, key in ((self._name_index, name), (self._custom_name_index, custom_name)):
+            matches = index.get(key)
+            if matches is not None:
+                matches.pop(obj, None)
+                if not matches:
+                    del index[key]
+
+    def _ensure_indexed(self):
+        if not self._indexed:
+            self.reindex()
+
+    def reindex(self):
+        """Rebuilds the GUID and name indexes
+
+        Only needed after changing the GUID, name or custom name of objects that are already in the save, or after
+        modifying the objects list directly instead of through add_objects/remove_objects
+        """
+        self._index_keys.clear()
+        self._guid_index.clear()
+        self._name_index.clear()
+        self._custom_name_index.clear()
+        for obj in self._objects:
+            self._index_object(obj)
+        self._indexed = True
 
     def add_object(self, obj: TowerObject):
         """Adds a new object to the Suitebro file
@@ -96,7 +469,7 @@ class Suitebro:
         Args:
             obj: The object to add
         """
-        self.objects += [obj]
+        self.add_objects([obj])
 
     def add_objects(self, objs: list[TowerObject]):
         """Adds a list of objects to the Suitebro file
@@ -104,7 +477,207 @@ class Suitebro:
         Args:
             objs: The list of objects to add
         """
-        self.objects += objs
+        self._drop_transforms()
+        self._serialized = None
+        self._revision += 1
+
+        # Insert a few objects into an already sorted list directly, so that to_dict does not need to move them
+        num_objects = len(self._objects)
+        if self._sorted and len(objs) * SORTED_INSERT_RATIO <= len(self._objects):
+            for obj in sorted(objs, key=TowerObject.sort_key):
+                self._objects.insert(bisect.bisect_right(self._objects, obj.sort_key(), key=TowerObject.sort_key),
+                                     obj)
+            sorted_insert = True
+        else:
+            self._objects += objs
+            self._sorted = False
+            sorted_insert = False
+
+        if self._journal is not None:
+            self._attach_journal(objs)
+            if sorted_insert:
+                added = set(map(id, objs))
+                entries = self._object_entries()
+                positions = [idx for idx, entry in enumerate(entries) if id(entry) in added]
+                self._journal.record_objects(positions, [entries[idx] for idx in positions], added=True)
+            else:
+                self._journal.record_objects(list(range(num_objects, len(self._objects))), list(objs), added=True)
+
+        if self._indexed:
+            for obj in objs:
+                self._index_object(obj)
+        if self._groups is not None:
+            for obj in objs:
+                self._groups.add(obj)
+
+    def remove_object(self, obj: TowerObject):
+        """Removes an object from the Suitebro file
+
+        Args:
+            obj: The object to remove
+        """
+        self.remove_objects([obj])
+
+    def remove_objects(self, objs: Iterable[TowerObject]):
+        """Removes a collection of objects from the Suitebro file
+
+        Args:
+            objs: The objects to remove
+        """
+        self._drop_transforms()
+        self._serialized = None
+        self._revision += 1
+        removed = set(objs)
+        if isinstance(self._objects, LazyObjectList):
+            removed_entries = self._objects.remove_all(removed)
+        else:
+            if self._journal is not None:
+                removed_entries = [(idx, obj) for idx, obj in enumerate(self._objects) if obj in removed]
+            self._objects = [obj for obj in self._objects if obj not in removed]
+
+        if self._journal is not None:
+            self._journal.record_objects([idx for idx, _ in removed_entries], [entry for _, entry in removed_entries],
+                                         added=False)
+
+        if self._indexed:
+            for obj in removed:
+                self._unindex_object(obj)
+        if self._groups is not None:
+            for obj in removed:
+                self._groups.discard(obj)
+
+    def _object_entries(self) -> list[RawObject | TowerObject]:
+        # The list underlying objects, holding the raw sections of the objects of lazy saves that were not created yet
+        if isinstance(self._objects, LazyObjectList):
+            return self._objects._entries
+        return self._objects
+
+    def _set_object_entries(self, entries: list[RawObject | TowerObject]):
+        if isinstance(self._objects, LazyObjectList):
+            self._objects._entries = entries
+        else:
+            self._objects = entries
+
+    def _attach_journal(self, objs: Iterable[TowerObject] | LazyObjectList):
+        if isinstance(objs, LazyObjectList):
+            objs.attach_journal(self._journal)
+        else:
+            for obj in objs:
+                obj._journal = self._journal
+
+    def _entry_sections(self) -> list[RawObject]:
+        # Sections of every object, in order, without creating the objects of lazy saves
+        if isinstance(self._objects, LazyObjectList):
+            return list(self._objects.raw())
+        return [obj.sections() for obj in self._objects]
+
+    def _entry_key(self, obj: TowerObject) -> int:
+        # Key of an object in the serialization cache: the id of its entry in the objects list, which for objects
+        #  created by a lazy list is the raw entry they were created from
+        if obj._lazy_entry is not None and obj._lazy_entry[0] is self._objects:
+            return id(obj._lazy_entry[1])
+        return id(obj)
+
+    def _sort_objects(self):
+        # Sorts the objects by sort_key, recording the new order in the journal unless nothing moved
+        if isinstance(self._objects, LazyObjectList):
+            keys = [section_sort_key(item, properties) for item, properties in self._objects.raw()]
+        else:
+            keys = [obj.sort_key() for obj in self._objects]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        if any(idx != position for position, idx in enumerate(order)):
+            entries = self._object_entries()
+            entries[:] = [entries[idx] for idx in order]
+            if self._journal is not None:
+                self._journal.record_order(np.array(order, dtype=np.intp))
+        self._sorted = True
+
+    def _splice_objects(self, positions: list[int], entries: list[RawObject | TowerObject], insert: bool):
+        # Inserts entries so that they end up at the given positions, or deletes the entries at the given positions, to
+        #  undo or redo adding or removing objects. Positions are in ascending order
+        self._drop_transforms()
+        self._serialized = None
+        self._sorted = False
+        self._revision += 1
+
+        current = self._object_entries()
+        result = []
+        start = 0
+        if insert:
+            for position, entry in zip(positions, entries):
+                end = start + position - len(result)
+                result.extend(current[start:end])
+                result.append(entry)
+                start = end
+        else:
+            for position in positions:
+                result.extend(current[start:position])
+                start = position + 1
+        result.extend(current[start:])
+        self._set_object_entries(result)
+
+        if not self._indexed and self._groups is None:
+            return
+
+        if isinstance(self._objects, LazyObjectList):
+            objs = [self._objects._materialize(entry) for entry in entries]
+        else:
+            objs = entries
+        for obj in objs:
+            if insert:
+                if self._indexed:
+                    self._index_object(obj)
+                if self._groups is not None:
+                    self._groups.add(obj)
+            else:
+                if self._indexed:
+                    self._unindex_object(obj)
+                if self._groups is not None:
+                    self._groups.discard(obj)
+
+    def _reorder_objects(self, order: np.ndarray):
+        # Puts the objects in the given order, to undo or redo sorting them
+        entries = self._object_entries()
+        self._set_object_entries([entries[idx] for idx in order.tolist()])
+        self._serialized = None
+        self._sorted = False
+        self._revision += 1
+
+    def checkpoint(self) -> bool:
+        """Ends the current step of the undo history
+
+        The history starts with the first checkpoint, until which changes are not recorded. Afterward, undo reverts
+        the changes made since the last checkpoint, or otherwise the step before it. Only the changes are kept, as
+        compact deltas, so checkpoints are cheap.
+
+        Returns:
+            True if anything changed since the last checkpoint
+        """
+        if self._journal is None:
+            self._journal = Journal(self)
+            self._attach_journal(self._objects)
+            if self._transforms is not None:
+                self._transforms.set_journal(self._journal)
+            return False
+
+        return self._journal.checkpoint()
+
+    def undo(self) -> bool:
+        """Reverts the changes made since the last checkpoint, or otherwise the last step of the undo history
+
+        Returns:
+            True if a step was undone, False if there is nothing to undo
+        """
+        return self._journal is not None and self._journal.undo()
+
+    def redo(self) -> bool:
+        """Applies the last step reverted by undo again
+
+        Returns:
+            True if a step was redone, False if there is nothing to redo, which is also the case after making changes
+            since the last undo
+        """
+        return self._journal is not None and self._journal.redo()
 
     def find_item(self, name: str) -> TowerObject | None:
         """Find a TowerObject by its name
@@ -113,29 +686,54 @@ class Suitebro:
             name: The proper name or the nickname of the TowerObject
 
         Returns:
-            The first TowerObject matching the name, if found, or else None
+            A TowerObject matching the name, if found, or else None. Objects whose proper name matches are preferred
+            over objects whose nickname matches
 
         """
-        for obj in self.objects:
-            if obj.matches_name(name):
-                return obj
-        return None
+        self._ensure_indexed()
+        name = name.casefold()
+        matches = self._name_index.get(name) or self._custom_name_index.get(name)
+        if not matches:
+            return None
+        return next(iter(matches))
+
+    def find_all_by_name(self, name: str) -> list[TowerObject]:
+        """Find every TowerObject with the given name
+
+        Args:
+            name: The proper name or the nickname of the TowerObjects
+
+        Returns:
+            List of the TowerObjects whose proper name or nickname matches the name
+        """
+        self._ensure_indexed()
+        name = name.casefold()
+        matches = dict(self._name_index.get(name, {}))
+        matches.update(self._custom_name_index.get(name, {}))
+        return list(matches)
+
+    def find_by_guid(self, guid: str) -> TowerObject | None:
+        """Find a TowerObject by its GUID
+
+        Args:
+            guid: GUID of the item
+
+        Returns:
+            The TowerObject with the given GUID, if found, or else None
+        """
+        self._ensure_indexed()
+        return self._guid_index.get(guid.casefold())
 
     def get_groups_meta(self):
         return self.data['groups']
 
-    # TODO Definitely a better way to do this
-    def get_max_groupid(self):
-        sel = Selection(self.objects)
-        # Get the max group_id tuple in group and get its id (first slot of tuple)
-        return max(sel.groups(), key=lambda group_data: group_data[0])[0]
+    def get_max_groupid(self) -> int:
+        """Gets the largest group id in use, or -1 if there are no groups"""
+        return self.groups.max_group_id()
 
     def update_groups_meta(self):
-        sel = Selection(self.objects)
-        group_data = []
-        for group_id, group in sel.groups():
-            group_data.append({'group_id': group_id, 'item_count': len(group)})
-        self.data['groups'] = group_data
+        """Writes the group ids and sizes of the groups into the groups section of the save data"""
+        self.data['groups'] = self.groups.meta()
 
     def items(self) -> list[TowerObject]:
         """Lists all non-property TowerObjects
@@ -143,7 +741,7 @@ class Suitebro:
         Returns:
             List containing all of the non-property TowerObject instances in this Suitebro
         """
-        return [obj for obj in self.objects if obj.item is not None]
+        return [obj for obj in self.objects if obj.has_item()]
 
     def inventory_items(self) -> list[TowerObject]:
         """Lists all TowerObject instances that are non-property and are not I/O nor Game-World.
@@ -153,7 +751,7 @@ class Suitebro:
         Returns:
             List of TowerObject instances in the Suitebro that exist in a player's Steam inventory
         """
-        return [obj for obj in self.objects if obj.item is not None and obj.get_name() not in IO_GW_ITEMS]
+        return [obj for obj in self.objects if obj.has_item() and obj.get_name() not in IO_GW_ITEMS]
 
     def _item_count(self, objs) -> dict:
         ordered = sorted(objs, key=TowerObject.get_name)
@@ -176,25 +774,14 @@ class Suitebro:
         objs = self.inventory_items()
         return self._item_count(objs)
 
-    # Convert item list back into a dict
-    def to_dict(self):
-        """Converts the Suitebro object back into a dictionary, formatted in the tower-unite-suitebro style
-
-        Returns:
-            Serialized Suitebro representation that can be written to a file using json.dump
-        """
-        new_dict = {}
-
-        # Update groups based on group ids and info
-        self.update_groups_meta()
-
-        for k, v in self.data.items():
-            if k != 'items' and k != 'properties':
-                new_dict[k] = v
+    def _serialize(self):
+        self._sort_objects()
 
-        self.objects.sort()
+        # Serialize from the sections, without creating the objects of lazy saves or copying data shared between
+        #  copied objects
+        sections = self._entry_sections()
 
-        num_obj = len(self.objects)
+        num_obj = len(sections)
         item_arr = [None] * num_obj
         prop_arr = [None] * num_obj
 
@@ -203,14 +790,21 @@ class Suitebro:
 
         last_name = None
         last_num = 0
-        for obj in self.objects:
-            if obj.item is not None:
-                item_arr[item_idx] = obj.item
+        group_counts: dict[int, int] = {}
+        for item, properties in sections:
+            if item is not None:
+                item_arr[item_idx] = item
                 item_idx += 1
-            if obj.properties is not None:
+
+                # Count the members of each group from the sections themselves, which are the data being written
+                group = item['properties'].get('GroupID')
+                if group is not None and group['Int']['value'] >= 0:
+                    group_id = group['Int']['value']
+                    group_counts[group_id] = group_counts.get(group_id, 0) + 1
+            if properties is not None:
                 # Name fuckery TODO determine if the naming even matters
-                if obj.item is not None:
-                    name_split = obj.properties['name'].split('_')
+                if item is not None:
+                    name_split = properties['name'].split('_')
                     root_name = '_'.join(name_split[:-1])
 
                     if last_name == root_name:
@@ -218,20 +812,81 @@ class Suitebro:
                     else:
                         last_num = 0
 
-                    obj.properties['name'] = root_name + '_' + str(last_num)
+                    properties['name'] = root_name + '_' + str(last_num)
 
                     last_name = root_name
 
                 # Now actually add to prop_arr
-                prop_arr[prop_idx] = obj.properties
+                prop_arr[prop_idx] = properties
                 prop_idx += 1
 
-        item_arr = item_arr[:item_idx]
-        prop_arr = prop_arr[:prop_idx]
+        self._serialized_items = item_arr[:item_idx]
+        self._serialized_props = prop_arr[:prop_idx]
+        self.data['groups'] = [{'group_id': group_id, 'item_count': count}
+                               for group_id, count in sorted(group_counts.items())]
+
+        # Remember the state of every object, so that later calls only need to look at objects that changed. A new
+        #  dirty set is used so that objects serialized by an earlier call can no longer mark themselves dirty
+        self._dirty = set()
+        if isinstance(self._objects, LazyObjectList):
+            self._objects.attach_dirty_set(self._dirty)
+        else:
+            for obj in self._objects:
+                obj._dirty_set = self._dirty
+        self._serialized = {}
+        for entry, (item, properties) in zip(self._object_entries(), sections):
+            name = properties['name'] if item is None else item['name']
+            self._serialized[id(entry)] = item, properties, name
+
+    def _serialize_changes(self) -> bool:
+        # Applies the changes of dirty objects to the serialization cache, returns False if it has to be rebuilt
+        if self._serialized is None or len(self._serialized) != len(self.objects):
+            return False
+
+        for obj in self._dirty:
+            keys = self._serialized.get(self._entry_key(obj))
+            if keys is None:
+                return False
+
+            item, properties, name = keys
+            new_item, new_properties = obj.sections()
+            if new_item is not item or new_properties is not properties or obj.get_name() != name:
+                # Sections were replaced or the object was renamed, so the order of the objects may change
+                return False
+
+        # Group ids may have changed, and the group index is kept up to date, so the metadata is cheap to rewrite
+        if self._dirty:
+            self.update_groups_meta()
+
+        self._dirty.clear()
+        return True
+
+    # Convert item list back into a dict
+    def to_dict(self):
+        """Converts the Suitebro object back into a dictionary, formatted in the tower-unite-suitebro style
+
+        The result is cached, and later calls only revisit the objects that changed since, unless objects were added
+        or removed. Changes made through TowerObject methods are tracked automatically. After modifying the sections of
+        an object directly, call TowerObject.invalidate so that the change is picked up.
+
+        Returns:
+            Serialized Suitebro representation that can be written to a file using json.dump
+        """
+        new_dict = {}
+
+        if self._transforms is not None:
+            self._transforms.flush()
+
+        if not self._serialize_changes():
+            self._serialize()
+
+        for k, v in self.data.items():
+            if k != 'items' and k != 'properties':
+                new_dict[k] = v
 
         # Finally set new dictionary and return
-        new_dict['items'] = item_arr
-        new_dict['properties'] = prop_arr
+        new_dict['items'] = list(self._serialized_items)
+        new_dict['properties'] = list(self._serialized_props)
         return new_dict
 
     def __repl__(self):
@@ -318,19 +973,154 @@ def run_suitebro_parser(input_path: str, to_save: bool, output_path: str | None
     return True
 
 
-def load_suitebro(filename: str, only_json=False) -> Suitebro:
+# tower-unite-suitebro only accepts file paths, so streaming goes through the standard stream device files
+PIPE_STDIN = '/dev/stdin'
+PIPE_STDOUT = '/dev/stdout'
+
+
+def can_pipe_suitebro_parser() -> bool:
+    return os.path.exists(PIPE_STDIN) and os.path.exists(PIPE_STDOUT)
+
+
+def iterencode_save(data: dict) -> Iterator[str]:
+    # Yields the save as JSON one object at a time, so that the C encoder can be used without ever holding the entire
+    #  document in memory
+    yield '{'
+    for key_idx, (key, value) in enumerate(data.items()):
+        if key_idx > 0:
+            yield ', '
+        yield f'{json.dumps(key)}: '
+
+        if isinstance(value, list):
+            yield '['
+            for idx, element in enumerate(value):
+                if idx > 0:
+                    yield ', '
+                yield json.dumps(element)
+            yield ']'
+        else:
+            yield json.dumps(value)
+    yield '}'
+
+
+def load_piped(input_path: str) -> dict | None:
+    exe_path = get_suitebro_path()
+    process = Popen([exe_path, 'to-json', '-!', '-i', input_path, '-o', PIPE_STDOUT], stdout=PIPE)
+    try:
+        save_json = json.load(process.stdout)
+    except json.JSONDecodeError:
+        save_json = None
+    finally:
+        process.stdout.close()
+
+    exit_code = process.wait()
+    if exit_code != 0 or save_json is None:
+        logging.error('Suitebro parser did not complete successfully!')
+        return None
+
+    print(Fore.GREEN + f'Successfully converted {pretty_path(input_path)}' + Style.RESET_ALL)
+    return save_json
+
+
+def save_piped(data: dict, output_path: str) -> bool:
+    exe_path = get_suitebro_path()
+    process = Popen([exe_path, 'to-save', '-!', '-i', PIPE_STDIN, '-o', output_path], stdin=PIPE)
+    try:
+        for chunk in iterencode_save(data):
+            process.stdin.write(chunk.encode('ascii'))
+        process.stdin.close()
+    except BrokenPipeError:
+        # Parser exited early, error gets reported below
+        pass
+
+    exit_code = process.wait()
+    if exit_code != 0:
+        logging.error('Suitebro parser did not complete successfully!')
+        return False
+
+    print(Fore.GREEN + f'Successfully converted to {pretty_path(output_path)}' + Style.RESET_ALL)
+    return True
+
+
+def load_native(input_path: str) -> dict | None:
+    try:
+        save_json = codec.load(input_path)
+    except codec.CondoDataError as e:
+        logging.warning(f'Native decoder could not read {pretty_path(input_path)} ({e}), falling back to suitebro '
+                        f'parser')
+        return None
+
+    print(Fore.GREEN + f'Successfully decoded {pretty_path(input_path)}' + Style.RESET_ALL)
+    return save_json
+
+
+def save_native(data: dict, output_path: str) -> bool:
+    try:
+        codec.dump(data, output_path)
+    except codec.CondoDataError as e:
+        logging.warning(f'Native encoder could not write {pretty_path(output_path)} ({e}), falling back to suitebro '
+                        f'parser')
+        return False
+
+    print(Fore.GREEN + f'Successfully encoded {pretty_path(output_path)}' + Style.RESET_ALL)
+    return True
+
+
+def load_cached(input_path: str, cache: SaveCache) -> dict | None:
+    # The same cache should be given to store_cached after a miss, so that the file is only hashed once
+    try:
+        save_json = cache.load(input_path)
+    except OSError as e:
+        logging.warning(f'Could not read save cache ({e})')
+        return None
+
+    if save_json is not None:
+        print(Fore.GREEN + f'Loaded {pretty_path(input_path)} from cache' + Style.RESET_ALL)
+    return save_json
+
+
+def store_cached(input_path: str, data: dict, cache: SaveCache):
+    try:
+        cache.store(input_path, data)
+    except OSError as e:
+        logging.warning(f'Could not write save cache ({e})')
+
+
+def load_suitebro(filename: str, only_json=False, native=False, piped=False, lazy=False, cache=True) -> Suitebro:
     abs_filepath = os.path.realpath(filename)
     in_dir = os.path.dirname(abs_filepath)
     json_output_path = os.path.join(in_dir, os.path.basename(abs_filepath) + ".json")
 
-    if not only_json:
-        run_suitebro_parser(abs_filepath, False, json_output_path, overwrite=True)
+    if piped and not can_pipe_suitebro_parser():
+        logging.warning('Piping is not supported on this platform, using intermediate .json files instead')
+        piped = False
+
+    save_cache = SaveCache() if cache and not only_json else None
+    save_json = load_cached(abs_filepath, save_cache) if save_cache is not None else None
+    cached = save_json is not None
+
+    if save_json is None and native and not only_json:
+        logging.info('Decoding save file...')
+        save_json = load_native(abs_filepath)
+
+    if save_json is None and piped and not only_json:
+        save_json = load_piped(abs_filepath)
+        if save_json is None:
+            sys.exit(1)
 
-    logging.info('Loading JSON file...')
-    with open(json_output_path, 'r') as fd:
-        save_json = json.load(fd)
+    if save_json is None:
+        if not only_json:
+            run_suitebro_parser(abs_filepath, False, json_output_path, overwrite=True)
 
-    save = Suitebro(os.path.basename(abs_filepath), in_dir, save_json)
+        logging.info('Loading JSON file...')
+        with open(json_output_path, 'r') as fd:
+            save_json = json.load(fd)
+
+    # Store before creating the Suitebro, which modifies the data in place
+    if save_cache is not None and not cached:
+        store_cached(abs_filepath, save_json, save_cache)
+
+    save = Suitebro(os.path.basename(abs_filepath), in_dir, save_json, lazy=lazy)
 
     global _active_save
     _active_save = save
@@ -338,14 +1128,26 @@ def load_suitebro(filename: str, only_json=False) -> Suitebro:
     return save
 
 
-def save_suitebro(save: Suitebro, filename: str, only_json=False):
+def save_suitebro(save: Suitebro, filename: str, only_json=False, native=False, piped=False):
     abs_filepath = os.path.realpath(filename)
     out_dir = os.path.dirname(abs_filepath)
     json_final_path = os.path.join(save.directory, f'{filename}.json')
     final_output_path = os.path.join(out_dir, f'{filename}')
 
+    if piped and not can_pipe_suitebro_parser():
+        logging.warning('Piping is not supported on this platform, using intermediate .json files instead')
+        piped = False
+
+    save_dict = save.to_dict()
+    if native and not only_json and save_native(save_dict, final_output_path):
+        return
+
+    if piped and not only_json:
+        save_piped(save_dict, final_output_path)
+        return
+
     with open(json_final_path, 'w') as fd:
-        json.dump(save.to_dict(), fd, indent=2)
+        json.dump(save_dict, fd, indent=2)
 
     # Finally run!
     if not only_json:
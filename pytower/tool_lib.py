@@ -46,7 +46,7 @@ class ToolParameterInfo:
 
 class ToolMetadata:
     def __init__(self, tool_name: str, params: dict[str, ToolParameterInfo], version: str, author: str, url: str,
-                 info: str, hidden: bool):
+                 info: str, hidden: bool, group_parallel: bool = False):
         self.tool_name = tool_name
         self.params = params
         self.version = version
@@ -54,6 +54,7 @@ class ToolMetadata:
         self.url = url
         self.info = info
         self.hidden = hidden
+        self.group_parallel = group_parallel
 
     def get_info(self) -> str:
         info_str = f'{self.tool_name} Information:'
@@ -113,13 +114,14 @@ class ToolMetadata:
         url = data_or_none['url']
         info = data_or_none['info']
         hidden = data_or_none['hidden']
+        group_parallel = bool(data_or_none['group_parallel'])
 
         # Handle parameter list
         params = data_or_none['params']
         for p_name, p_info_dict in params.items():
             params[p_name] = ToolParameterInfo.from_dict(p_info_dict)
 
-        return ToolMetadata(tool_name, params, version, author, url, info, hidden)
+        return ToolMetadata(tool_name, params, version, author, url, info, hidden, group_parallel)
 
 
 class ParameterDict(dict):
@@ -154,6 +156,7 @@ def load_tool(script_path, verbose=True) -> tuple[ModuleType, ToolMetadata] | No
         url = ToolMetadata.strattr_or_default(module, 'URL', None)
         info = ToolMetadata.strattr_or_default(module, 'INFO', None)
         hidden = ToolMetadata.strattr_or_default(module, 'HIDDEN', False)
+        group_parallel = bool(ToolMetadata.attr_or_default(module, 'GROUP_PARALLEL', False))
 
         # Check if the module has a main function before registering it
         if not hasattr(module, 'main') and not hidden:
@@ -171,7 +174,7 @@ def load_tool(script_path, verbose=True) -> tuple[ModuleType, ToolMetadata] | No
             if not hidden and verbose:
                 logging.info(success_message)
 
-        return module, ToolMetadata(tool_name, params, version, author, url, info, hidden)
+        return module, ToolMetadata(tool_name, params, version, author, url, info, hidden, group_parallel)
 
     except Exception as e:
         logging.error(f"Error loading tool '{script}': {e}")
@@ -1,7 +1,10 @@
 import argparse
+import json
 import logging
 import os
+import shlex
 import sys
+import time
 from types import ModuleType
 
 import colorama
@@ -9,16 +12,20 @@ from colorama import Fore, Style
 
 from .__config__ import __version__
 from .backup import make_backup, restore_backup, fix_canvases
+from .cache import SaveCache
 from .config import TowerConfig
 from .image_backends.backend import ResourceBackend
 from .image_backends.custom import CustomBackend
 from .image_backends.catbox import CatboxBackend
 from .image_backends.imgur import ImgurBackend
+from .parallel import run_per_group
+from .query import parse_query, select, QueryError
+from .query import parse_selector  # noqa: F401, re-exported for scripts importing it from here
 from .selection import *
-from .suitebro import load_suitebro, save_suitebro, run_suitebro_parser
+from .suitebro import Suitebro, load_suitebro, save_suitebro, run_suitebro_parser, load_native, save_native, \
+    load_cached, store_cached
 from .tool_lib import ToolMetadata, ParameterDict, ToolMainType, load_tool, PartialToolListType, load_tools, \
     make_tools_index
-from .util import xyz
 
 
 class PyTowerParser(argparse.ArgumentParser):
@@ -34,6 +41,39 @@ class PyTowerParser(argparse.ArgumentParser):
         return super().add_subparsers(**kwargs)
 
 
+def add_save_arguments(parser: argparse.ArgumentParser):
+    # Arguments for loading and saving the save
+    parser.add_argument('-i', '--input', dest='input', type=str, default='CondoData',
+                        help='Input file')
+    parser.add_argument('-o', '--output', dest='output', type=str, default='CondoData_output',
+                        help='Output file')
+    parser.add_argument('-j', '--json', dest='json', type=bool, action=argparse.BooleanOptionalAction,
+                        help='Whether to load/save as .json, instead of converting to CondoData')
+    parser.add_argument('-n', '--native', dest='native', action='store_true',
+                        help='Whether to load/save CondoData in-process, instead of running the suitebro parser')
+    parser.add_argument('-p', '--pipe', dest='pipe', action='store_true',
+                        help='Whether to stream data to/from the suitebro parser, instead of using .json files')
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help='Whether to skip the parsed save cache, forcing the save to be parsed again')
+
+
+def add_step_arguments(parser: argparse.ArgumentParser):
+    # Arguments for running a tool on the loaded save
+    parser.add_argument('-s', '--select', dest='selection', type=str, default='items',
+                        help='Selection type')
+    parser.add_argument('-v', '--invert', dest='invert', action='store_true',
+                        help='Whether or not to invert selection')
+    parser.add_argument('-vf', '--invert-full', dest='invert-full', action='store_true',
+                        help='Whether or not to do a full inversion (included property-only objects)')
+    parser.add_argument('-g', '--groups', '--per-group', dest='per_group', action='store_true',
+                        help='Whether or not to apply the tool per group')
+    parser.add_argument('--jobs', dest='jobs', type=int, default=1,
+                        help='Number of processes to apply the tool per group with (0 for one per CPU), for tools '
+                             'that support it')
+    parser.add_argument('-@', '--params', '--parameters', dest='parameters', nargs='*', default=[],
+                        help='Parameters to pass onto tooling script (must come at end)')
+
+
 def get_parser(tool_names: str):
     parser = PyTowerParser(prog='pytower',
                            description='High-level toolset and Python API for Tower Unite map editing',
@@ -52,6 +92,10 @@ def get_parser(tool_names: str):
     # Convert subcommand
     convert_parser = subparsers.add_parser('convert', help='Convert given file to .json or CondoData')
     convert_parser.add_argument('filename', type=str, help='File to use as input')
+    convert_parser.add_argument('-n', '--native', dest='native', action='store_true',
+                                help='Whether to convert in-process, instead of running the suitebro parser')
+    convert_parser.add_argument('--no-cache', dest='cache', action='store_false',
+                                help='Whether to skip the parsed save cache')
 
     # Backup subcommand
     backup_parser = subparsers.add_parser('backup', help='Backup or restore canvases for save files')
@@ -79,25 +123,14 @@ def get_parser(tool_names: str):
     # Required tool parameter
     run_parser.add_argument('tool', type=str, help='Tool to use')
 
-    # Run parameters
-    run_parser.add_argument('-i', '--input', dest='input', type=str, default='CondoData',
-                            help='Input file')
-    run_parser.add_argument('-o', '--output', dest='output', type=str, default='CondoData_output',
-                            help='Output file')
-    run_parser.add_argument('-s', '--select', dest='selection', type=str, default='items',
-                            help='Selection type')
-
-    # Flags
-    run_parser.add_argument('-v', '--invert', dest='invert', action='store_true',
-                            help='Whether or not to invert selection')
-    run_parser.add_argument('-vf', '--invert-full', dest='invert-full', action='store_true',
-                            help='Whether or not to do a full inversion (included property-only objects)')
-    run_parser.add_argument('-j', '--json', dest='json', type=bool, action=argparse.BooleanOptionalAction,
-                            help='Whether to load/save as .json, instead of converting to CondoData')
-    run_parser.add_argument('-g', '--groups', '--per-group', dest='per_group', action='store_true',
-                            help='Whether or not to apply the tool per group')
-    run_parser.add_argument('-@', '--params', '--parameters', dest='parameters', nargs='*', default=[],
-                            help='Parameters to pass onto tooling script (must come at end)')
+    add_save_arguments(run_parser)
+    add_step_arguments(run_parser)
+
+    # Pipeline subcommand
+    pipeline_parser = subparsers.add_parser('pipeline', help='Run the tools listed in given pipeline file in order')
+    pipeline_parser.add_argument('pipeline', type=str,
+                                 help='Pipeline file, with the arguments of one run of a tool per line')
+    add_save_arguments(pipeline_parser)
 
     # Fix subcommand
     fix_parser = subparsers.add_parser('fix', help='Fix broken canvases and corruption in given file')
@@ -127,6 +160,60 @@ def parse_args(parser=None):
     return vars(parser.parse_args())
 
 
+class PipelineError(Exception):
+    pass
+
+
+class PipelineStepParser(PyTowerParser):
+    def error(self, message):
+        raise PipelineError(message)
+
+
+def get_step_parser() -> PyTowerParser:
+    step_parser = PipelineStepParser(prog='step', add_help=False)
+    step_parser.add_argument('tool', type=str, help='Tool to use')
+    add_step_arguments(step_parser)
+    return step_parser
+
+
+def parse_pipeline(pipeline_filename: str) -> list[tuple[int, dict]]:
+    """Parses a pipeline file into its steps
+
+    Every line of the file holds the arguments of one `pytower run`, without the input and output arguments, e.g.,
+    `Rotate --select group:4 -@ rotation=0,0,45`. The leading `run` is optional, and blank lines and comments starting
+    with # are skipped.
+
+    Args:
+        pipeline_filename: The pipeline file
+
+    Returns:
+        List with the line number and the parsed arguments of every step, in order
+
+    Raises:
+        PipelineError: If a line is not valid
+    """
+    step_parser = get_step_parser()
+    steps = []
+    with open(pipeline_filename, 'r') as fd:
+        for line_number, line in enumerate(fd, start=1):
+            try:
+                step_args = shlex.split(line, comments=True)
+            except ValueError as e:
+                raise PipelineError(f'Line {line_number}: {e}')
+
+            if step_args and step_args[0].casefold() == 'run':
+                step_args = step_args[1:]
+            if not step_args:
+                continue
+
+            try:
+                steps.append((line_number, vars(step_parser.parse_args(step_args))))
+            except PipelineError as e:
+                raise PipelineError(f'Line {line_number}: {e}')
+
+    return steps
+
+
 def parse_parameters(param_input: list[str], meta: ToolMetadata) -> ParameterDict:
     # Ensure that all inputs were parsed correctly as strings
     params = {}
@@ -235,75 +322,93 @@ def config_confirm_show() -> bool:
     return False
 
 
-def parse_selector(selection_input: str):
-    sel_input = selection_input.casefold().strip()
-    sel_split = sel_input.split(':')
-    sel_split_case_sensitive = selection_input.strip().split(':')
+def parse_selectors(selection_input: str) -> list[Selector]:
+    """Parses a --select query, kept for scripts written against the previous selector parser
 
-    if len(sel_split) > 2:
-        return None
-    elif sel_input == 'item' or sel_input == 'items':
-        selector = ItemSelector()
-    elif sel_input == 'all' or sel_input == 'everything':
-        selector = EverythingSelector()
-    elif sel_input == 'none' or sel_input == 'nothing':
-        selector = NothingSelector()
-    elif sel_input.startswith('group:'):
-        gid_input = sel_split[1]
-        try:
-            group_id = int(gid_input)
-            selector = GroupSelector(group_id)
-        except ValueError:
-            print(f'{gid_input} is not valid group_id!')
-            return None
-    elif sel_input.startswith('regex:'):
-        selector = RegexSelector(sel_split_case_sensitive[1])
-    elif sel_input.startswith('name:'):
-        selector = NameSelector(sel_split[1])
-    elif sel_input.startswith('customname:'):
-        selector = CustomNameSelector(sel_split[1])
-    elif sel_input.startswith('objname:'):
-        selector = ObjectNameSelector(sel_split[1])
-    elif sel_input.startswith('random:'):
-        probability = float(sel_split[1])
-        selector = RandomSelector(probability)
-    elif sel_input.startswith('take:') or re.match('\\d+', sel_input):
-        try:
-            num = int(sel_split[1])
-        except IndexError:
-            num = int(sel_input)
-        selector = TakeSelector(num)
-    elif re.match('\\d+\\.*\\d*%', sel_input):
-        percentage = float(sel_split[1][:-1])
-        selector = PercentSelector(percentage)
-    elif sel_input.startswith('box:'):
-        positions = sel_split[1].split('/')
-        pos1 = xyz(positions[0])
-        pos2 = xyz(positions[1])
-        selector = BoxSelector(pos1, pos2)
-    elif sel_input.startswith('sphere:'):
-        params = sel_split[1].split('/')
-        center = xyz(params[0])
-        radius = float(params[1])
-        selector = SphereSelector(center, radius)
-    else:
-        return None
+    Args:
+        selection_input: The query, see pytower.query for the syntax
 
-    return selector
+    Returns:
+        List holding a single selector that evaluates the whole query
 
+    Raises:
+        QueryError: If the query is invalid
+    """
+    return [parse_query(selection_input)]
 
-def parse_selectors(selection_input: str) -> list[Selector]:
-    inputs = selection_input.split(';')
-    selectors = [parse_selector(input_sel) for input_sel in inputs]
-
-    # Validate
-    for selector, sel_input in zip(selectors, inputs):
-        if not selector:
-            print(f'Invalid selection: {sel_input}')
-            print('\nExample usages:\n  --select group:4\n  --select name:FrontDoor\n  --select regex:Canvas.*')
-            sys.exit(1)
 
-    return selectors
+def get_tool_module(tools: PartialToolListType, tool_name: str, tool_names: str) -> tuple[ModuleType, ToolMetadata]:
+    tool = find_tool(tools, tool_name.strip().casefold())
+
+    # Error if could not find specified tool
+    if not tool:
+        print(f'Could not find {tool_name}! \n\nAvailable tools: {tool_names}', file=sys.stderr)
+        sys.exit(1)
+
+    module_or_path, meta = tool
+    if not isinstance(module_or_path, ModuleType):
+        module, _ = load_tool(module_or_path)
+    else:
+        module = module_or_path
+
+    return module, meta
+
+
+def select_step(save: Suitebro, step_args: dict) -> Selection:
+    if step_args['invert-full'] and step_args['invert']:
+        print('--invert-all and --invert cannot be used at the same time!')
+        sys.exit(1)
+
+    # If --select argument provided, choose different selection
+    query = step_args['selection'] if step_args['selection'] else 'items'
+    if step_args['invert-full']:
+        query = f'not ({query})'
+    if step_args['invert']:
+        query = f'items and not ({query})'
+
+    try:
+        return select(save, query)
+    except QueryError as e:
+        print(f'Invalid selection: {e}')
+        print('\nExample usages:\n  --select group:4\n  --select name:FrontDoor\n  --select regex:Canvas.*'
+              '\n  --select "regex:Canvas.* and not group:4"\n  --select "items and scale.z>2"')
+        sys.exit(1)
+
+
+def run_step(save: Suitebro, module: ModuleType, meta: ToolMetadata, selection: Selection, params: ParameterDict,
+             step_args: dict):
+    if step_args['jobs'] != 1 and step_args['per_group'] and not meta.group_parallel:
+        print(f'{meta.tool_name} does not support running groups in parallel, running them one at a time')
+
+    if not step_args['per_group']:
+        # Normal execution
+        module.main(save, selection, params)
+    elif step_args['jobs'] != 1 and meta.group_parallel:
+        # Per group execution, with the groups split across processes
+        run_per_group(save, module, selection, params, jobs=step_args['jobs'] or None)
+    else:
+        # Per group execution
+        for (group_id, group) in selection.groups():
+            module.main(save, group, params)
+
+        # Ungrouped items are treated as being in a group by themselves
+        for obj in selection.ungrouped():
+            module.main(save, Selection({obj}), params)
+
+
+def print_inventory(inv_items_count: dict[str, int], save: Suitebro):
+    # Display items in save
+    final_inv_items_count = save.inventory_count()
+    print_items = False
+    for name, count in final_inv_items_count.items():
+        if name not in inv_items_count or final_inv_items_count[name] > inv_items_count[name]:
+            print_items = True
+            break
+
+    if print_items:
+        print('Make sure you have the following items in your inventory before loading the map:')
+        for name, count in final_inv_items_count.items():
+            print(f'{count:>9,}x {name}')
 
 
 def get_resource_backends() -> list[ResourceBackend]:
@@ -353,9 +458,24 @@ def main():
 
             if filename.endswith('.json'):
                 output = os.path.join(in_dir, filename[:-5])
+                if args['native']:
+                    with open(abs_filepath, 'r') as fd:
+                        save_json = json.load(fd)
+                    if save_native(save_json, output):
+                        return
                 run_suitebro_parser(abs_filepath, True, output, overwrite=True)
             else:
                 output = os.path.join(in_dir, os.path.basename(abs_filepath) + '.json')
+                save_cache = SaveCache() if args['cache'] else None
+                save_json = load_cached(abs_filepath, save_cache) if save_cache is not None else None
+                if save_json is None and args['native']:
+                    save_json = load_native(abs_filepath)
+                    if save_json is not None and save_cache is not None:
+                        store_cached(abs_filepath, save_json, save_cache)
+                if save_json is not None:
+                    with open(output, 'w') as fd:
+                        json.dump(save_json, fd, indent=2)
+                    return
                 run_suitebro_parser(abs_filepath, False, output, overwrite=True)
         case 'backup':
             match args['mode']:
@@ -431,20 +551,7 @@ def main():
             # Finally update tools index
             make_tools_index(tools)
         case 'run':
-            # Parse tool name
-            tool_name = args['tool'].strip().casefold()
-            tool = find_tool(tools, tool_name)
-
-            # Error if could not find specified tool
-            if not tool:
-                print(f'Could not find {args["tool"]}! \n\nAvailable tools: {tool_names}', file=sys.stderr)
-                sys.exit(1)
-
-            module_or_path, meta = tool
-            if not isinstance(module_or_path, ModuleType):
-                module, _ = load_tool(module_or_path)
-            else:
-                module = module_or_path
+            module, meta = get_tool_module(tools, args['tool'], tool_names)
 
             # Input file name
             input_filename = args['input']
@@ -457,63 +564,80 @@ def main():
                     input_filename = input_filename[:-5]
 
             # Load save
-            save = load_suitebro(input_filename, only_json=only_json)
+            save = load_suitebro(input_filename, only_json=only_json, native=args['native'], piped=args['pipe'],
+                                 cache=args['cache'])
 
             inv_items_count = save.inventory_count()
 
-            # If --select argument provided, choose different selector
-            if args['selection']:
-                selectors = parse_selectors(args['selection'])
-            else:
-                selectors = [ItemSelector()]
+            selection = select_step(save, args)
+
+            # Run tool
+            params = parse_parameters(args['parameters'], meta)
+            print(f'Running tool {meta.tool_name}...')
+            run_step(save, module, meta, selection, params, args)
 
-            selection = Selection(save.objects)
-            for selector in selectors:
-                selection = selector.select(selection)
+            # Writeback save
+            save_suitebro(save, args['output'], only_json=only_json, native=args['native'], piped=args['pipe'])
 
-            if args['invert-full'] and args['invert']:
-                print('--invert-all and --invert cannot be used at the same time!')
+            print(Fore.GREEN + f'\nSuccessfully exported to {args["output"]}!')
+            print(Style.RESET_ALL)
+
+            print_inventory(inv_items_count, save)
+        case 'pipeline':
+            try:
+                steps = parse_pipeline(args['pipeline'])
+            except (OSError, PipelineError) as e:
+                print(f'Invalid pipeline {args["pipeline"]}: {e}', file=sys.stderr)
                 sys.exit(1)
 
-            if args['invert-full']:
-                selection = Selection(save.objects) - selection
-            if args['invert']:
-                selection = ItemSelector().select(Selection(save.objects)) - selection
+            if not steps:
+                print(f'Pipeline {args["pipeline"]} has no steps!', file=sys.stderr)
+                sys.exit(1)
 
-            # Run tool
-            params = parse_parameters(args['parameters'], meta)
-            print(f'Running tool {meta.tool_name}...')
+            # Resolve every tool and its parameters before loading, so that mistakes in later steps show up right away
+            step_tools = []
+            for line_number, step_args in steps:
+                module, meta = get_tool_module(tools, step_args['tool'], tool_names)
+                params = parse_parameters(step_args['parameters'], meta)
+                step_tools.append((module, meta, params))
 
-            if not args['per_group']:
-                # Normal execution
-                module.main(save, selection, params)
-            else:
-                # Per group execution
-                for (group_id, group) in selection.groups():
-                    module.main(save, group, params)
+            input_filename = args['input']
+            only_json = args['json']
+            if only_json:
+                # Remove .json to be consistent with rest of program
+                if input_filename.endswith('.json'):
+                    input_filename = input_filename[:-5]
 
-                # Ungrouped items are treated as being in a group by themselves
-                for obj in selection.ungrouped():
-                    module.main(save, Selection({obj}), params)
+            # Load save once for all steps
+            start = time.perf_counter()
+            save = load_suitebro(input_filename, only_json=only_json, native=args['native'], piped=args['pipe'],
+                                 cache=args['cache'])
+            load_time = time.perf_counter() - start
+            print(f'Loaded {input_filename} in {load_time:.2f}s')
 
-            # Writeback save
-            save_suitebro(save, args['output'], only_json=only_json)
+            inv_items_count = save.inventory_count()
+
+            run_time = 0.0
+            for step_idx, ((line_number, step_args), (module, meta, params)) in enumerate(zip(steps, step_tools)):
+                start = time.perf_counter()
+                selection = select_step(save, step_args)
+                print(f'[{step_idx + 1}/{len(steps)}] Running tool {meta.tool_name} on {len(selection):,} '
+                      f'objects...')
+                run_step(save, module, meta, selection, params, step_args)
+                step_time = time.perf_counter() - start
+                run_time += step_time
+                print(f'[{step_idx + 1}/{len(steps)}] Finished {meta.tool_name} in {step_time:.2f}s')
+
+            # Writeback save once at the end
+            start = time.perf_counter()
+            save_suitebro(save, args['output'], only_json=only_json, native=args['native'], piped=args['pipe'])
+            save_time = time.perf_counter() - start
 
             print(Fore.GREEN + f'\nSuccessfully exported to {args["output"]}!')
             print(Style.RESET_ALL)
+            print(f'Load: {load_time:.2f}s, {len(steps)} steps: {run_time:.2f}s, save: {save_time:.2f}s')
 
-            # Display items in save
-            final_inv_items_count = save.inventory_count()
-            print_items = False
-            for name, count in final_inv_items_count.items():
-                if name not in inv_items_count or final_inv_items_count[name] > inv_items_count[name]:
-                    print_items = True
-                    break
-
-            if print_items:
-                print('Make sure you have the following items in your inventory before loading the map:')
-                for name, count in final_inv_items_count.items():
-                    print(f'{count:>9,}x {name}')
+            print_inventory(inv_items_count, save)
         case 'fix':
             filename = args['filename'].strip()
             path = os.path.abspath(os.path.expanduser(filename))
@@ -0,0 +1,299 @@
+"""Columnar transform storage
+
+Stores the position, rotation and scale of every item in a save as contiguous numpy arrays, so that tools can transform
+many objects at once. While an object is attached to a TransformTable, its position/rotation/scale properties read
+from and write to the table, and the values are only written back into the item and property sections on flush.
+"""
+import typing
+from typing import Iterable
+
+import numpy as np
+
+from .object import TowerObject
+from .selection import ObjectRegistry, Selection
+
+if typing.TYPE_CHECKING:
+    from .journal import Journal
+
+
+class TransformTable:
+    """Structure-of-arrays transform store
+
+    Attributes:
+        objects: The TowerObjects of each row, in row order
+        position: N×3 array of world positions
+        rotation: N×4 array of rotation quaternions (x, y, z, w)
+        scale: N×3 array of local scales
+    """
+    def __init__(self, objects: Iterable[TowerObject], journal: 'Journal | None' = None):
+        """Creates a table from the current transforms of the given objects and attaches them to it
+
+        Args:
+            objects: The objects to store. Property-only objects have no transform and are skipped
+            journal: Journal given the transforms that changed, see record_changes
+        """
+        self.objects: list[TowerObject] = []
+        for obj in objects:
+            if obj.has_item():
+                obj.flush_transform()
+                self.objects.append(obj)
+        self._rows: dict[TowerObject, int] = {obj: row for row, obj in enumerate(self.objects)}
+
+        num_rows = len(self.objects)
+        self.position = np.empty((num_rows, 3), dtype=np.float64)
+        self.rotation = np.empty((num_rows, 4), dtype=np.float64)
+        self.scale = np.empty((num_rows, 3), dtype=np.float64)
+        for row, obj in enumerate(self.objects):
+            item, _ = obj.sections()
+            pos, rot, scale = item['position'], item['rotation'], item['scale']
+            self.position[row] = pos['x'], pos['y'], pos['z']
+            self.rotation[row] = rot['x'], rot['y'], rot['z'], rot['w']
+            self.scale[row] = scale['x'], scale['y'], scale['z']
+            obj._transform = self, row
+
+        # Values as of the last flush, used to only write back rows that changed
+        self._flushed = self._snapshot()
+
+        # Journal and the values as of the last time changes were given to it
+        self._journal: 'Journal | None' = None
+        self._recorded: tuple[np.ndarray, np.ndarray, np.ndarray] | None = None
+        self.set_journal(journal)
+
+        # Registry last passed to selection_rows, and the row of each of its objects (-1 if not in the table)
+        self._registry: ObjectRegistry | None = None
+        self._registry_rows: np.ndarray | None = None
+
+    def _snapshot(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self.position.copy(), self.rotation.copy(), self.scale.copy()
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def row(self, obj: TowerObject) -> int:
+        """Gets the row of the given object
+
+        Args:
+            obj: The object to look up
+
+        Returns:
+            Index of the object's row in the arrays
+        """
+        return self._rows[obj]
+
+    def rows(self, objs: Iterable[TowerObject]) -> np.ndarray:
+        """Gets the rows of the given objects, skipping objects that are not in the table
+
+        Args:
+            objs: The objects to look up (e.g., a Selection)
+
+        Returns:
+            Integer array of row indices, usable to index position, rotation and scale
+        """
+        rows = self._rows
+        return np.fromiter((rows[obj] for obj in objs if obj in rows), dtype=np.intp)
+
+    def lookup(self, objs: Iterable[TowerObject]) -> np.ndarray:
+        """Gets the row of each of the given objects, or -1 for objects that are not in the table
+
+        Args:
+            objs: The objects to look up
+
+        Returns:
+            Integer array with the row of each object, in the same order
+        """
+        rows = self._rows
+        return np.fromiter((rows.get(obj, -1) for obj in objs), dtype=np.intp)
+
+    def selection_rows(self, selection: Selection) -> np.ndarray:
+        """Gets the row of every object of a selection, or -1 for objects that are not in the table
+
+        Same as lookup, but the rows are found with a single array lookup, which is much faster for large selections
+
+        Args:
+            selection: The selection to look up
+
+        Returns:
+            Integer array with the row of each object, in the iteration order of the selection
+        """
+        registry = selection.registry
+        if self._registry is not registry or len(self._registry_rows) < len(registry):
+            registry_rows = registry.rows(self.objects)
+            self._registry_rows = np.full(len(registry), -1, dtype=np.intp)
+            self._registry_rows[registry_rows] = np.arange(len(self.objects))
+            self._registry = registry
+        return self._registry_rows[selection.rows]
+
+    def mask(self, objs: Iterable[TowerObject]) -> np.ndarray:
+        """Gets a boolean mask selecting the rows of the given objects
+
+        Args:
+            objs: The objects to select (e.g., a Selection)
+
+        Returns:
+            Boolean array with one entry per row
+        """
+        mask = np.zeros(len(self.objects), dtype=bool)
+        mask[self.rows(objs)] = True
+        return mask
+
+    def flush(self):
+        """Writes every changed transform back into the item and property sections of its object"""
+        old_position, old_rotation, old_scale = self._flushed
+        position_changed = np.any(self.position != old_position, axis=1)
+        rotation_changed = np.any(self.rotation != old_rotation, axis=1)
+        scale_changed = np.any(self.scale != old_scale, axis=1)
+
+        for row in np.flatnonzero(position_changed):
+            self.objects[row]._store_position(self.position[row])
+        for row in np.flatnonzero(rotation_changed):
+            self.objects[row]._store_rotation(self.rotation[row])
+        for row in np.flatnonzero(scale_changed):
+            self.objects[row]._store_scale(self.scale[row])
+
+        self._flushed = self._snapshot()
+
+    def set_journal(self, journal: 'Journal | None'):
+        """Sets the journal that is given the transforms that changed from now on
+
+        Args:
+            journal: The journal, or None to stop recording changes
+        """
+        self._journal = journal
+        self._recorded = self._snapshot() if journal is not None else None
+
+    def record_changes(self):
+        """Gives the transforms that changed since the last call (or since set_journal) to the journal"""
+        if self._journal is None:
+            return
+
+        old_position, old_rotation, old_scale = self._recorded
+        rows = np.flatnonzero(np.any(self.position != old_position, axis=1) |
+                              np.any(self.rotation != old_rotation, axis=1) |
+                              np.any(self.scale != old_scale, axis=1))
+        if len(rows) == 0:
+            return
+
+        self._journal.record_transforms([self.objects[row] for row in rows.tolist()],
+                                        (old_position[rows], old_rotation[rows], old_scale[rows]),
+                                        (self.position[rows], self.rotation[rows], self.scale[rows]))
+        old_position[rows] = self.position[rows]
+        old_rotation[rows] = self.rotation[rows]
+        old_scale[rows] = self.scale[rows]
+
+    def mark_changed(self, objs: Iterable[TowerObject]):
+        """Makes the next flush write back the transforms of the given objects, even if they did not change
+
+        Args:
+            objs: The objects whose sections were replaced
+        """
+        rows = self.rows(objs)
+        for flushed in self._flushed:
+            flushed[rows] = np.nan
+
+    def detach(self):
+        """Flushes the table and detaches every object, so that they store their transforms in their sections again"""
+        self.record_changes()
+        self.flush()
+        for obj in self.objects:
+            if obj._transform is not None and obj._transform[0] is self:
+                obj._transform = None
+
+
+class TransformBatch:
+    """Transforms of a collection of items, gathered into arrays so that they can be changed at once
+
+    Change the arrays in place or assign new arrays of the same shape, then call apply to write them back.
+
+    Attributes:
+        objects: The items, in row order
+        position: N×3 array of world positions
+        rotation: N×4 array of rotation quaternions (x, y, z, w)
+        scale: N×3 array of local scales
+    """
+    def __init__(self, objects: Iterable[TowerObject], table: TransformTable | None = None):
+        """Gathers the transforms of the given objects
+
+        Args:
+            objects: The objects to gather (e.g., a Selection). Property-only objects have no transform and are skipped
+            table: Transform table holding the transforms of the objects (e.g., Suitebro.transforms), gathered and
+                written back with a single array operation. The transforms of objects that are not attached to it are
+                read from and written back to each object
+        """
+        self._table = table
+        if table is not None and isinstance(objects, Selection):
+            self._gather_rows(table, objects)
+        else:
+            self.objects: list[TowerObject] = [obj for obj in objects if obj.has_item()]
+            self._rows = np.fromiter((obj._transform[1] if obj._transform is not None and obj._transform[0] is table
+                                      else -1 for obj in self.objects), dtype=np.intp, count=len(self.objects))
+        in_table = self._rows >= 0
+        self._in_table = np.flatnonzero(in_table)
+        self._detached = np.flatnonzero(~in_table)
+
+        if table is not None and len(self._detached) == 0:
+            self.position = table.position[self._rows]
+            self.rotation = table.rotation[self._rows]
+            self.scale = table.scale[self._rows]
+        else:
+            num_rows = len(self.objects)
+            self.position = np.empty((num_rows, 3), dtype=np.float64)
+            self.rotation = np.empty((num_rows, 4), dtype=np.float64)
+            self.scale = np.empty((num_rows, 3), dtype=np.float64)
+            if len(self._in_table) > 0:
+                table_rows = self._rows[self._in_table]
+                self.position[self._in_table] = table.position[table_rows]
+                self.rotation[self._in_table] = table.rotation[table_rows]
+                self.scale[self._in_table] = table.scale[table_rows]
+            for idx in self._detached.tolist():
+                obj = self.objects[idx]
+                self.position[idx] = obj.position
+                self.rotation[idx] = obj.rotation
+                self.scale[idx] = obj.scale
+
+        # Transforms of the objects that are not in the table as gathered, so that only the changed ones are written
+        self._gathered = self._detached_values()
+
+    def _gather_rows(self, table: TransformTable, selection: Selection):
+        # Finds the rows of the items of a selection with an array lookup. Objects in the table are attached to it, so
+        #  only the objects without a row need to be checked
+        rows = table.selection_rows(selection)
+        objects = list(map(selection.registry.objects.__getitem__, selection.rows.tolist()))
+        missing = np.flatnonzero(rows < 0).tolist()
+        items = [idx for idx in missing if objects[idx].has_item()]
+        if len(items) < len(missing):
+            keep = rows >= 0
+            keep[items] = True
+            rows = rows[keep]
+            objects = [obj for obj, kept in zip(objects, keep.tolist()) if kept]
+        self.objects = objects
+        self._rows = rows
+
+    def _detached_values(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self.position[self._detached], self.rotation[self._detached], self.scale[self._detached]
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def centroid(self) -> np.ndarray:
+        """Gets the mean position of the items, or the origin if there are none"""
+        if len(self.objects) == 0:
+            return np.zeros(3, dtype=np.float64)
+        return np.mean(self.position, axis=0)
+
+    def apply(self):
+        """Writes the transforms back to the items"""
+        if len(self._in_table) == len(self.objects):
+            table_rows, in_table = self._rows, slice(None)
+        else:
+            table_rows, in_table = self._rows[self._in_table], self._in_table
+
+        for attr, gathered in zip(('position', 'rotation', 'scale'), self._gathered):
+            values = getattr(self, attr)
+            if len(table_rows) > 0:
+                getattr(self._table, attr)[table_rows] = values[in_table]
+
+            changed = np.any(values[self._detached] != gathered, axis=1)
+            for idx in self._detached[changed].tolist():
+                setattr(self.objects[idx], attr, values[idx])
+
+        self._gathered = self._detached_values()
@@ -1,7 +1,10 @@
+import numpy as np
+
 from pytower import tower
 from pytower.selection import Selection
 from pytower.suitebro import Suitebro
 from pytower.tool_lib import ToolParameterInfo, ParameterDict
+from pytower.transforms import TransformBatch
 from pytower.util import xyz
 
 TOOL_NAME = 'Center'
@@ -9,19 +12,20 @@ VERSION = '1.0'
 AUTHOR = 'Physics System'
 URL = 'https://github.com/rainbowphysics/PyTower/blob/main/tools/center.py'
 INFO = '''Centers selection at the world origin'''
+GROUP_PARALLEL = True
 PARAMETERS = {'offset': ToolParameterInfo(dtype=xyz, description='Optional offset', default=xyz(0.0, 0.0, 0.0))}
 
 
 def main(save: Suitebro, selection: Selection, params: ParameterDict):
-    offset = params.offset
-    centroid = sum([obj.position for obj in selection]) / len(selection)
+    offset = np.asarray(params.offset, dtype=np.float64)
+    batch = TransformBatch(selection, save.transforms)
 
-    for obj in selection:
-        # Move so that the centroid becomes the origin
-        obj.position -= centroid
+    # Move so that the centroid becomes the origin
+    batch.position -= batch.centroid()
 
-        # Add optional offset
-        obj.position += offset
+    # Add optional offset
+    batch.position += offset
+    batch.apply()
 
 
 if __name__ == '__main__':
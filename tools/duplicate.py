@@ -1,5 +1,5 @@
 from pytower import tower
-from pytower.copy import copy_selection
+from pytower.copy import copy_selection, copy_selection_batch
 from pytower.selection import Selection
 from pytower.suitebro import Suitebro
 from pytower.tool_lib import ToolParameterInfo, ParameterDict
@@ -17,10 +17,15 @@ PARAMETERS = {'offset': ToolParameterInfo(dtype=xyz, description='Translation of
 
 
 def main(save: Suitebro, selection: Selection, params: ParameterDict):
-    duplicated = copy_selection(selection)
-    save.add_objects(duplicated)
+    # Local offsets depend on the rotation of every object, so they are left to Translate
+    if params.local:
+        duplicated = copy_selection(selection)
+        save.add_objects(duplicated)
+        translate.main(save, duplicated, params)
+        return
 
-    translate.main(save, duplicated, params)
+    duplicated, = copy_selection_batch(selection, [params.offset])
+    save.add_objects(duplicated)
 
 
 if __name__ == '__main__':
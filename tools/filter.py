@@ -12,7 +12,7 @@ INFO = '''Filters the save so that only the items in selection remain'''
 
 def main(save: Suitebro, selection: Selection, params: ParameterDict):
     # Filter out everything except for metadata objects
-    save.objects = [obj for obj in save.objects if obj.item is None or obj in selection]
+    save.objects = [obj for obj in save.objects if not obj.has_item() or obj in selection]
 
     # Update group metadata
     save.update_groups_meta()
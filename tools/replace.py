@@ -1,7 +1,7 @@
 from pytower import tower
+from pytower.canvas import CanvasIndex
 from pytower.selection import Selection
-from pytower.suitebro import Suitebro, TowerObject
-from pytower.tools import set
+from pytower.suitebro import Suitebro
 from pytower.tool_lib import ToolParameterInfo, ParameterDict
 
 TOOL_NAME = 'Replace'
@@ -13,16 +13,8 @@ PARAMETERS = {'replace': ToolParameterInfo(dtype=str, description='Material to r
               'material': ToolParameterInfo(dtype=str, description='Replacement material to use instead')}
 
 
-def should_replace(obj: TowerObject, material: str) -> bool:
-    if not obj.is_canvas():
-        return False
-
-    return obj.is_canvas() and obj.properties['properties']['SurfaceMaterial']['Object']['value'] == material
-
-
 def main(save: Suitebro, selection: Selection, params: ParameterDict):
-    selection = Selection({obj for obj in selection if should_replace(obj, params.replace)})
-    set.main(save, selection, params)
+    CanvasIndex(selection).replace_materials({params.replace: params.material})
 
 
 if __name__ == '__main__':
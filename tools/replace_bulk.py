@@ -0,0 +1,50 @@
+from pytower.canvas import CanvasIndex, load_mapping
+from pytower.selection import Selection
+from pytower.suitebro import Suitebro
+from pytower.tool_lib import ToolParameterInfo, ParameterDict
+
+TOOL_NAME = 'BulkReplace'
+VERSION = '1.0'
+AUTHOR = 'Physics System'
+URL = 'https://github.com/rainbowphysics/PyTower/blob/main/tools/replace_bulk.py'
+INFO = '''Replaces many materials and URLs (including additional URLs) on canvas objects in the given selection at once.
+
+The replacements are read from a mapping file, either a CSV file with one old,new pair per row or a JSON object mapping
+old values to new ones, and/or given as pairs=old>new;old>new. Every canvas is changed at most once, so chained
+replacements such as a>b;b>c do not turn a into c.
+
+Replacements of an empty value are skipped on purpose: every canvas showing an image has an empty material and every
+canvas showing a material has an empty URL, so a blank cell in a mapping file would otherwise change all of them. Use
+Replace or ReplaceURL to replace an empty value.'''
+PARAMETERS = {'mapping': ToolParameterInfo(dtype=str, description='CSV or JSON file of replacements', default=''),
+              'pairs': ToolParameterInfo(dtype=str, description='Replacements as old>new, separated by semicolons',
+                                         default='')}
+
+
+def parse_pairs(pairs: str) -> dict[str, str]:
+    """Parses replacements given as old>new pairs separated by semicolons
+
+    Args:
+        pairs: The pairs
+
+    Returns:
+        Dictionary mapping old values to new ones
+    """
+    mapping = {}
+    for pair in pairs.split(';'):
+        if not pair.strip():
+            continue
+        old, sep, new = pair.partition('>')
+        if not sep:
+            raise ValueError(f'Invalid replacement "{pair}", expected old>new')
+        mapping[old.strip()] = new.strip()
+    return mapping
+
+
+def main(save: Suitebro, selection: Selection, params: ParameterDict):
+    mapping = load_mapping(params.mapping) if params.mapping else {}
+    mapping.update(parse_pairs(params.pairs))
+    if not mapping:
+        raise ValueError('No replacements given, expected mapping=<FILE> and/or pairs=old>new;old>new')
+
+    CanvasIndex(selection).replace(mapping, additional_urls=True)
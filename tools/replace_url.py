@@ -1,6 +1,6 @@
+from pytower.canvas import CanvasIndex
 from pytower.selection import Selection
-from pytower.suitebro import Suitebro, TowerObject
-from pytower.tools import set_url
+from pytower.suitebro import Suitebro
 from pytower.tool_lib import ToolParameterInfo, ParameterDict
 
 TOOL_NAME = 'ReplaceURL'
@@ -12,13 +12,5 @@ PARAMETERS = {'url': ToolParameterInfo(dtype=str, description='URL to set'),
               'replace': ToolParameterInfo(dtype=str, description='URL to replace')}
 
 
-def should_replace(obj: TowerObject, url: str) -> bool:
-    if not obj.is_canvas():
-        return False
-
-    return obj.is_canvas() and obj.properties['properties']['URL']['Str']['value'] == url
-
-
 def main(save: Suitebro, selection: Selection, params: ParameterDict):
-    selection = Selection({obj for obj in selection if should_replace(obj, params.replace)})
-    set_url.main(save, selection, params)
+    CanvasIndex(selection).replace_urls({params.replace: params.url})
@@ -1,38 +1,71 @@
+import numpy as np
 from scipy.spatial.transform import Rotation as R
 
 from pytower import tower
 from pytower.selection import Selection
 from pytower.suitebro import Suitebro
 from pytower.tool_lib import ToolParameterInfo, ParameterDict
+from pytower.transforms import TransformBatch
 from pytower.util import xyz
 
 TOOL_NAME = 'Rotate'
-VERSION = '1.0'
+VERSION = '1.1'
 AUTHOR = 'Physics System'
 URL = 'https://github.com/rainbowphysics/PyTower/blob/main/tools/rotate.py'
-INFO = '''Rotates selection a specified amount (in world coordinates)'''
+INFO = '''Rotates selection a specified amount (in world coordinates)
+
+By default, the selection is rotated around its centroid. With pivot=group, every group is rotated around its own
+centroid instead, and every ungrouped object around its own position.'''
+GROUP_PARALLEL = True
 PARAMETERS = {'rotation': ToolParameterInfo(dtype=xyz, description='Rotation to perform (in Euler angles and degrees)'),
-              'local': ToolParameterInfo(dtype=bool, description='Whether to only rotate locally', default=False)}
+              'local': ToolParameterInfo(dtype=bool, description='Whether to only rotate locally', default=False),
+              'pivot': ToolParameterInfo(dtype=str, description='Point to rotate around (centroid or group)',
+                                         default='centroid')}
+
+
+def group_centroids(batch: TransformBatch) -> np.ndarray:
+    """Gets the centroid of the group of every item in a batch
+
+    Args:
+        batch: The items
+
+    Returns:
+        N×3 array with the centroid of the selected members of the group of each item, or the position of the item if
+        it is not grouped
+    """
+    group_ids = np.fromiter((obj.group_id() for obj in batch.objects), dtype=np.int64, count=len(batch))
+    grouped = group_ids >= 0
+    _, groups = np.unique(group_ids[grouped], return_inverse=True)
+
+    positions = batch.position[grouped]
+    counts = np.bincount(groups)
+    sums = np.stack([np.bincount(groups, weights=positions[:, axis], minlength=len(counts)) for axis in range(3)],
+                    axis=1)
+
+    centroids = batch.position.copy()
+    centroids[grouped] = (sums / counts[:, np.newaxis])[groups]
+    return centroids
 
 
 def main(save: Suitebro, selection: Selection, params: ParameterDict):
-    rot = params.rotation
-    r = R.from_euler('xyz', rot, degrees=True)
-    centroid = sum([obj.position for obj in selection]) / len(selection)
-
-    for obj in selection:
-        # Since obj.rotation is quaternion, need to convert to/from
-        q = R.from_quat(obj.rotation)
-        p = r * q
-        obj.rotation = p.as_quat()
-
-        #TODO special treatment of groups--groups are still considered local
-
-        if not params.local:
-            # Rotate positions around centroid with help from scipy
-            obj.position -= centroid
-            obj.position = r.apply(obj.position)
-            obj.position += centroid
+    pivot = params.pivot.lower() if 'pivot' in params else 'centroid'
+    if pivot not in ('centroid', 'group'):
+        raise ValueError(f'Invalid pivot "{params.pivot}", expected centroid or group')
+
+    r = R.from_euler('xyz', params.rotation, degrees=True)
+    batch = TransformBatch(selection, save.transforms)
+    if len(batch) == 0:
+        return
+
+    # Since rotations are quaternions, compose all of them with the rotation at once
+    batch.rotation = (r * R.from_quat(batch.rotation)).as_quat()
+
+    if not params.local:
+        # Rotate positions around the centroid (or the centroid of each group) with help from scipy
+        centers = group_centroids(batch) if pivot == 'group' else batch.centroid()
+        batch.position = r.apply(batch.position - centers) + centers
+
+    batch.apply()
 
 
 if __name__ == '__main__':
@@ -2,12 +2,14 @@ from pytower import tower
 from pytower.selection import Selection
 from pytower.suitebro import Suitebro
 from pytower.tool_lib import ToolParameterInfo, ParameterDict
+from pytower.transforms import TransformBatch
 
 TOOL_NAME = 'Scale'
 VERSION = '1.0'
 AUTHOR = 'Physics System'
 URL = 'https://github.com/rainbowphysics/PyTower/blob/main/tools/scale.py'
 INFO = '''Scales selection up, either around the centroid (default) or world origin (origin=True)'''
+GROUP_PARALLEL = True
 PARAMETERS = {'scale': ToolParameterInfo(dtype=float, description='Scaling factor'),
               'origin': ToolParameterInfo(dtype=bool, description='Whether to scale around the origin', default=False)}
 
@@ -18,22 +20,19 @@ def main(save: Suitebro, selection: Selection, params: ParameterDict):
     # Optional parameter
     use_origin = 'origin' in params and params.origin
 
-    centroid = sum([obj.position for obj in selection]) / len(selection)
+    batch = TransformBatch(selection, save.transforms)
 
     # When not using the origin to scale, we need to shift the coordinates so that the centroid *becomes* the origin
-    if not use_origin:
-        for obj in selection:
-            obj.position -= centroid
-
-    # Scale about the origin
-    for obj in selection:
-        obj.position *= scale
-        obj.scale *= scale
-
-    # Shift coordinates back to world coordinates
-    if not use_origin:
-        for obj in selection:
-            obj.position += centroid
+    if use_origin:
+        batch.position *= scale
+    else:
+        centroid = batch.centroid()
+        batch.position -= centroid
+        batch.position *= scale
+        batch.position += centroid
+
+    batch.scale *= scale
+    batch.apply()
 
 
 if __name__ == '__main__':
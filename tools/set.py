@@ -14,25 +14,16 @@ PARAMETERS = {'material': ToolParameterInfo(dtype=str, description='Material to
 def main(save: Suitebro, selection: Selection, params: ParameterDict):
     mat = params.material
     for obj in selection:
-        if obj.item is None or obj.properties is None:
+        item, properties = obj.sections()
+        if item is None or properties is None:
             continue
 
-        item_props = obj.item['properties']
-
         # Skip over non-canvas items
         if not obj.is_canvas():
             continue
 
-        # Remove URL entry from object header if exists
-        if 'URL' in item_props:
-            del item_props['URL']
-
-        # Set material
-        item_props['SurfaceMaterial'] = {'Object': {'value': mat}}
-
-        # Ensure other object properties agree
-        obj.properties['properties']['SurfaceMaterial'] = {'Object': {'value': mat}}
-        obj.properties['properties']['URL'] = {'Str': {'value': ''}}
+        # Set material, removing the URL entry from the object header and ensuring the other object properties agree
+        obj.set_material(mat)
 
 
 if __name__ == '__main__':
@@ -13,22 +13,14 @@ PARAMETERS = {'url': ToolParameterInfo(dtype=str, description='URL to set')}
 def main(save: Suitebro, selection: Selection, params: ParameterDict):
     url = params.url
     for obj in selection:
-        if obj.item is None or obj.properties is None:
+        item, properties = obj.sections()
+        if item is None or properties is None:
             continue
 
-        item_props = obj.item['properties']
-
         # Skip over non-canvas items
         if not obj.is_canvas():
             continue
 
-        # Remove SurfaceMaterial entry from object header if exists
-        if 'SurfaceMaterial' in item_props:
-            del item_props['SurfaceMaterial']
-
-        # Set URL
-        item_props['URL'] = {'Str': {'value': url}}
-
-        # Ensure other object properties agree
-        obj.properties['properties']['SurfaceMaterial'] = {'Object': {'value': ''}}
-        obj.properties['properties']['URL'] = {'Str': {'value': url}}
+        # Set URL, removing the SurfaceMaterial entry from the object header and ensuring the other object properties
+        #  agree
+        obj.set_url(url)
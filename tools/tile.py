@@ -1,5 +1,7 @@
+import numpy as np
+
 from pytower import tower
-from pytower.copy import copy_selection
+from pytower.copy import copy_selection_batch
 from pytower.selection import Selection
 from pytower.suitebro import Suitebro
 from pytower.tool_lib import ToolParameterInfo, ParameterDict
@@ -17,24 +19,14 @@ PARAMETERS = {'tile': ToolParameterInfo(dtype=xyzint, description='x,y,z tiling
 def main(save: Suitebro, selection: Selection, params: ParameterDict):
     # Get tile/offset parameters, and handle edge-case for 0-entries
     nx, ny, nz = XYZInt.max(params.tile, xyzint(1, 1, 1))
-    dx, dy, dz = params.offset
-    for x in range(nx):
-        for y in range(ny):
-            for z in range(nz):
-                # Skip tiling origin
-                if x == 0 and y == 0 and z == 0:
-                    continue
-
-                # Copy selection
-                copies = copy_selection(selection)
-
-                # Set position of copy
-                offset = xyz(x * dx, y * dy, z * dz)
-                for obj in copies:
-                    obj.position += offset
-
-                # Add copies to save
-                save.add_objects(copies)
+
+    # Offset of every tile cell except the origin, in x, y, z order
+    cells = np.stack(np.meshgrid(np.arange(nx), np.arange(ny), np.arange(nz), indexing='ij'), axis=-1).reshape(-1, 3)
+    offsets = cells[1:] * np.asarray(params.offset, dtype=np.float64)
+
+    # Copy selection once per cell and add all copies to save
+    batches = copy_selection_batch(selection, offsets)
+    save.add_objects([obj for copies in batches for obj in copies])
 
 
 if __name__ == '__main__':